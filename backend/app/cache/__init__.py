@@ -0,0 +1 @@
+"""Cache backends and cross-worker invalidation"""
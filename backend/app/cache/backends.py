@@ -0,0 +1,242 @@
+"""
+Cache backends
+
+CacheBackend is the small key/value + pub/sub surface the shared cache tier
+needs. InProcessCacheBackend keeps everything in this process (the default,
+and what a single uvicorn worker wants); RedisCacheBackend talks to any
+Redis-protocol server so several workers share entries and see each other's
+invalidations.
+
+Values must be JSON-serializable. Backends never raise on the read/write
+path: a backend error is logged and treated as a miss, so Sheets stays the
+source of truth.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.observability.metrics import backend_call
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process on the invalidation channel, so a worker skips its own messages
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+MessageHandler = Callable[[Dict[str, Any]], None]
+
+
+class CacheBackend:
+    """Interface for cache backends"""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_sec: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """Send an invalidation message to the other workers."""
+        raise NotImplementedError
+
+    def subscribe(self, handler: MessageHandler) -> None:
+        """Call handler(message) for every message published by another worker."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessCacheBackend(CacheBackend):
+    """Dict with per-key expiry; there are no other workers to publish to"""
+
+    name = "memory"
+
+    def __init__(self):
+        # key -> (expires_at_monotonic, value)
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._data.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl_sec: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_sec, value)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        return
+
+    def subscribe(self, handler: MessageHandler) -> None:
+        return
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared backend on a Redis-protocol server (Redis, Valkey, KeyDB, or
+    fakeredis.TcpFakeServer for local runs).
+
+    Keys live under key_prefix; invalidations go out on <key_prefix>invalidate.
+    While the server is unreachable (as seen by the subscription thread) every
+    get is a miss without a round trip and invalidations are lost, so
+    subscribers get a "*" message (drop all local copies) when the
+    subscription breaks and again once the server answers.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str = "gateflow:", client=None, timeout_sec: float = 0.5):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+            client = redis.Redis.from_url(
+                url,
+                socket_timeout=timeout_sec,
+                socket_connect_timeout=timeout_sec,
+                health_check_interval=30,
+            )
+        self._client = client
+        self._prefix = key_prefix
+        self._channel = f"{key_prefix}invalidate"
+
+        self._handlers: List[MessageHandler] = []
+        self._pubsub = None
+        self._thread = None
+        self._bus_down = False
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if self._bus_down:
+            return None
+        try:
+            with backend_call("redis", "get"):
+                raw = self._client.get(self._key(key))
+            return None if raw is None else json.loads(raw)
+        except Exception as e:
+            logger.warning(f"CACHE_BACKEND_GET_FAIL | backend=redis key={key} err={e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl_sec: float) -> None:
+        if self._bus_down:
+            return
+        try:
+            payload = json.dumps(value, default=str)
+            with backend_call("redis", "set"):
+                self._client.set(self._key(key), payload, px=max(1, int(ttl_sec * 1000)))
+        except Exception as e:
+            logger.warning(f"CACHE_BACKEND_SET_FAIL | backend=redis key={key} err={e}")
+
+    def delete(self, *keys: str) -> None:
+        if not keys or self._bus_down:
+            return
+        try:
+            with backend_call("redis", "delete"):
+                self._client.delete(*(self._key(k) for k in keys))
+        except Exception as e:
+            logger.warning(f"CACHE_BACKEND_DELETE_FAIL | backend=redis keys={len(keys)} err={e}")
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        if self._bus_down:
+            return
+        try:
+            payload = json.dumps({**message, "origin": WORKER_ID}, default=str)
+            with backend_call("redis", "publish"):
+                self._client.publish(self._channel, payload)
+        except Exception as e:
+            logger.warning(f"CACHE_BACKEND_PUBLISH_FAIL | backend=redis err={e}")
+
+    # -----------------------------
+    # Subscription
+    # -----------------------------
+    def subscribe(self, handler: MessageHandler) -> None:
+        with self._lock:
+            self._handlers.append(handler)
+            if self._thread is None:
+                self._start_listener()
+
+    def _start_listener(self) -> None:
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self._channel: self._on_message})
+        self._thread = self._pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error,
+        )
+        logger.info(f"CACHE_BUS_SUBSCRIBED | channel={self._channel} worker={WORKER_ID}")
+
+    def _on_message(self, raw: Dict[str, Any]) -> None:
+        try:
+            message = json.loads(raw["data"])
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"CACHE_BUS_BAD_MESSAGE | err={e}")
+            return
+        if message.get("origin") == WORKER_ID:
+            return
+        self._dispatch(message)
+
+    def _on_listener_error(self, e: Exception, pubsub, thread) -> None:
+        # Called on every failed read while the server is down; the pubsub
+        # worker resubscribes on its own once it is back. Anything published
+        # in between is gone, so subscribers drop their local copies.
+        if not self._bus_down:
+            self._bus_down = True
+            logger.warning(f"CACHE_BUS_DISCONNECTED | channel={self._channel} err={e}")
+            self._dispatch({"namespace": "*"})
+        time.sleep(1.0)
+        try:
+            self._client.ping()
+        except Exception:
+            return
+        self._bus_down = False
+        logger.info(f"CACHE_BUS_RECONNECTED | channel={self._channel}")
+        self._dispatch({"namespace": "*"})
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception as e:
+                logger.warning(f"CACHE_BUS_HANDLER_FAIL | namespace={message.get('namespace')} err={e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                self._thread.stop()
+                self._thread = None
+            if self._pubsub is not None:
+                try:
+                    self._pubsub.close()
+                except Exception:
+                    pass
+                self._pubsub = None
+        try:
+            self._client.close()
+        except Exception:
+            pass
@@ -0,0 +1,214 @@
+"""
+Shared cache tier and cross-worker invalidation
+
+Every uvicorn worker keeps its own in-memory caches. This module lets them
+agree on what is stale:
+
+- invalidate(namespace, key) runs this worker's handlers for the namespace
+  and publishes the same message to every other worker (via the configured
+  CacheBackend), whose handlers evict their own copies.
+- SharedCache(namespace, ttl_sec) is a per-process L1 in front of the
+  backend: a miss in one worker can be served from an entry another worker
+  already loaded, and SharedCache.delete evicts the key in every worker.
+  Backend keys carry a namespace generation, so delete(None) retires every
+  shared entry of the namespace at once, including keys this worker never held.
+
+With CACHE_BACKEND=memory (default) there is only one worker, so publishing
+is a no-op and SharedCache behaves like the plain TTL dicts it replaces.
+Entries are still bounded by their TTL, which is also the staleness bound for
+invalidations lost while the shared backend is unreachable.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.cache.backends import CacheBackend, InProcessCacheBackend, RedisCacheBackend
+from app.config import settings
+from app.observability.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# handler(key, data): key None means "everything in the namespace"
+InvalidationHandler = Callable[[Optional[str], Optional[Dict[str, Any]]], None]
+
+
+# Lifetime of a SharedCache namespace generation in the backend (far beyond any entry TTL)
+GENERATION_TTL_SEC = 30 * 24 * 3600
+
+
+# Singleton instance
+_cache_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+# namespace -> handlers registered in this worker
+_handlers: Dict[str, List[InvalidationHandler]] = {}
+_handlers_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get singleton CacheBackend, chosen by settings.CACHE_BACKEND"""
+    global _cache_backend
+    with _backend_lock:
+        if _cache_backend is None:
+            kind = (settings.CACHE_BACKEND or "memory").strip().lower()
+            if kind == "redis":
+                backend: CacheBackend = RedisCacheBackend(
+                    settings.CACHE_REDIS_URL, key_prefix=settings.CACHE_KEY_PREFIX,
+                )
+            elif kind == "memory":
+                backend = InProcessCacheBackend()
+            else:
+                raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND!r}")
+            backend.subscribe(_on_remote_message)
+            _cache_backend = backend
+            logger.info(f"CACHE_BACKEND_READY | backend={backend.name}")
+        return _cache_backend
+
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """Swap the backend (benchmarks / local multi-worker checks); None resets to settings."""
+    global _cache_backend
+    with _backend_lock:
+        if _cache_backend is not None and _cache_backend is not backend:
+            _cache_backend.close()
+        if backend is not None:
+            backend.subscribe(_on_remote_message)
+        _cache_backend = backend
+
+
+# -----------------------------
+# Invalidation bus
+# -----------------------------
+def on_invalidate(namespace: str, handler: InvalidationHandler) -> None:
+    """Register handler(key, data) for invalidations of a namespace (from any worker)."""
+    with _handlers_lock:
+        _handlers.setdefault(namespace, []).append(handler)
+    # Make sure this worker is listening before its first write can be missed
+    get_cache_backend()
+
+
+def invalidate(
+    namespace: str,
+    key: Optional[str] = None,
+    data: Optional[Dict[str, Any]] = None,
+    local: bool = True,
+) -> None:
+    """
+    Evict `key` (None = whole namespace) in every worker.
+    local=False only notifies the other workers, for callers that have
+    already patched their own copy.
+    """
+    if local:
+        _run_handlers(namespace, key, data)
+    get_cache_backend().publish({"namespace": namespace, "key": key, "data": data})
+
+
+def _run_handlers(namespace: str, key: Optional[str], data: Optional[Dict[str, Any]]) -> None:
+    with _handlers_lock:
+        handlers = list(_handlers.get(namespace, ()))
+    for handler in handlers:
+        try:
+            handler(key, data)
+        except Exception as e:
+            logger.warning(f"CACHE_INVALIDATE_HANDLER_FAIL | namespace={namespace} key={key} err={e}")
+
+
+def _on_remote_message(message: Dict[str, Any]) -> None:
+    namespace = message.get("namespace")
+    if namespace == "*":
+        # Missed messages possible: drop every namespace's local state
+        with _handlers_lock:
+            namespaces = list(_handlers)
+        for ns in namespaces:
+            _run_handlers(ns, None, None)
+        return
+    if namespace:
+        _run_handlers(namespace, message.get("key"), message.get("data"))
+
+
+# -----------------------------
+# Two-level cache
+# -----------------------------
+class SharedCache:
+    """Per-process L1 (TTL dict) over the shared backend, evicted everywhere on delete"""
+
+    def __init__(self, namespace: str, ttl_sec: float):
+        self.namespace = namespace
+        self.ttl_sec = ttl_sec
+        # key -> (expires_at_epoch, value)
+        self._local: Dict[str, Tuple[float, Any]] = {}
+        # (read_at_epoch, generation) used in backend keys; re-read from the
+        # backend after a namespace-wide invalidation or ttl_sec, so a missed
+        # message can't keep a worker on a retired generation for longer
+        self._generation: Optional[Tuple[float, str]] = None
+        self._lock = threading.Lock()
+        on_invalidate(namespace, self._evict_local)
+
+    def _generation_key(self) -> str:
+        return f"{self.namespace}:#gen"
+
+    def _current_generation(self) -> str:
+        now = time.time()
+        with self._lock:
+            cached = self._generation
+        if cached and now - cached[0] < self.ttl_sec:
+            return cached[1]
+        # "0" until the first namespace-wide delete
+        generation = get_cache_backend().get(self._generation_key()) or "0"
+        with self._lock:
+            self._generation = (now, generation)
+        return generation
+
+    def _backend_key(self, key: str) -> str:
+        return f"{self.namespace}:{self._current_generation()}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+        if entry and entry[0] > now:
+            record_cache(self.namespace, True)
+            return entry[1]
+
+        # Shared entries carry their original expiry, so copying one into L1
+        # never extends its life past the TTL it was loaded with
+        shared = get_cache_backend().get(self._backend_key(key))
+        hit = bool(shared) and shared.get("expires_at", 0) > now
+        record_cache(f"{self.namespace}.shared", hit)
+        record_cache(self.namespace, hit)
+        if not hit:
+            return None
+        with self._lock:
+            self._local[key] = (shared["expires_at"], shared["value"])
+        return shared["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_sec
+        with self._lock:
+            self._local[key] = (expires_at, value)
+        get_cache_backend().set(
+            self._backend_key(key), {"expires_at": expires_at, "value": value}, self.ttl_sec,
+        )
+
+    def delete(self, key: Optional[str] = None) -> None:
+        """Drop one key (None = all of this cache's keys) here and in every other worker."""
+        if key is not None:
+            get_cache_backend().delete(self._backend_key(key))
+        else:
+            # New generation: every worker's next lookup misses the old entries,
+            # which then expire on their own TTL
+            generation = uuid.uuid4().hex
+            get_cache_backend().set(self._generation_key(), generation, GENERATION_TTL_SEC)
+        invalidate(self.namespace, key)
+
+    def _evict_local(self, key: Optional[str], data: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            if key is None:
+                self._local.clear()
+                # Another worker may have started a new generation
+                self._generation = None
+            else:
+                self._local.pop(key, None)
@@ -12,6 +12,25 @@ class Settings(BaseSettings):
     # Google Sheets Configuration
     GOOGLE_SHEETS_CREDENTIALS_PATH: str = "credentials.json"
     SHEETS_SPREADSHEET_ID: Optional[str] = None
+
+    # "google" for the real API, "fake" for the in-process stand-in
+    # (app/sheets/fake_backend.py; local development and benchmarks)
+    SHEETS_BACKEND: str = "google"
+    SHEETS_FAKE_SEED_PATH: Optional[str] = None  # JSON {tab: rows incl. header}
+    SHEETS_FAKE_LATENCY_MS: float = 0.0
+    SHEETS_FAKE_JITTER_MS: float = 0.0
+    SHEETS_FAKE_ERROR_RATE: float = 0.0  # fraction of calls failing with 503
+    SHEETS_FAKE_QUOTA_PER_MINUTE: int = 0  # 429 beyond this many calls/minute (0 = unlimited)
+
+    # Sheets quota governor (app/sheets/quota.py): per-process request budgets
+    # (0 = unlimited; split the project quota across uvicorn workers), how long
+    # a gate-critical call may wait for one, and the 429/5xx retry policy
+    SHEETS_READ_QUOTA_PER_MINUTE: int = 60
+    SHEETS_WRITE_QUOTA_PER_MINUTE: int = 60
+    SHEETS_QUOTA_MAX_WAIT_SEC: float = 10.0
+    SHEETS_MAX_RETRIES: int = 4
+    SHEETS_BACKOFF_BASE_SEC: float = 0.5
+    SHEETS_BACKOFF_MAX_SEC: float = 8.0
     
     # Sheet Names (must match existing sheet names exactly)
     SHEET_FLATS: str = "Flats"
@@ -22,6 +41,12 @@ class Settings(BaseSettings):
     SHEET_COMPLAINTS: str = "Complaints"
     SHEET_NOTICES: str = "Notices"
 
+    # Storage for flats/guards/visitors/residents/admins/complaints/notices
+    # (app/repositories): "sheets" (the spreadsheet above) or "sqlite" (an
+    # indexed local file; import existing data with scripts/import_sheets_to_sqlite.py)
+    STORAGE_BACKEND: str = "sheets"
+    SQLITE_PATH: str = "gateflow.db"
+
     GOOGLE_SERVICE_ACCOUNT_FILE: str = "credentials.json"
     FIREBASE_SERVICE_ACCOUNT_PATH: str = "firebase_service_account.json"
 
@@ -30,6 +55,25 @@ class Settings(BaseSettings):
     
     # API Settings
     API_V1_PREFIX: str = "/api/v1"
+
+    # Request logging: comma-separated path prefixes whose request bodies are
+    # sampled into the log (e.g. "/api/guards/login,/api/complaints"), and the cap
+    LOG_BODY_SAMPLE_ROUTES: str = ""
+    LOG_BODY_SAMPLE_BYTES: int = 1024
+
+    # Tracing: export finished traces to "console" or "file" (TRACE_EXPORT_PATH,
+    # JSONL), for TRACE_SAMPLE_RATE of requests plus every slow request.
+    # Requests over TRACE_SLOW_REQUEST_MS always log their span tree.
+    TRACE_EXPORT: str = ""
+    TRACE_EXPORT_PATH: str = "traces.jsonl"
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_SLOW_REQUEST_MS: float = 1000.0
+
+    # Cache tier: "memory" (per process) or "redis" (any Redis-protocol server,
+    # shared by all uvicorn workers, with cross-worker invalidation)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "gateflow:"
     
     class Config:
         env_file = ".env"
@@ -3,8 +3,13 @@ GateFlow Backend - FastAPI Application
 Guard-first visitor management system
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.routers import guards, visitors , residents, admins, complaints, notices
 
@@ -13,20 +18,43 @@ import logging
 from app.routers import whatsapp_webhook
 from app.routers import admin_units
 from app.routers import society_requests
+from app.config import settings
+from app.observability.metrics import render_prometheus
+from app.observability.request_logging import RequestLoggingMiddleware
+from app.observability.tracing import TraceExporter, TracingMiddleware, install_log_record_factory
+from app.services.notice_service import get_notice_service
+from app.sheets.quota import SheetsQuotaError, find_quota_error, retry_after_header
 
 
 logger = logging.getLogger() 
 
+# Every record carries the current request id (or "-" outside a request)
+install_log_record_factory()
 logging.basicConfig(
     level=logging.INFO,  # 👈 THIS IS THE KEY
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    format="%(asctime)s | %(levelname)s | %(name)s | req=%(request_id)s | %(message)s",
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background upkeep: compact deleted notices (tombstoned Sheets rows)
+    try:
+        notice_service = get_notice_service()
+        notice_service.start_compaction_timer()
+    except Exception as e:
+        notice_service = None
+        logger.warning(f"NOTICE_COMPACTION_TIMER_FAIL | err={e}")
+    yield
+    if notice_service is not None:
+        notice_service.stop_compaction_timer()
+
+
 app = FastAPI(
     title="GateFlow API",
     description="Guard-first visitor management system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for Flutter app
@@ -38,6 +66,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request logging + per-route latency (pure ASGI, never buffers bodies)
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sample_body_routes=[p.strip() for p in settings.LOG_BODY_SAMPLE_ROUTES.split(",")],
+    sample_body_bytes=settings.LOG_BODY_SAMPLE_BYTES,
+)
+
+# Added last so it is outermost: the request id is bound before anything logs
+app.add_middleware(
+    TracingMiddleware,
+    exporter=TraceExporter(settings.TRACE_EXPORT, settings.TRACE_EXPORT_PATH),
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    slow_request_ms=settings.TRACE_SLOW_REQUEST_MS,
+)
+
+# -----------------------------
+# Sheets quota errors -> 503 + Retry-After
+# -----------------------------
+# Routers and services re-raise Sheets failures as 500s / generic errors; when
+# the root cause is an exhausted quota, tell the client when to retry instead.
+def _quota_response(error: SheetsQuotaError) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(error)}, headers=retry_after_header(error))
+
+
+@app.exception_handler(SheetsQuotaError)
+async def sheets_quota_error_handler(request: Request, exc: SheetsQuotaError):
+    return _quota_response(exc)
+
+
+@app.exception_handler(StarletteHTTPException)
+async def quota_aware_http_exception_handler(request: Request, exc: StarletteHTTPException):
+    quota_error = find_quota_error(exc) if exc.status_code >= 500 else None
+    if quota_error:
+        return _quota_response(quota_error)
+    return await http_exception_handler(request, exc)
+
+
+@app.exception_handler(Exception)
+async def quota_aware_error_handler(request: Request, exc: Exception):
+    quota_error = find_quota_error(exc)
+    if quota_error:
+        return _quota_response(quota_error)
+    return PlainTextResponse("Internal Server Error", status_code=500)
+
+
 # Include routers
 app.include_router(guards.router, prefix="/api/guards", tags=["guards"])
 app.include_router(visitors.router, prefix="/api/visitors", tags=["visitors"])
@@ -59,30 +132,8 @@ async def health():
     return {"status": "healthy"}
 
 
-import time
-import logging
-from fastapi import Request
-
-logger = logging.getLogger("http")
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start = time.time()
-
-    body = await request.body()
-    logger.info(
-        f"➡️ REQUEST {request.method} {request.url}\n"
-        f"Headers: {dict(request.headers)}\n"
-        f"Body: {body.decode('utf-8', errors='ignore')}"
-    )
-
-    response = await call_next(request)
-
-    duration = (time.time() - start) * 1000
-    logger.info(
-        f"✅ RESPONSE {request.method} {request.url}\n"
-        f"Status: {response.status_code}\n"
-        f"Time: {duration:.2f}ms"
-    )
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (latency, errors, rows read, cache hit ratios)"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
-    return response
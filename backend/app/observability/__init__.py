@@ -0,0 +1 @@
+"""Request logging, metrics and tracing"""
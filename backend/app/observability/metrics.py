@@ -0,0 +1,299 @@
+"""
+In-process metrics registry
+
+Counters, gauges and fixed-bucket histograms keyed by label values. Everything is kept
+in memory behind one lock; recording is a dict lookup plus a bisect, so it is
+cheap enough for every request.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.observability.tracing import span
+
+# Seconds; covers fast cache hits through slow Sheets round trips
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Cumulative-on-read histogram: per label set, bucket counts + sum + count"""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts (+inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """labels -> {"buckets": [(upper_bound, cumulative_count)], "sum", "count"}"""
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        out = {}
+        for labels, counts, total, count in items:
+            cumulative, running = [], 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                cumulative.append((bound, running))
+            out[labels] = {"buckets": cumulative, "sum": total, "count": count}
+        return out
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """Upper bucket bound containing the q-quantile (None if no data)."""
+        snap = self.snapshot().get(labels)
+        if not snap or not snap["count"]:
+            return None
+        target = q * snap["count"]
+        for bound, cumulative in snap["buckets"]:
+            if cumulative >= target:
+                return bound
+        return None
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str]):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge:
+    """Point-in-time value per label set; set() it, or pass collect() to read it at scrape time"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str],
+        collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._collect = collect
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        if self._collect is not None:
+            return dict(self._collect())
+        with self._lock:
+            return dict(self._values)
+
+
+class MetricsRegistry:
+    """Name -> metric; get-or-create so modules can declare metrics at import time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, description, label_names, buckets)
+            return metric
+
+    def counter(self, name: str, description: str, label_names: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(name, description, label_names)
+            return metric
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None,
+    ) -> Gauge:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Gauge(name, description, label_names, collect)
+            elif collect is not None:
+                metric._collect = collect  # newest owner reports (e.g. a re-created singleton)
+            return metric
+
+    def all(self) -> List[object]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+# Singleton instance
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get singleton MetricsRegistry instance"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+# -----------------------------
+# Backend instrumentation helpers
+# -----------------------------
+class _Call:
+    """Handle yielded by backend_call(); mark a non-raising failure with fail()."""
+
+    __slots__ = ("ok",)
+
+    def __init__(self):
+        self.ok = True
+
+    def fail(self) -> None:
+        self.ok = False
+
+
+@contextmanager
+def backend_call(backend: str, op: str, target: str = "") -> Iterator[_Call]:
+    """
+    Time one call to an external backend (sheets / firestore / fcm / whatsapp).
+    Exceptions and fail() both count as errors. Also opens a trace span.
+    """
+    registry = get_metrics_registry()
+    call = _Call()
+    start = time.perf_counter()
+    try:
+        with span(f"{backend}.{op}", target=target) as s:
+            try:
+                yield call
+            finally:
+                if s is not None and not call.ok:
+                    s.error = s.error or "failed"
+    except BaseException:
+        call.ok = False
+        raise
+    finally:
+        registry.histogram(
+            "backend_request_duration_seconds",
+            "Latency of calls to external backends",
+            ("backend", "op", "target"),
+        ).observe(time.perf_counter() - start, backend, op, target)
+        if not call.ok:
+            registry.counter(
+                "backend_request_errors_total",
+                "Failed calls to external backends",
+                ("backend", "op", "target"),
+            ).inc(backend, op, target)
+
+
+def record_rows_read(sheet: str, rows: int) -> None:
+    get_metrics_registry().counter(
+        "sheets_rows_read_total", "Rows returned by Sheets reads", ("sheet",)
+    ).inc(sheet, amount=rows)
+
+
+def record_coalesced(backend: str, op: str, target: str = "") -> None:
+    """A read that joined an identical in-flight call instead of making its own."""
+    get_metrics_registry().counter(
+        "backend_requests_coalesced_total",
+        "Backend reads served by an identical in-flight call",
+        ("backend", "op", "target"),
+    ).inc(backend, op, target)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    get_metrics_registry().counter(
+        "cache_requests_total", "In-process cache lookups", ("cache", "result")
+    ).inc(cache, "hit" if hit else "miss")
+
+
+# -----------------------------
+# Prometheus text exposition
+# -----------------------------
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [
+        f'{n}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for n, v in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render_prometheus() -> str:
+    """All registered metrics in Prometheus text format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in sorted(get_metrics_registry().all(), key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        if isinstance(metric, Histogram):
+            lines.append(f"# TYPE {metric.name} histogram")
+            for labels, snap in sorted(metric.snapshot().items()):
+                for bound, cumulative in snap["buckets"]:
+                    le = f'le="{_fmt(bound)}"'
+                    lines.append(f"{metric.name}_bucket{_labels(metric.label_names, labels, le)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_labels(metric.label_names, labels)} {snap['sum']!r}")
+                lines.append(f"{metric.name}_count{_labels(metric.label_names, labels)} {snap['count']}")
+        elif isinstance(metric, Counter):
+            lines.append(f"# TYPE {metric.name} counter")
+            for labels, value in sorted(metric.snapshot().items()):
+                lines.append(f"{metric.name}{_labels(metric.label_names, labels)} {_fmt(value)}")
+        elif isinstance(metric, Gauge):
+            lines.append(f"# TYPE {metric.name} gauge")
+            for labels, value in sorted(metric.snapshot().items()):
+                lines.append(f"{metric.name}{_labels(metric.label_names, labels)} {_fmt(value)}")
+
+    # Derived gauge so dashboards don't need to compute it
+    cache = get_metrics_registry().counter(
+        "cache_requests_total", "In-process cache lookups", ("cache", "result")
+    ).snapshot()
+    names = sorted({labels[0] for labels in cache})
+    if names:
+        lines.append("# HELP cache_hit_ratio Hits / lookups per in-process cache since start")
+        lines.append("# TYPE cache_hit_ratio gauge")
+        for name in names:
+            hits = cache.get((name, "hit"), 0.0)
+            total = hits + cache.get((name, "miss"), 0.0)
+            lines.append(f'cache_hit_ratio{{cache="{name}"}} {(hits / total if total else 0.0)!r}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,105 @@
+"""
+Request logging middleware (pure ASGI)
+
+Wraps receive/send instead of reading the request into memory, so uploads
+stream straight through to the route. Each request produces one structured log
+line and one observation in the per-route latency histogram. Bodies are only
+sampled (up to a byte cap) for explicitly configured route prefixes.
+"""
+
+import logging
+import time
+from typing import Iterable, Optional
+
+from app.observability.metrics import get_metrics_registry
+
+logger = logging.getLogger("http")
+
+# Never sample these, even on configured routes
+_UNSAMPLED_CONTENT_TYPES = ("multipart/", "image/", "application/octet-stream")
+
+
+def _route_template(scope) -> str:
+    """'/api/complaints/{complaint_id}/status' rather than the raw path (bounded label set)."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+class RequestLoggingMiddleware:
+    def __init__(
+        self,
+        app,
+        sample_body_routes: Iterable[str] = (),
+        sample_body_bytes: int = 1024,
+    ):
+        self.app = app
+        self.sample_body_routes = tuple(p for p in sample_body_routes if p)
+        self.sample_body_bytes = sample_body_bytes
+        self.latency = get_metrics_registry().histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route",
+            ("method", "route", "status"),
+        )
+
+    def _should_sample(self, scope) -> bool:
+        if not self.sample_body_routes or not scope["path"].startswith(self.sample_body_routes):
+            return False
+        for name, value in scope.get("headers") or ():
+            if name == b"content-type":
+                return not value.decode("latin-1").lower().startswith(_UNSAMPLED_CONTENT_TYPES)
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        sample: Optional[bytearray] = bytearray() if self._should_sample(scope) else None
+        cap = self.sample_body_bytes
+        state = {"status": 500, "req_bytes": 0, "resp_bytes": 0, "ttfb": None}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                state["req_bytes"] += len(chunk)
+                if sample is not None and len(sample) < cap:
+                    sample.extend(chunk[: cap - len(sample)])
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["ttfb"] = time.perf_counter() - start
+            elif message["type"] == "http.response.body":
+                state["resp_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = _route_template(scope)
+            status = state["status"]
+            self.latency.observe(duration, scope["method"], route, str(status))
+
+            client = scope.get("client")
+            ttfb = state["ttfb"]
+            fields = (
+                f"HTTP_REQUEST | method={scope['method']} route={route} path={scope['path']} "
+                f"status={status} duration_ms={duration * 1000:.1f} "
+                f"ttfb_ms={(ttfb * 1000 if ttfb is not None else duration * 1000):.1f} "
+                f"req_bytes={state['req_bytes']} resp_bytes={state['resp_bytes']} "
+                f"client={client[0] if client else '-'}"
+            )
+            if sample is not None:
+                truncated = state["req_bytes"] > len(sample)
+                fields += f" body_sample={bytes(sample).decode('utf-8', errors='replace')!r}"
+                if truncated:
+                    fields += " body_truncated=true"
+            if status >= 500:
+                logger.warning(fields)
+            else:
+                logger.info(fields)
@@ -0,0 +1,346 @@
+"""
+Lightweight per-request tracing
+
+Spans follow the OpenTelemetry data model (128-bit trace id, 64-bit span ids,
+parent links, attributes, OK/ERROR status) and accept/emit W3C `traceparent`,
+so exported traces can be loaded into OTel tooling. Nothing is sent over the
+network: finished traces are written to the console or a JSONL file.
+
+- TracingMiddleware opens the root span and binds a request id that every log
+  line carries (see install_log_record_factory).
+- span() / traced / trace_methods add router -> service -> backend hops; the
+  backend hop comes for free from metrics.backend_call().
+- Requests slower than TRACE_SLOW_REQUEST_MS log their whole span tree.
+
+Outside a request (background threads, timers) span() is a no-op.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("trace")
+
+# Bound memory for pathological requests (e.g. a loop issuing thousands of reads)
+MAX_SPANS_PER_TRACE = 500
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_otel(self) -> Dict[str, Any]:
+        """OTLP/JSON span shape"""
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": k, "value": {"stringValue": str(v)}} for k, v in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+class Trace:
+    """All spans of one request"""
+
+    def __init__(self, trace_id: str, request_id: str, remote_parent_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.request_id = request_id
+        self.remote_parent_id = remote_parent_id
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()  # spans may finish on worker threads
+
+    def add(self, span: Span) -> bool:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped += 1
+                return False
+            self.spans.append(span)
+            return True
+
+    def render_tree(self) -> str:
+        """Indented span tree with durations (for slow-request logs)."""
+        with self._lock:
+            spans = list(self.spans)
+        children: Dict[Optional[str], List[Span]] = {}
+        ids = {s.span_id for s in spans}
+        for s in spans:
+            parent = s.parent_id if s.parent_id in ids else None
+            children.setdefault(parent, []).append(s)
+
+        lines: List[str] = []
+
+        def _walk(parent: Optional[str], depth: int) -> None:
+            for s in sorted(children.get(parent, []), key=lambda x: x.start_ns):
+                attrs = " ".join(f"{k}={v}" for k, v in s.attributes.items())
+                status = f" ERROR={s.error}" if s.error else ""
+                lines.append(f"{'  ' * depth}{s.name} {s.duration_ms:.1f}ms {attrs}{status}".rstrip())
+                _walk(s.span_id, depth + 1)
+
+        _walk(None, 0)
+        if self.dropped:
+            lines.append(f"... {self.dropped} span(s) dropped")
+        return "\n".join(lines)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+def current_request_id() -> str:
+    trace = _current_trace.get()
+    return trace.request_id if trace else "-"
+
+
+# -----------------------------
+# Span API
+# -----------------------------
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current one; yields None (and records nothing) outside a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    s = Span(trace, name, parent.span_id if parent else trace.remote_parent_id, attributes)
+    if not trace.add(s):
+        yield None
+        return
+
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: run a sync or async function inside a span."""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(cls):
+    """
+    Class decorator: wrap every public method (including staticmethods) in a
+    span named Class.method. Generators are left alone; a span would only
+    time their creation.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_"):
+            continue
+        is_static = isinstance(value, staticmethod)
+        fn = value.__func__ if is_static else value
+        if not inspect.isfunction(fn) or inspect.isgeneratorfunction(fn):
+            continue
+        wrapped = traced(f"{cls.__name__}.{attr}")(fn)
+        setattr(cls, attr, staticmethod(wrapped) if is_static else wrapped)
+    return cls
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    Bind fn to a copy of the current context, so spans it opens on a
+    ThreadPoolExecutor/threading worker attach to this request's trace.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# -----------------------------
+# Log correlation
+# -----------------------------
+_log_factory_installed = False
+
+
+def install_log_record_factory() -> None:
+    """Give every LogRecord a request_id attribute (usable as %(request_id)s)."""
+    global _log_factory_installed
+    if _log_factory_installed:
+        return
+    previous = logging.getLogRecordFactory()
+
+    def factory(*args, **kwargs):
+        record = previous(*args, **kwargs)
+        record.request_id = current_request_id()
+        return record
+
+    logging.setLogRecordFactory(factory)
+    _log_factory_installed = True
+
+
+# -----------------------------
+# Export
+# -----------------------------
+class TraceExporter:
+    """Writes finished traces as one OTLP-shaped JSON line each ("console" or "file")."""
+
+    def __init__(self, mode: str = "", path: str = "traces.jsonl"):
+        self.mode = (mode or "").strip().lower()
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("console", "file")
+
+    def export(self, trace: Trace) -> None:
+        if not self.enabled:
+            return
+        with trace._lock:
+            spans = [s.to_otel() for s in trace.spans]
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "gateflow-backend"}}]},
+                "scopeSpans": [{"scope": {"name": "app.observability.tracing"}, "spans": spans}],
+            }],
+        }, separators=(",", ":"))
+        if self.mode == "console":
+            logger.info(f"TRACE_EXPORT | {line}")
+            return
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"TRACE_EXPORT_FAIL | path={self.path} err={e}")
+
+
+# -----------------------------
+# ASGI middleware
+# -----------------------------
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class TracingMiddleware:
+    """
+    Root span per HTTP request. Continues an incoming W3C traceparent, uses a
+    sane incoming X-Request-ID (else the trace id) and echoes it back.
+    """
+
+    def __init__(
+        self,
+        app,
+        exporter: Optional[TraceExporter] = None,
+        sample_rate: float = 0.0,
+        slow_request_ms: float = 1000.0,
+    ):
+        self.app = app
+        self.exporter = exporter or TraceExporter()
+        self.sample_rate = sample_rate
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, remote_parent = None, None
+        match = _TRACEPARENT_RE.match((_header(scope, b"traceparent") or "").strip())
+        if match:
+            trace_id, remote_parent = match.group(1), match.group(2)
+        trace_id = trace_id or os.urandom(16).hex()
+        request_id = (_header(scope, b"x-request-id") or "").strip()
+        if not _REQUEST_ID_RE.match(request_id):
+            request_id = trace_id
+
+        trace = Trace(trace_id, request_id, remote_parent)
+        root: Optional[Span] = None
+        trace_token = _current_trace.set(trace)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+                if root is not None:
+                    root.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        try:
+            with span(f"HTTP {scope['method']}", **{"http.method": scope["method"], "http.target": scope["path"]}) as root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            if root is not None:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"HTTP {scope['method']} {route}"
+                    root.set_attribute("http.route", route)
+                self._finish(trace, root)
+            _current_trace.reset(trace_token)
+
+    def _finish(self, trace: Trace, root: Span) -> None:
+        duration_ms = root.duration_ms
+        slow = duration_ms >= self.slow_request_ms
+        if slow:
+            logger.warning(
+                f"SLOW_REQUEST | request_id={trace.request_id} trace_id={trace.trace_id} "
+                f"name={root.name!r} duration_ms={duration_ms:.1f} spans={len(trace.spans)}\n"
+                f"{trace.render_tree()}"
+            )
+        if slow or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            self.exporter.export(trace)
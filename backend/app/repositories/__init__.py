@@ -0,0 +1 @@
+"""Storage repositories (one per entity) over Google Sheets or SQLite"""
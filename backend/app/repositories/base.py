@@ -0,0 +1,232 @@
+"""
+Repository interfaces
+
+Services talk to storage only through these, one repository per entity,
+bundled in a Repositories object (see app/repositories/storage.py for how the
+backend is chosen). Every method returns plain dicts shaped like the Sheets
+rows (header names as keys, string values), whichever backend is behind it,
+so service caches and response mappers don't care where the data lives.
+
+Filtering semantics match what the Sheets readers always did: flats and
+guards are "active" only when active == TRUE; residents and admins also
+accept a blank active value; flat_no lookups on visitors, residents and
+complaints are tolerant (see rows.normalize_flat_no).
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from app.observability.tracing import propagate
+
+
+class FlatRepository:
+    """Flats tab: flat_id, society_id, flat_no, resident_name, ..., active"""
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        """Active flats, optionally of one society."""
+        raise NotImplementedError
+
+    def get(self, flat_id: str, active_only: bool = False) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_by_no(self, society_id: str, flat_no: str, active_only: bool = False) -> Optional[Dict]:
+        """First flat whose flat_no matches (case-insensitive, trimmed)."""
+        raise NotImplementedError
+
+
+class GuardRepository:
+    """Guards tab: guard_id, society_id, guard_name, pin, active"""
+
+    def list(self, society_id: Optional[str] = None, raise_on_error: bool = False) -> List[Dict]:
+        """
+        Active guards, optionally of one society. raise_on_error: storage errors
+        propagate instead of reading as "no guards".
+        """
+        raise NotImplementedError
+
+    def get(self, guard_id: str) -> Optional[Dict]:
+        """The guard if it exists and is active."""
+        raise NotImplementedError
+
+    def get_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        """An active guard and the active flats of their society ((None, []) if no such guard)."""
+        raise NotImplementedError
+
+    async def aget_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, propagate(self.get_with_society_flats), guard_id)
+
+
+class VisitorRepository:
+    """Visitors tab (append-mostly; status is updated in place)"""
+
+    def list(
+        self,
+        society_id: Optional[str] = None,
+        flat_id: Optional[str] = None,
+        flat_no: Optional[str] = None,
+        guard_id: Optional[str] = None,
+    ) -> List[Dict]:
+        """Visitors matching every given filter, newest first."""
+        raise NotImplementedError
+
+    def list_by_flat(
+        self,
+        society_id: str,
+        flat_no: str,
+        status: str = "PENDING",
+        limit: int = 50,
+    ) -> List[Dict]:
+        """
+        Visitors of one flat, newest first.
+        status: a status, "ALL_NON_PENDING" or "ALL"
+        """
+        raise NotImplementedError
+
+    def create(self, visitor: Dict) -> Dict:
+        raise NotImplementedError
+
+    def update_status(
+        self,
+        visitor_id: str,
+        status: str,
+        approved_at: str,
+        approved_by: str,
+        note: str = "",
+    ) -> Optional[Dict]:
+        """The updated visitor, None if there is no such visitor."""
+        raise NotImplementedError
+
+
+class ResidentRepository:
+    """Residents tab: resident_id, society_id, flat_no, resident_name, resident_phone, ..."""
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        """Active, WhatsApp-opted-in residents, optionally of one society."""
+        raise NotImplementedError
+
+    def get_by_flat_no(
+        self,
+        society_id: str,
+        flat_no: str,
+        active_only: bool = True,
+        whatsapp_opt_in_only: bool = True,
+    ) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_by_phone_and_pin(
+        self,
+        society_id: str,
+        phone: str,
+        pin: str,
+        active_only: bool = True,
+    ) -> Optional[Dict]:
+        """Phones compare digits-only; the PIN compares in constant time."""
+        raise NotImplementedError
+
+    def upsert_fcm_token(self, society_id: str, flat_no: str, resident_id: str, fcm_token: str) -> bool:
+        raise NotImplementedError
+
+    def update_profile(
+        self,
+        resident_id: str,
+        society_id: str,
+        flat_no: str,
+        resident_name: Optional[str] = None,
+        resident_phone: Optional[str] = None,
+    ) -> bool:
+        raise NotImplementedError
+
+    def update_image(self, resident_id: str, society_id: str, flat_no: str, image_path: str) -> bool:
+        raise NotImplementedError
+
+
+class AdminRepository:
+    """Admins tab: admin_id, society_id, admin_name, phone, pin, role, active"""
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        """Active admins, optionally of one society."""
+        raise NotImplementedError
+
+    def create(
+        self,
+        society_id: str,
+        admin_id: str,
+        admin_name: str,
+        pin: str,
+        phone: Optional[str] = None,
+        role: str = "ADMIN",
+    ) -> Dict:
+        """Raises ValueError if the admin_id is taken in the society."""
+        raise NotImplementedError
+
+    def update_image(self, admin_id: str, society_id: str, image_path: str) -> bool:
+        raise NotImplementedError
+
+
+class ComplaintRepository:
+    """Complaints tab (no deletes)"""
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        """Complaints of one society (None = every society), in storage order."""
+        raise NotImplementedError
+
+    def create(self, complaint: Dict) -> Dict:
+        """Store a new complaint; returns it as list() would."""
+        raise NotImplementedError
+
+    def update(self, complaint_id: str, changes: Dict) -> Optional[Dict]:
+        """Apply changes to one complaint; the updated complaint, None if not found."""
+        raise NotImplementedError
+
+
+class NoticeRepository:
+    """Notices tab; deleted notices never come back from list()"""
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    def create(self, notice: Dict) -> None:
+        raise NotImplementedError
+
+    def update(self, notice_id: str, changes: Dict) -> Optional[Dict]:
+        """The updated notice, None if not found (or deleted)."""
+        raise NotImplementedError
+
+    def delete(self, notice_id: str) -> Optional[Dict]:
+        """The deleted notice, None if not found (or already deleted)."""
+        raise NotImplementedError
+
+    def compact(self) -> int:
+        """Reclaim space left by deletes; returns the number of records removed."""
+        return 0
+
+    def compact_if_due(self) -> int:
+        """compact() only when enough deletes are pending; returns the number of records removed."""
+        return 0
+
+
+class Repositories:
+    """One repository per entity, plus reads that span several of them"""
+
+    name = "base"
+
+    flats: FlatRepository
+    guards: GuardRepository
+    visitors: VisitorRepository
+    residents: ResidentRepository
+    admins: AdminRepository
+    complaints: ComplaintRepository
+    notices: NoticeRepository
+
+    def society_overview(self, society_id: str) -> Dict[str, List[Dict]]:
+        """{"residents", "guards", "flats", "visitors"} of one society (active records, all visitors)."""
+        return {
+            "residents": self.residents.list(society_id=society_id),
+            "guards": self.guards.list(society_id=society_id),
+            "flats": self.flats.list(society_id=society_id),
+            "visitors": self.visitors.list(society_id=society_id),
+        }
+
+    def close(self) -> None:
+        pass
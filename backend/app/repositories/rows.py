@@ -0,0 +1,93 @@
+"""
+Row helpers shared by the storage backends
+
+Both backends hand services the same dict shapes the Sheets tabs produce:
+header names as keys (normalized per tab the way the readers always have),
+string values.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional
+
+# Value written to status/is_active when a notice is deleted
+NOTICE_TOMBSTONE = "DELETED"
+
+
+def raw_headers(raw: List) -> List[str]:
+    """Flats / Visitors: headers used as written"""
+    return list(raw)
+
+
+def lower_headers(raw: List) -> List[str]:
+    """Guards / Residents / Admins / Complaints: "Society_ID" -> "society_id" """
+    return [str(h).strip().lower() for h in raw]
+
+
+def notice_headers(raw: List) -> List[str]:
+    """"Society ID" -> "society_id", "Notice ID" -> "notice_id", etc."""
+    return [str(h).strip().lower().replace(" ", "_") for h in raw]
+
+
+def rows_to_dicts(rows: List[List], normalize: Callable[[List], List[str]]) -> List[Dict]:
+    """Tab values (header row first) -> one dict per row, short rows padded"""
+    if not rows:
+        return []
+    headers = normalize(rows[0])
+    result = []
+    for row in rows[1:]:
+        row = list(row) + [""] * (len(headers) - len(row))
+        result.append(dict(zip(headers, row)))
+    return result
+
+
+def normalize_flat_no(flat_no: Optional[str]) -> str:
+    """
+    Normalize flat numbers for tolerant matching.
+    Examples:
+      "A-101" -> "A101"
+      "a 101" -> "A101"
+      "FLAT_101" -> "101"
+      "flat- A-101" -> "A101"
+    """
+    s = (flat_no or "").strip().upper()
+    s = s.replace("FLAT", "")
+    s = s.replace("_", "")
+    s = s.replace("-", "")
+    s = s.replace(" ", "")
+    return s
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Digits only, so '+91 98765-43210' and '919876543210' index the same."""
+    return re.sub(r"\D", "", str(phone or ""))
+
+
+def is_true(value) -> bool:
+    return str(value or "").strip().lower() == "true"
+
+
+def true_or_blank(value) -> bool:
+    """Residents / admins: a missing active / opt-in value counts as true"""
+    v = str(value or "").strip().lower()
+    return not v or v == "true"
+
+
+def notice_id(notice: Dict) -> str:
+    return (notice.get("notice_id") or notice.get("noticeid") or "").strip()
+
+
+def notice_society(notice: Dict) -> str:
+    return (
+        notice.get("society_id") or
+        notice.get("society id") or
+        notice.get("societyid") or
+        ""
+    ).strip()
+
+
+def is_notice_tombstone(notice: Dict) -> bool:
+    """Soft-deleted rows wait for compaction with status/is_active = DELETED."""
+    return NOTICE_TOMBSTONE in (
+        (notice.get("status") or "").strip().upper(),
+        (notice.get("is_active") or "").strip().upper(),
+    )
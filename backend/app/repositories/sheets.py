@@ -0,0 +1,698 @@
+"""
+Google Sheets repositories
+
+Flats, guards, visitors, residents and admins delegate to SheetsClient, which
+already owns the Sheets-specific machinery for them (residents replica,
+batchGet, single-flight reads, quota governor).
+
+Complaints and notices are edited in place, which on Sheets means addressing
+rows by number. Those repositories keep an id -> (row number, row) index so
+an update or delete doesn't re-read the whole tab; it is evicted when another
+worker writes and after a TTL. Writes touch only the changed cells, after
+re-reading the target row to check it still holds the same id (rows may be
+inserted, deleted or sorted directly in the sheet). Deleted notices are
+tombstoned in place and physically removed in batches by compact(), which
+shifts rows.
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.cache.shared import invalidate, on_invalidate
+from app.config import settings
+from app.repositories.base import (
+    AdminRepository,
+    ComplaintRepository,
+    FlatRepository,
+    GuardRepository,
+    NoticeRepository,
+    Repositories,
+    ResidentRepository,
+    VisitorRepository,
+)
+from app.repositories.rows import (
+    NOTICE_TOMBSTONE,
+    is_notice_tombstone,
+    lower_headers,
+    notice_headers,
+    notice_id,
+    notice_society,
+    rows_to_dicts,
+)
+from app.sheets.client import SheetsClient, get_sheets_client
+from app.sheets.quota import PRIORITY_BULK, sheets_priority
+
+logger = logging.getLogger(__name__)
+
+# Complaints sheet column order used when appending new rows
+COMPLAINT_COLUMNS = [
+    "complaint_id",
+    "society_id",
+    "flat_no",
+    "resident_id",
+    "resident_name",
+    "title",
+    "description",
+    "category",
+    "status",
+    "created_at",
+    "resolved_at",
+    "resolved_by",
+    "admin_response",
+]
+
+
+# -----------------------------
+# Thin adapters over SheetsClient
+# -----------------------------
+class SheetsFlatRepository(FlatRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        return self.client.get_flats(society_id=society_id)
+
+    def get(self, flat_id: str, active_only: bool = False) -> Optional[Dict]:
+        return self.client.get_flat_by_id(flat_id, active_only=active_only)
+
+    def get_by_no(self, society_id: str, flat_no: str, active_only: bool = False) -> Optional[Dict]:
+        return self.client.get_flat_by_no(society_id=society_id, flat_no=flat_no, active_only=active_only)
+
+
+class SheetsGuardRepository(GuardRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+
+    def list(self, society_id: Optional[str] = None, raise_on_error: bool = False) -> List[Dict]:
+        return self.client.get_guards(society_id=society_id, raise_on_error=raise_on_error)
+
+    def get(self, guard_id: str) -> Optional[Dict]:
+        return self.client.get_guard_by_id(guard_id)
+
+    def get_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        return self.client.get_guard_with_society_flats(guard_id)
+
+    async def aget_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        # Native async path: concurrent callers share one in-flight batchGet
+        return await self.client.aget_guard_with_society_flats(guard_id)
+
+
+class SheetsVisitorRepository(VisitorRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+
+    def list(
+        self,
+        society_id: Optional[str] = None,
+        flat_id: Optional[str] = None,
+        flat_no: Optional[str] = None,
+        guard_id: Optional[str] = None,
+    ) -> List[Dict]:
+        return self.client.get_visitors(
+            society_id=society_id, flat_id=flat_id, flat_no=flat_no, guard_id=guard_id,
+        )
+
+    def list_by_flat(
+        self,
+        society_id: str,
+        flat_no: str,
+        status: str = "PENDING",
+        limit: int = 50,
+    ) -> List[Dict]:
+        return self.client.get_visitors_by_flat(
+            society_id=society_id, flat_no=flat_no, status=status, limit=limit,
+        )
+
+    def create(self, visitor: Dict) -> Dict:
+        return self.client.create_visitor(visitor)
+
+    def update_status(
+        self,
+        visitor_id: str,
+        status: str,
+        approved_at: str,
+        approved_by: str,
+        note: str = "",
+    ) -> Optional[Dict]:
+        return self.client.update_visitor_status(
+            visitor_id=visitor_id,
+            status=status,
+            approved_at=approved_at,
+            approved_by=approved_by,
+            note=note,
+        )
+
+
+class SheetsResidentRepository(ResidentRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        return self.client.get_residents(society_id=society_id)
+
+    def get_by_flat_no(
+        self,
+        society_id: str,
+        flat_no: str,
+        active_only: bool = True,
+        whatsapp_opt_in_only: bool = True,
+    ) -> Optional[Dict]:
+        return self.client.get_resident_by_flat_no(
+            society_id=society_id,
+            flat_no=flat_no,
+            active_only=active_only,
+            whatsapp_opt_in_only=whatsapp_opt_in_only,
+        )
+
+    def get_by_phone_and_pin(
+        self,
+        society_id: str,
+        phone: str,
+        pin: str,
+        active_only: bool = True,
+    ) -> Optional[Dict]:
+        return self.client.get_resident_by_phone_and_pin(
+            society_id=society_id, phone=phone, pin=pin, active_only=active_only,
+        )
+
+    def upsert_fcm_token(self, society_id: str, flat_no: str, resident_id: str, fcm_token: str) -> bool:
+        return self.client.upsert_resident_fcm_token(
+            society_id=society_id, flat_no=flat_no, resident_id=resident_id, fcm_token=fcm_token,
+        )
+
+    def update_profile(
+        self,
+        resident_id: str,
+        society_id: str,
+        flat_no: str,
+        resident_name: Optional[str] = None,
+        resident_phone: Optional[str] = None,
+    ) -> bool:
+        return self.client.update_resident_profile(
+            resident_id=resident_id,
+            society_id=society_id,
+            flat_no=flat_no,
+            resident_name=resident_name,
+            resident_phone=resident_phone,
+        )
+
+    def update_image(self, resident_id: str, society_id: str, flat_no: str, image_path: str) -> bool:
+        return self.client.update_resident_image(
+            resident_id=resident_id, society_id=society_id, flat_no=flat_no, image_path=image_path,
+        )
+
+
+class SheetsAdminRepository(AdminRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        return self.client.get_admins(society_id=society_id)
+
+    def create(
+        self,
+        society_id: str,
+        admin_id: str,
+        admin_name: str,
+        pin: str,
+        phone: Optional[str] = None,
+        role: str = "ADMIN",
+    ) -> Dict:
+        return self.client.create_admin(
+            society_id=society_id,
+            admin_id=admin_id,
+            admin_name=admin_name,
+            pin=pin,
+            phone=phone,
+            role=role,
+        )
+
+    def update_image(self, admin_id: str, society_id: str, image_path: str) -> bool:
+        return self.client.update_admin_image(admin_id=admin_id, society_id=society_id, image_path=image_path)
+
+
+# -----------------------------
+# Row-addressed tabs
+# -----------------------------
+class _RowIndex:
+    """
+    id -> (1-based sheet row, padded row) for one tab, plus tombstoned row
+    numbers when the tab soft-deletes. Callers hold `lock` across a lookup
+    and the write that uses its row number.
+    """
+
+    def __init__(
+        self,
+        client: SheetsClient,
+        sheet_name: str,
+        normalize: Callable[[List], List[str]],
+        id_of: Callable[[Dict], str],
+        namespace: str,
+        ttl_sec: int = 300,
+        is_tombstone: Optional[Callable[[Dict], bool]] = None,
+    ):
+        self.client = client
+        self.sheet_name = sheet_name
+        self.namespace = namespace
+        self._normalize = normalize
+        self._id_of = id_of
+        self._is_tombstone = is_tombstone
+        self._ttl_sec = ttl_sec
+        self._index: Optional[Dict] = None
+        self.lock = threading.RLock()
+
+        # Writes (and row shifts) in other workers
+        on_invalidate(namespace, self.evict)
+
+    def build(self, rows: List[List], skip: Optional[Set[int]] = None) -> Dict:
+        """
+        Index tab values. Rows in `skip` are treated as already removed
+        (used after compaction, so later rows move up).
+        """
+        headers = self._normalize(rows[0]) if rows else []
+        index = {
+            "loaded_at": time.time(),
+            "headers": headers,
+            "rows": {},
+            "tombstones": set(),
+        }
+        row_number = 1
+        for idx, row in enumerate(rows[1:] if rows else [], start=2):
+            if skip and idx in skip:
+                continue
+            row_number += 1
+            row = list(row) + [""] * (len(headers) - len(row))
+            record = dict(zip(headers, row))
+            if self._is_tombstone and self._is_tombstone(record):
+                index["tombstones"].add(row_number)
+            record_id = self._id_of(record)
+            if record_id:
+                index["rows"][record_id] = (row_number, row)
+        return index
+
+    def load(self, rows: List[List], skip: Optional[Set[int]] = None) -> Dict:
+        """Swap in an index of freshly read values."""
+        index = self.build(rows, skip=skip)
+        with self.lock:
+            self._index = index
+        return index
+
+    def get(self, force_refresh: bool = False) -> Dict:
+        with self.lock:
+            index = self._index
+            if not force_refresh and index and time.time() - index["loaded_at"] < self._ttl_sec:
+                return index
+            return self.load(self.client._get_sheet_values(self.sheet_name))
+
+    def find(self, record_id: str) -> Tuple[Dict, Optional[Tuple[int, List]]]:
+        """Row for an id from the index, re-reading once on a miss."""
+        with self.lock:
+            index = self.get()
+            found = index["rows"].get(record_id)
+            if found is None:
+                index = self.get(force_refresh=True)
+                found = index["rows"].get(record_id)
+            return index, found
+
+    def headers(self) -> List[str]:
+        """Headers of the loaded index ([] if none is loaded)."""
+        with self.lock:
+            return list(self._index["headers"]) if self._index else []
+
+    def add(self, record_id: str, row_number: Optional[int], row: List) -> None:
+        """Record an appended row (unknown row number: the next find re-reads)."""
+        with self.lock:
+            if self._index is not None and row_number is not None:
+                self._index["rows"][record_id] = (row_number, list(row))
+
+    def update(
+        self,
+        record_id: str,
+        id_header: str,
+        changes: Callable[[Dict, List], Optional[Dict[str, str]]],
+    ) -> Optional[Tuple[Dict, int, List]]:
+        """
+        Write the cells `changes(index, row)` returns ({header: value}; None
+        leaves the record alone) to the record's row, and patch the index.
+
+        Only those cells are written, after checking that the row still holds
+        `record_id` (SheetsClient._update_row_cells): rows inserted, deleted or
+        sorted directly in the sheet force a re-read and one retry instead of
+        overwriting another record. Returns (index, row number, current row),
+        or None if the record is gone or `changes` declined.
+        """
+        with self.lock:
+            index, found = self.find(record_id)
+            for attempt in range(2):
+                if found is None:
+                    return None
+
+                headers = index["headers"]
+                header_map = {h: i for i, h in enumerate(headers)}
+                if id_header not in header_map:
+                    raise ValueError(f"{self.sheet_name} sheet missing '{id_header}' header")
+
+                row_number, row = found
+                changed = changes(index, row)
+                if changed is None:
+                    return None
+
+                # Only columns the sheet has
+                cells = {header_map[k]: v for k, v in changed.items() if k in header_map}
+                current = self.client._update_row_cells(
+                    self.sheet_name, row_number, len(headers), header_map[id_header], record_id, cells,
+                )
+                if current is not None:
+                    index["rows"][record_id] = (row_number, current)
+                    invalidate(self.namespace, record_id, local=False)
+                    return index, row_number, current
+
+                index = self.get(force_refresh=True)
+                found = index["rows"].get(record_id)
+            return None
+
+    def loaded(self) -> Optional[Dict]:
+        """The loaded index, however old (None if none is loaded); never reads."""
+        with self.lock:
+            return self._index
+
+    def evict(self, key: Optional[str] = None, data: Optional[Dict] = None) -> None:
+        with self.lock:
+            self._index = None
+
+
+def _appended_row_number(append_result: Dict) -> Optional[int]:
+    """Row number from values.append's updates.updatedRange (e.g. 'Complaints!A15:M15')."""
+    updated_range = ((append_result or {}).get("updates") or {}).get("updatedRange") or ""
+    m = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(m.group(1)) if m else None
+
+
+def _complaint_id(complaint: Dict) -> str:
+    return (complaint.get("complaint_id") or "").strip()
+
+
+class SheetsComplaintRepository(ComplaintRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+        self._rows = _RowIndex(
+            client, settings.SHEET_COMPLAINTS, lower_headers, _complaint_id, namespace="complaint_rows",
+        )
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        rows = self.client._get_sheet_values(settings.SHEET_COMPLAINTS)
+        # Same read refreshes the row numbers later status updates need
+        self._rows.load(rows)
+        complaints = rows_to_dicts(rows, lower_headers)
+        if society_id:
+            complaints = [c for c in complaints if (c.get("society_id") or "").strip() == society_id]
+        return complaints
+
+    def create(self, complaint: Dict) -> Dict:
+        row_data = [complaint.get(c) or "" for c in COMPLAINT_COLUMNS]
+        result = self.client._append_to_sheet(settings.SHEET_COMPLAINTS, [row_data])
+
+        headers = self._rows.headers() or COMPLAINT_COLUMNS
+        row = row_data + [""] * (len(headers) - len(row_data))
+        self._rows.add(complaint["complaint_id"], _appended_row_number(result), row)
+        return dict(zip(headers, row))
+
+    def update(self, complaint_id: str, changes: Dict) -> Optional[Dict]:
+        updated = self._rows.update(complaint_id, "complaint_id", lambda index, row: changes)
+        if updated is None:
+            return None
+        index, _, row = updated
+        return dict(zip(index["headers"], row))
+
+
+def _notice_row(headers: List, notice: Dict) -> List[str]:
+    """
+    Build a Notices row in the sheet's own header order, tolerating the
+    header spellings the tab has used ("notice_id", "Notice ID", "Created By", ...).
+    """
+    row = []
+    for h in headers:
+        key = (h or "").strip()
+        value = None
+
+        # Try multiple matching strategies
+        # 1. Exact match
+        value = notice.get(key)
+
+        # 2. Case-insensitive match
+        if value is None:
+            for k, v in notice.items():
+                if str(k).strip().lower() == key.lower():
+                    value = v
+                    break
+
+        # 3. Try with spaces replaced by underscores (and vice versa)
+        if value is None:
+            key_variations = [
+                key.replace(" ", "_"),
+                key.replace("_", " "),
+                key.replace(" ", "_").lower(),
+                key.replace("_", " ").lower(),
+            ]
+            for var_key in key_variations:
+                if var_key in notice:
+                    value = notice[var_key]
+                    break
+
+        # 4. Try title case and other case variations
+        if value is None:
+            key_variations = [
+                key.title(),
+                key.upper(),
+                key.lower(),
+                key.capitalize(),
+            ]
+            for var_key in key_variations:
+                if var_key in notice:
+                    value = notice[var_key]
+                    break
+
+        # 5. Special handling for common field name variations
+        if value is None:
+            # Map common variations
+            field_mapping = {
+                "created_by": ["admin_id", "created_by", "admin id", "created by"],
+                "created_by_name": ["admin_name", "created_by_name", "admin name", "created by name"],
+                "pinned": ["pinned", "is_pinned", "is pinned"],
+                "status": ["status", "is_active", "is active", "state"],
+                "expiry_date": ["expiry_date", "expiry date", "expirydate", "expires_at", "expires at"],
+            }
+
+            key_lower = key.lower().replace(" ", "_")
+            for mapped_key, variations in field_mapping.items():
+                if key_lower in variations:
+                    for var_key in variations:
+                        if var_key in notice:
+                            value = notice[var_key]
+                            break
+                    if value:
+                        break
+
+        if value is None:
+            # Log missing header for debugging
+            logger.warning(
+                f"Notice header '{key}' not found in notice_data. "
+                f"Available keys: {list(notice.keys())}"
+            )
+            value = ""  # Default to empty string
+
+        row.append(str(value) if value is not None else "")
+    return row
+
+
+class SheetsNoticeRepository(NoticeRepository):
+    def __init__(self, client: SheetsClient):
+        self.client = client
+        self._rows = _RowIndex(
+            client,
+            settings.SHEET_NOTICES,
+            notice_headers,
+            notice_id,
+            namespace="notice_rows",
+            is_tombstone=is_notice_tombstone,
+        )
+        self._compaction_interval_sec: int = 600  # 10 minutes
+        self._compaction_max_tombstones: int = 25
+        self._last_compaction_at: float = time.time()
+        self._compacting = False
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        rows = self.client._get_sheet_values(settings.SHEET_NOTICES)
+        return [
+            n for n in rows_to_dicts(rows, notice_headers)
+            if (not society_id or notice_society(n) == society_id) and not is_notice_tombstone(n)
+        ]
+
+    def create(self, notice: Dict) -> None:
+        """
+        Writes the row using the Notices sheet headers order.
+        This makes it safe even if columns are added/reordered.
+        """
+        # Read headers first to get the correct column order
+        try:
+            rows = self.client._get_sheet_values(settings.SHEET_NOTICES, "1:1")
+        except Exception as e:
+            logger.error(f"Error reading Notices sheet: {e}")
+            raise ValueError(
+                f"Failed to read sheet '{settings.SHEET_NOTICES}'. "
+                f"Please ensure the sheet exists. Error: {str(e)}"
+            )
+
+        if not rows:
+            raise ValueError(
+                f"Sheet '{settings.SHEET_NOTICES}' is empty or headers are missing. "
+                f"Please ensure the sheet exists with proper headers."
+            )
+
+        headers = rows[0]
+        logger.debug(f"Notices sheet headers: {headers}")
+
+        row = _notice_row(headers, notice)
+        logger.debug(f"Writing notice row with {len(row)} columns: {dict(zip(headers, row))}")
+
+        try:
+            self.client._append_to_sheet(settings.SHEET_NOTICES, [row])
+        except Exception as e:
+            logger.error(f"Error appending to Notices sheet: {e}")
+            logger.error(f"Row data: {row}")
+            logger.error(f"Headers: {headers}")
+            raise Exception(f"Failed to append notice to sheet: {str(e)}")
+
+    def update(self, notice_id: str, changes: Dict) -> Optional[Dict]:
+        def _changes(index: Dict, row: List) -> Optional[Dict]:
+            if is_notice_tombstone(dict(zip(index["headers"], row))):
+                return None
+            return changes
+
+        updated = self._rows.update(notice_id, "notice_id", _changes)
+        if updated is None:
+            return None
+        index, _, row = updated
+        return dict(zip(index["headers"], row))
+
+    def delete(self, notice_id: str) -> Optional[Dict]:
+        """
+        Tombstone the row in place (status / is_active / deleted_at cells only).
+        Row numbers stay stable until compact() removes tombstoned rows in one batch.
+        """
+        def _tombstone(index: Dict, row: List) -> Optional[Dict]:
+            headers = index["headers"]
+            if is_notice_tombstone(dict(zip(headers, row))):
+                return None
+            changes = {h: NOTICE_TOMBSTONE for h in ("status", "is_active") if h in headers}
+            if not changes:
+                raise ValueError("Notices sheet needs a 'status' or 'is_active' column to delete notices")
+            changes["deleted_at"] = datetime.utcnow().isoformat() + "Z"
+            return changes
+
+        with self._rows.lock:
+            index, found = self._rows.find(notice_id)
+            if found is None:
+                logger.warning(f"Notice {notice_id} not found in sheet")
+                return None
+
+            updated = self._rows.update(notice_id, "notice_id", _tombstone)
+            if updated is None:
+                return None
+            index, row_number, row = updated
+            index["tombstones"].add(row_number)
+
+        logger.info(f"NOTICE_TOMBSTONED | notice_id={notice_id} row={row_number}")
+        self._maybe_compact_in_background(index)
+        return dict(zip(index["headers"], row))
+
+    @sheets_priority(PRIORITY_BULK)
+    def compact(self) -> int:
+        """
+        Physically remove tombstoned rows in one batchUpdate and swap in a
+        row index that matches the compacted sheet. Returns rows removed.
+        """
+        with self._rows.lock:
+            rows = self.client._get_sheet_values(settings.SHEET_NOTICES)
+            headers = notice_headers(rows[0]) if rows else []
+            doomed = set()
+            for idx, row in enumerate(rows[1:] if rows else [], start=2):
+                if is_notice_tombstone(dict(zip(headers, row))):
+                    doomed.add(idx)
+
+            if doomed:
+                self.client._delete_rows(settings.SHEET_NOTICES, sorted(doomed))
+            self._rows.load(rows, skip=doomed)
+            self._last_compaction_at = time.time()
+
+        if doomed:
+            # Rows shifted: row numbers cached by other workers are now wrong
+            invalidate("notice_rows", local=False)
+
+        logger.info(f"NOTICE_COMPACTION_DONE | rows_removed={len(doomed)}")
+        return len(doomed)
+
+    def compact_if_due(self) -> int:
+        """
+        compact() if the loaded index has tombstones that piled up or waited a
+        full interval (for a periodic timer: no read when nothing is pending).
+        """
+        index = self._rows.loaded()
+        if index is None or not self._claim_compaction(index):
+            return 0
+        try:
+            return self.compact()
+        finally:
+            with self._rows.lock:
+                self._compacting = False
+
+    def _claim_compaction(self, index: Dict) -> bool:
+        """Whether compaction is due for `index`; marks it as running if so."""
+        with self._rows.lock:
+            if self._compacting or not index["tombstones"]:
+                return False
+            due = time.time() - self._last_compaction_at > self._compaction_interval_sec
+            if not due and len(index["tombstones"]) < self._compaction_max_tombstones:
+                return False
+            self._compacting = True
+            return True
+
+    def _maybe_compact_in_background(self, index: Dict) -> None:
+        """Compact once tombstones pile up or have been waiting a full interval."""
+        if not self._claim_compaction(index):
+            return
+
+        def _run():
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning(f"NOTICE_COMPACTION_FAIL | err={e}")
+            finally:
+                with self._rows.lock:
+                    self._compacting = False
+
+        threading.Thread(target=_run, daemon=True).start()
+
+
+class SheetsRepositories(Repositories):
+    """Every repository over the shared SheetsClient"""
+
+    name = "sheets"
+
+    def __init__(self, client: Optional[SheetsClient] = None):
+        self.client = client or get_sheets_client()
+        self.flats = SheetsFlatRepository(self.client)
+        self.guards = SheetsGuardRepository(self.client)
+        self.visitors = SheetsVisitorRepository(self.client)
+        self.residents = SheetsResidentRepository(self.client)
+        self.admins = SheetsAdminRepository(self.client)
+        self.complaints = SheetsComplaintRepository(self.client)
+        self.notices = SheetsNoticeRepository(self.client)
+
+    def society_overview(self, society_id: str) -> Dict[str, List[Dict]]:
+        # One batchGet for all four tabs
+        return self.client.get_society_overview(society_id)
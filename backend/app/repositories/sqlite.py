@@ -0,0 +1,732 @@
+"""
+Embedded SQLite repositories
+
+For societies whose tabs have outgrown Google Sheets: every lookup the
+services make hits an index instead of scanning a downloaded tab, writes
+are row-level transactions instead of row-number arithmetic, and there is
+no per-minute API quota.
+
+Each table stores the record exactly as the Sheets tab would hand it out
+(a JSON object of header -> string) in `data`, next to the key columns the
+queries filter and sort on (`seq` keeps tab order). Key columns hold the
+same normalizations the Sheets readers apply at query time (tolerant
+flat_no, digits-only phone, active flags), computed once on write.
+
+Connections are per thread, in WAL mode, so readers in several uvicorn
+workers don't block each other or the writer. SQLITE_PATH=":memory:" gives a
+private in-memory database (benchmarks, local checks).
+
+Existing data is copied over with scripts/import_sheets_to_sqlite.py.
+"""
+
+import hmac
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.observability.metrics import backend_call
+from app.observability.tracing import trace_methods
+from app.repositories.base import (
+    AdminRepository,
+    ComplaintRepository,
+    FlatRepository,
+    GuardRepository,
+    NoticeRepository,
+    Repositories,
+    ResidentRepository,
+    VisitorRepository,
+)
+from app.repositories.rows import (
+    is_notice_tombstone,
+    is_true,
+    lower_headers,
+    normalize_flat_no,
+    normalize_phone,
+    notice_headers,
+    notice_id,
+    notice_society,
+    raw_headers,
+    rows_to_dicts,
+    true_or_blank,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flats (
+    seq INTEGER PRIMARY KEY,
+    flat_id TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    flat_no_key TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_flats_id ON flats (flat_id);
+CREATE INDEX IF NOT EXISTS ix_flats_society ON flats (society_id, active);
+CREATE INDEX IF NOT EXISTS ix_flats_flat_no ON flats (society_id, flat_no_key);
+
+CREATE TABLE IF NOT EXISTS guards (
+    seq INTEGER PRIMARY KEY,
+    guard_id TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_guards_id ON guards (guard_id);
+CREATE INDEX IF NOT EXISTS ix_guards_society ON guards (society_id, active);
+
+CREATE TABLE IF NOT EXISTS visitors (
+    seq INTEGER PRIMARY KEY,
+    visitor_id TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    flat_id TEXT NOT NULL,
+    flat_no_key TEXT NOT NULL,
+    guard_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_visitors_id ON visitors (visitor_id);
+CREATE INDEX IF NOT EXISTS ix_visitors_society ON visitors (society_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_visitors_flat_no ON visitors (society_id, flat_no_key, status, created_at);
+CREATE INDEX IF NOT EXISTS ix_visitors_flat_id ON visitors (flat_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_visitors_guard ON visitors (guard_id, created_at);
+
+CREATE TABLE IF NOT EXISTS residents (
+    seq INTEGER PRIMARY KEY,
+    resident_id TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    flat_no_key TEXT NOT NULL,
+    phone_key TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    opted_in INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_residents_society ON residents (society_id, active, opted_in);
+CREATE INDEX IF NOT EXISTS ix_residents_flat_no ON residents (society_id, flat_no_key);
+CREATE INDEX IF NOT EXISTS ix_residents_phone ON residents (society_id, phone_key);
+
+CREATE TABLE IF NOT EXISTS admins (
+    seq INTEGER PRIMARY KEY,
+    admin_id_key TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_admins_society ON admins (society_id, active);
+CREATE INDEX IF NOT EXISTS ix_admins_id ON admins (society_id, admin_id_key);
+
+CREATE TABLE IF NOT EXISTS complaints (
+    seq INTEGER PRIMARY KEY,
+    complaint_id TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_complaints_id ON complaints (complaint_id);
+CREATE INDEX IF NOT EXISTS ix_complaints_society ON complaints (society_id);
+
+CREATE TABLE IF NOT EXISTS notices (
+    seq INTEGER PRIMARY KEY,
+    notice_id TEXT NOT NULL,
+    society_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_notices_id ON notices (notice_id);
+CREATE INDEX IF NOT EXISTS ix_notices_society ON notices (society_id);
+"""
+
+
+def _strip(value: Any) -> str:
+    return str(value or "").strip()
+
+
+def _stored(record: Dict) -> Dict[str, str]:
+    """Values as a sheet round trip would return them (None -> "", everything a string)."""
+    return {k: "" if v is None else str(v) for k, v in record.items()}
+
+
+class SqliteDatabase:
+    """One SQLite file, a connection per thread, and query helpers that record metrics"""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self._busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # ":memory:" is private to one connection, so every thread shares it and
+        # takes turns (shared-cache memory databases use table locks that ignore
+        # busy_timeout); files get a connection per thread and WAL
+        self._memory = path == ":memory:"
+        self._serial = threading.RLock() if self._memory else nullcontext()
+        self._shared: Optional[sqlite3.Connection] = None
+
+        anchor = self.connection()
+        if not self._memory:
+            anchor.execute("PRAGMA journal_mode=WAL")
+        anchor.executescript(SCHEMA)
+        logger.info(f"SQLITE_READY | path={path}")
+
+    def connection(self) -> sqlite3.Connection:
+        conn = self._shared if self._memory else getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self._busy_timeout_ms / 1000,
+                isolation_level=None,  # explicit BEGIN in transaction()
+                check_same_thread=False,
+            )
+            conn.execute(f"PRAGMA busy_timeout={int(self._busy_timeout_ms)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self._memory:
+                self._shared = conn
+            else:
+                self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def query(self, table: str, sql: str, params: Sequence = ()) -> List[Tuple[int, Dict]]:
+        """(seq, record) for every row of `SELECT seq, data ...`"""
+        with self._serial, backend_call("sqlite", "select", table):
+            rows = self.connection().execute(sql, params).fetchall()
+        return [(seq, json.loads(data)) for seq, data in rows]
+
+    @contextmanager
+    def transaction(self, table: str, op: str) -> Iterator[sqlite3.Connection]:
+        """Write transaction; BEGIN IMMEDIATE takes the write lock up front, so read-then-write is safe."""
+        with self._serial, backend_call("sqlite", op, table):
+            conn = self.connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+        self._shared = None
+
+
+class _SqliteTable:
+    """Insert/update/select helpers for one table of (seq, key columns..., data)"""
+
+    table = ""
+    key_columns: Tuple[str, ...] = ()
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def _keys(self, record: Dict) -> Tuple:
+        raise NotImplementedError
+
+    def _select(self, where: str = "", params: Sequence = (), order: str = "seq", limit: Optional[int] = None) -> List[Tuple[int, Dict]]:
+        sql = f"SELECT seq, data FROM {self.table}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.db.query(self.table, sql, params)
+
+    def _first(self, where: str, params: Sequence = ()) -> Optional[Tuple[int, Dict]]:
+        found = self._select(where, params, limit=1)
+        return found[0] if found else None
+
+    def _insert(self, conn: sqlite3.Connection, records: List[Dict]) -> None:
+        columns = ", ".join(self.key_columns + ("data",))
+        marks = ", ".join("?" * (len(self.key_columns) + 1))
+        conn.executemany(
+            f"INSERT INTO {self.table} ({columns}) VALUES ({marks})",
+            [self._keys(r) + (json.dumps(r),) for r in (_stored(r) for r in records)],
+        )
+
+    def _update(self, conn: sqlite3.Connection, seq: int, record: Dict) -> None:
+        assignments = ", ".join(f"{c} = ?" for c in self.key_columns + ("data",))
+        conn.execute(
+            f"UPDATE {self.table} SET {assignments} WHERE seq = ?",
+            self._keys(record) + (json.dumps(_stored(record)), seq),
+        )
+
+    def import_records(self, records: List[Dict]) -> None:
+        """Replace the table's contents (used by the Sheets import)."""
+        with self.db.transaction(self.table, "import") as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+            self._insert(conn, records)
+
+
+@trace_methods
+class SqliteFlatRepository(_SqliteTable, FlatRepository):
+    table = "flats"
+    key_columns = ("flat_id", "society_id", "flat_no_key", "active")
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (
+            _strip(record.get("flat_id")),
+            _strip(record.get("society_id")),
+            _strip(record.get("flat_no")).upper(),
+            int(is_true(record.get("active"))),
+        )
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        if society_id:
+            found = self._select("society_id = ? AND active = 1", (society_id,))
+        else:
+            found = self._select("active = 1")
+        return [r for _, r in found]
+
+    def get(self, flat_id: str, active_only: bool = False) -> Optional[Dict]:
+        found = self._first("flat_id = ?", (_strip(flat_id),))
+        if not found or (active_only and not is_true(found[1].get("active"))):
+            return None
+        return found[1]
+
+    def get_by_no(self, society_id: str, flat_no: str, active_only: bool = False) -> Optional[Dict]:
+        target = _strip(flat_no).upper()
+        if society_id:
+            found = self._first("society_id = ? AND flat_no_key = ?", (society_id, target))
+        else:
+            found = self._first("flat_no_key = ?", (target,))
+        if not found or (active_only and not is_true(found[1].get("active"))):
+            return None
+        return found[1]
+
+
+@trace_methods
+class SqliteGuardRepository(_SqliteTable, GuardRepository):
+    table = "guards"
+    key_columns = ("guard_id", "society_id", "active")
+
+    def __init__(self, db: SqliteDatabase, flats: SqliteFlatRepository):
+        super().__init__(db)
+        self.flats = flats
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (
+            _strip(record.get("guard_id")),
+            _strip(record.get("society_id")),
+            int(is_true(record.get("active"))),
+        )
+
+    def list(self, society_id: Optional[str] = None, raise_on_error: bool = False) -> List[Dict]:
+        # SQLite errors always propagate, whatever raise_on_error says
+        if society_id:
+            found = self._select("society_id = ? AND active = 1", (society_id,))
+        else:
+            found = self._select("active = 1")
+        return [r for _, r in found]
+
+    def get(self, guard_id: str) -> Optional[Dict]:
+        found = self._first("guard_id = ? AND active = 1", (_strip(guard_id),))
+        return found[1] if found else None
+
+    def get_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        guard = self.get(guard_id)
+        if not guard:
+            return None, []
+        return guard, self.flats.list(society_id=guard.get("society_id", ""))
+
+
+@trace_methods
+class SqliteVisitorRepository(_SqliteTable, VisitorRepository):
+    table = "visitors"
+    key_columns = ("visitor_id", "society_id", "flat_id", "flat_no_key", "guard_id", "status", "created_at")
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (
+            _strip(record.get("visitor_id")),
+            _strip(record.get("society_id")),
+            _strip(record.get("flat_id")),
+            normalize_flat_no(record.get("flat_no")),
+            _strip(record.get("guard_id")),
+            _strip(record.get("status")).upper(),
+            record.get("created_at") or "",
+        )
+
+    def list(
+        self,
+        society_id: Optional[str] = None,
+        flat_id: Optional[str] = None,
+        flat_no: Optional[str] = None,
+        guard_id: Optional[str] = None,
+    ) -> List[Dict]:
+        clauses, params = [], []
+        for column, value in (("society_id", society_id), ("guard_id", guard_id), ("flat_id", flat_id)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if flat_no and flat_no.strip():
+            clauses.append("flat_no_key = ?")
+            params.append(normalize_flat_no(flat_no))
+        found = self._select(" AND ".join(clauses), params, order="created_at DESC, seq")
+        return [r for _, r in found]
+
+    def list_by_flat(
+        self,
+        society_id: str,
+        flat_no: str,
+        status: str = "PENDING",
+        limit: int = 50,
+    ) -> List[Dict]:
+        where = "society_id = ? AND flat_no_key = ?"
+        params = [society_id, normalize_flat_no(flat_no)]
+        if status == "ALL_NON_PENDING":
+            where += " AND status != 'PENDING'"
+        elif status != "ALL":
+            where += " AND status = ?"
+            params.append(status.upper())
+        found = self._select(where, params, order="created_at DESC, seq", limit=limit)
+        return [r for _, r in found]
+
+    def create(self, visitor: Dict) -> Dict:
+        with self.db.transaction(self.table, "insert") as conn:
+            self._insert(conn, [visitor])
+        return visitor
+
+    def update_status(
+        self,
+        visitor_id: str,
+        status: str,
+        approved_at: str,
+        approved_by: str,
+        note: str = "",
+    ) -> Optional[Dict]:
+        with self.db.transaction(self.table, "update") as conn:
+            row = conn.execute(
+                "SELECT seq, data FROM visitors WHERE visitor_id = ? ORDER BY seq LIMIT 1", (visitor_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            visitor = json.loads(row[1])
+            visitor.update(status=status, approved_at=approved_at, approved_by=approved_by, note=note)
+            self._update(conn, row[0], visitor)
+        return visitor
+
+
+@trace_methods
+class SqliteResidentRepository(_SqliteTable, ResidentRepository):
+    table = "residents"
+    key_columns = ("resident_id", "society_id", "flat_no_key", "phone_key", "active", "opted_in")
+
+    @staticmethod
+    def _phone_col(record: Dict) -> str:
+        return "phone" if "phone" in record and "resident_phone" not in record else "resident_phone"
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (
+            _strip(record.get("resident_id")),
+            _strip(record.get("society_id")),
+            normalize_flat_no(record.get("flat_no")),
+            normalize_phone(record.get(self._phone_col(record))),
+            int(true_or_blank(record.get("active"))),
+            int(true_or_blank(record.get("whatsapp_opt_in"))),
+        )
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        if society_id:
+            found = self._select("society_id = ? AND active = 1 AND opted_in = 1", (society_id,))
+        else:
+            found = self._select("active = 1 AND opted_in = 1")
+        return [r for _, r in found]
+
+    def _find(
+        self,
+        conn: sqlite3.Connection,
+        society_id: str,
+        flat_no: str,
+        resident_id: Optional[str],
+    ) -> Optional[Tuple[int, Dict]]:
+        """First resident of a flat (+ resident_id if given), inside a write transaction."""
+        rows = conn.execute(
+            "SELECT seq, data FROM residents WHERE society_id = ? AND flat_no_key = ? ORDER BY seq",
+            ((society_id or "").strip(), normalize_flat_no(flat_no)),
+        ).fetchall()
+        for seq, data in rows:
+            r = json.loads(data)
+            if resident_id and _strip(r.get("resident_id")) != _strip(resident_id):
+                continue
+            return seq, r
+        return None
+
+    def get_by_flat_no(
+        self,
+        society_id: str,
+        flat_no: str,
+        active_only: bool = True,
+        whatsapp_opt_in_only: bool = True,
+    ) -> Optional[Dict]:
+        found = self._first(
+            "society_id = ? AND flat_no_key = ?", ((society_id or "").strip(), normalize_flat_no(flat_no)),
+        )
+        if not found:
+            return None
+        r = found[1]
+        if active_only and not true_or_blank(r.get("active")):
+            return None
+        if whatsapp_opt_in_only and not true_or_blank(r.get("whatsapp_opt_in")):
+            return None
+        return r
+
+    def get_by_phone_and_pin(
+        self,
+        society_id: str,
+        phone: str,
+        pin: str,
+        active_only: bool = True,
+    ) -> Optional[Dict]:
+        target_pin = (pin or "").strip()
+        candidates = self._select(
+            "society_id = ? AND phone_key = ?", ((society_id or "").strip(), normalize_phone(phone)),
+        )
+        for _, r in candidates:
+            row_pin = (r.get("resident_pin") or "").strip()
+            if not hmac.compare_digest(row_pin.encode("utf-8"), target_pin.encode("utf-8")):
+                continue
+            if active_only and not true_or_blank(r.get("active")):
+                return None
+            return r
+        return None
+
+    def upsert_fcm_token(self, society_id: str, flat_no: str, resident_id: str, fcm_token: str) -> bool:
+        with self.db.transaction(self.table, "update") as conn:
+            found = self._find(conn, society_id, flat_no, resident_id)
+            if found is None:
+                return False
+            seq, r = found
+            if r.get("fcm_token") == fcm_token:
+                # Same device re-registering on cold start: nothing to write
+                return True
+            r["fcm_token"] = fcm_token
+            self._update(conn, seq, r)
+        return True
+
+    def update_profile(
+        self,
+        resident_id: str,
+        society_id: str,
+        flat_no: str,
+        resident_name: Optional[str] = None,
+        resident_phone: Optional[str] = None,
+    ) -> bool:
+        with self.db.transaction(self.table, "update") as conn:
+            found = self._find(conn, society_id, flat_no, str(resident_id))
+            if found is None:
+                return False
+            seq, r = found
+            if resident_name is not None:
+                r["resident_name"] = resident_name.strip()
+            if resident_phone is not None:
+                r[self._phone_col(r)] = resident_phone.strip()
+            self._update(conn, seq, r)
+        return True
+
+    def update_image(self, resident_id: str, society_id: str, flat_no: str, image_path: str) -> bool:
+        with self.db.transaction(self.table, "update") as conn:
+            found = self._find(conn, society_id, flat_no, str(resident_id))
+            if found is None:
+                return False
+            seq, r = found
+            r["image_path" if "image_path" in r and "profile_image" not in r else "profile_image"] = image_path
+            self._update(conn, seq, r)
+        return True
+
+
+@trace_methods
+class SqliteAdminRepository(_SqliteTable, AdminRepository):
+    table = "admins"
+    key_columns = ("admin_id_key", "society_id", "active")
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (
+            _strip(record.get("admin_id")).lower(),
+            _strip(record.get("society_id")),
+            int(true_or_blank(record.get("active"))),
+        )
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        if society_id:
+            found = self._select("society_id = ? AND active = 1", (society_id,))
+        else:
+            found = self._select("active = 1")
+        return [r for _, r in found]
+
+    def create(
+        self,
+        society_id: str,
+        admin_id: str,
+        admin_name: str,
+        pin: str,
+        phone: Optional[str] = None,
+        role: str = "ADMIN",
+    ) -> Dict:
+        admin_data = {
+            "admin_id": admin_id.strip(),
+            "society_id": society_id.strip(),
+            "admin_name": admin_name.strip(),
+            "phone": (phone or "").strip(),
+            "role": role.strip().upper(),
+            "active": "TRUE",
+        }
+        with self.db.transaction(self.table, "insert") as conn:
+            taken = conn.execute(
+                "SELECT 1 FROM admins WHERE society_id = ? AND admin_id_key = ? LIMIT 1",
+                (admin_data["society_id"], admin_data["admin_id"].lower()),
+            ).fetchone()
+            if taken:
+                raise ValueError(f"Admin with ID '{admin_id}' already exists for this society")
+            self._insert(conn, [{**admin_data, "pin": pin.strip()}])
+
+        logger.info(f"Admin created: {admin_id} for society {society_id}")
+        return admin_data
+
+    def update_image(self, admin_id: str, society_id: str, image_path: str) -> bool:
+        with self.db.transaction(self.table, "update") as conn:
+            rows = conn.execute(
+                "SELECT seq, data FROM admins WHERE society_id = ? AND admin_id_key = ? ORDER BY seq",
+                (society_id, _strip(admin_id).lower()),
+            ).fetchall()
+            for seq, data in rows:
+                a = json.loads(data)
+                if _strip(a.get("admin_id")) != _strip(admin_id):
+                    continue
+                a["image_path" if "image_path" in a and "profile_image" not in a else "profile_image"] = image_path
+                self._update(conn, seq, a)
+                return True
+        return False
+
+
+@trace_methods
+class SqliteComplaintRepository(_SqliteTable, ComplaintRepository):
+    table = "complaints"
+    key_columns = ("complaint_id", "society_id")
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (_strip(record.get("complaint_id")), _strip(record.get("society_id")))
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        if society_id:
+            return [r for _, r in self._select("society_id = ?", (society_id,))]
+        return [r for _, r in self._select()]
+
+    def create(self, complaint: Dict) -> Dict:
+        with self.db.transaction(self.table, "insert") as conn:
+            self._insert(conn, [complaint])
+        return _stored(complaint)
+
+    def update(self, complaint_id: str, changes: Dict) -> Optional[Dict]:
+        with self.db.transaction(self.table, "update") as conn:
+            row = conn.execute(
+                "SELECT seq, data FROM complaints WHERE complaint_id = ? ORDER BY seq LIMIT 1", (complaint_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            complaint = {**json.loads(row[1]), **_stored(changes)}
+            self._update(conn, row[0], complaint)
+        return complaint
+
+
+@trace_methods
+class SqliteNoticeRepository(_SqliteTable, NoticeRepository):
+    """Deletes are real deletes; there are no tombstones to compact"""
+
+    table = "notices"
+    key_columns = ("notice_id", "society_id")
+
+    def _keys(self, record: Dict) -> Tuple:
+        return (notice_id(record), notice_society(record))
+
+    def list(self, society_id: Optional[str] = None) -> List[Dict]:
+        if society_id:
+            return [r for _, r in self._select("society_id = ?", (society_id,))]
+        return [r for _, r in self._select()]
+
+    def create(self, notice: Dict) -> None:
+        # Keep the canonical keys only (notice_id, not "Notice ID" and friends)
+        record = {k: v for k, v in notice.items() if notice_headers([k])[0] == k}
+        with self.db.transaction(self.table, "insert") as conn:
+            self._insert(conn, [record])
+
+    def _find(self, conn: sqlite3.Connection, notice_id: str) -> Optional[Tuple[int, Dict]]:
+        row = conn.execute(
+            "SELECT seq, data FROM notices WHERE notice_id = ? ORDER BY seq LIMIT 1", ((notice_id or "").strip(),),
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def update(self, notice_id: str, changes: Dict) -> Optional[Dict]:
+        with self.db.transaction(self.table, "update") as conn:
+            found = self._find(conn, notice_id)
+            if found is None:
+                return None
+            seq, notice = found
+            notice.update(_stored(changes))
+            self._update(conn, seq, notice)
+        return notice
+
+    def delete(self, notice_id: str) -> Optional[Dict]:
+        with self.db.transaction(self.table, "delete") as conn:
+            found = self._find(conn, notice_id)
+            if found is None:
+                logger.warning(f"Notice {notice_id} not found")
+                return None
+            conn.execute("DELETE FROM notices WHERE seq = ?", (found[0],))
+        logger.info(f"NOTICE_DELETED | notice_id={notice_id}")
+        return found[1]
+
+
+class SqliteRepositories(Repositories):
+    """Every repository over one SQLite database"""
+
+    name = "sqlite"
+
+    def __init__(self, path: Optional[str] = None):
+        self.db = SqliteDatabase(path or settings.SQLITE_PATH)
+        self.flats = SqliteFlatRepository(self.db)
+        self.guards = SqliteGuardRepository(self.db, self.flats)
+        self.visitors = SqliteVisitorRepository(self.db)
+        self.residents = SqliteResidentRepository(self.db)
+        self.admins = SqliteAdminRepository(self.db)
+        self.complaints = SqliteComplaintRepository(self.db)
+        self.notices = SqliteNoticeRepository(self.db)
+
+    def import_tabs(self, tabs: Dict[str, List[List]]) -> Dict[str, int]:
+        """
+        Replace the stored data with Sheets tab values ({tab name: rows incl.
+        header}; tabs not given are left alone). Headers are normalized the
+        way the Sheets readers do it. Returns records imported per tab.
+        """
+        plan = (
+            (settings.SHEET_FLATS, self.flats, raw_headers),
+            (settings.SHEET_GUARDS, self.guards, lower_headers),
+            (settings.SHEET_VISITORS, self.visitors, raw_headers),
+            (settings.SHEET_RESIDENTS, self.residents, lower_headers),
+            (settings.SHEET_ADMINS, self.admins, lower_headers),
+            (settings.SHEET_COMPLAINTS, self.complaints, lower_headers),
+            (settings.SHEET_NOTICES, self.notices, notice_headers),
+        )
+        counts = {}
+        for tab, repo, normalize in plan:
+            if tab not in tabs:
+                continue
+            records = rows_to_dicts(tabs[tab], normalize)
+            if repo is self.notices:
+                records = [n for n in records if not is_notice_tombstone(n)]
+            repo.import_records(records)
+            counts[tab] = len(records)
+        logger.info(f"SQLITE_IMPORT_DONE | path={self.db.path} counts={counts}")
+        return counts
+
+    def close(self) -> None:
+        self.db.close()
@@ -0,0 +1,54 @@
+"""
+Storage backend selection
+
+settings.STORAGE_BACKEND picks where every entity lives:
+- "sheets" (default): the Google Sheets spreadsheet, through SheetsClient
+  (SHEETS_BACKEND=fake swaps in the in-process stand-in as before)
+- "sqlite": an embedded, indexed SQLite file at SQLITE_PATH, for societies
+  whose volume has outgrown Sheets' full-tab reads and per-minute quota
+
+Each backend's module is imported only when selected, so a SQLite
+deployment never loads Google credentials.
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from app.config import settings
+from app.repositories.base import Repositories
+
+logger = logging.getLogger(__name__)
+
+
+# Singleton instance
+_repositories: Optional[Repositories] = None
+_repositories_lock = threading.Lock()
+
+
+def get_repositories() -> Repositories:
+    """Get singleton Repositories, chosen by settings.STORAGE_BACKEND"""
+    global _repositories
+    with _repositories_lock:
+        if _repositories is None:
+            kind = (settings.STORAGE_BACKEND or "sheets").strip().lower()
+            if kind == "sheets":
+                from app.repositories.sheets import SheetsRepositories
+                repositories: Repositories = SheetsRepositories()
+            elif kind == "sqlite":
+                from app.repositories.sqlite import SqliteRepositories
+                repositories = SqliteRepositories(settings.SQLITE_PATH)
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND!r}")
+            _repositories = repositories
+            logger.info(f"STORAGE_BACKEND_READY | backend={repositories.name}")
+        return _repositories
+
+
+def set_repositories(repositories: Optional[Repositories]) -> None:
+    """Swap the storage (benchmarks / local checks); None resets to settings."""
+    global _repositories
+    with _repositories_lock:
+        if _repositories is not None and _repositories is not repositories:
+            _repositories.close()
+        _repositories = repositories
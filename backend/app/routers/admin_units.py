@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException, Header, status
+import json
+
+from fastapi import APIRouter, File, Form, HTTPException, Header, UploadFile, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.services.unit_service import UnitService
 from app.routers.society_requests import _require_super_admin_uid
@@ -22,6 +25,12 @@ class UnitCreate(BaseModel):
 class BulkUnitCreateRequest(BaseModel):
     societyId: str
     units: List[UnitCreate]
+    # "upsert" rewrites every unit; "sync" writes only added/changed/deactivated units
+    mode: Literal["upsert", "sync"] = "upsert"
+    # sync only: deactivate existing units missing from the payload
+    deactivateMissing: bool = True
+    # sync only: compute the diff without writing
+    dryRun: bool = False
 
 
 @router.post("/bulk-create")
@@ -31,10 +40,18 @@ def bulk_create_units(
 ):
     try:
         _require_super_admin_uid(authorization)
-        result = UnitService.bulk_create_units(
-            society_id=payload.societyId,
-            units=[u.dict() for u in payload.units]
-        )
+        if payload.mode == "sync":
+            result = UnitService.sync_units(
+                society_id=payload.societyId,
+                units=[u.dict() for u in payload.units],
+                deactivate_missing=payload.deactivateMissing,
+                dry_run=payload.dryRun,
+            )
+        else:
+            result = UnitService.bulk_create_units(
+                society_id=payload.societyId,
+                units=[u.dict() for u in payload.units]
+            )
         return {
             "success": True,
             "data": result
@@ -48,3 +65,41 @@ def bulk_create_units(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to bulk create units: {e}",
         )
+
+
+@router.post("/bulk-import")
+def bulk_import_units(
+    societyId: str = Form(...),
+    file: UploadFile = File(...),
+    authorization: Optional[str] = Header(default=None),
+):
+    """
+    Import units from a CSV or XLSX file (header row with at least unitId).
+
+    Rows are parsed, validated and written as they stream in. The response is
+    NDJSON: one "error" line per rejected row, periodic "progress" lines and a
+    final "done" summary.
+    """
+    _require_super_admin_uid(authorization)
+
+    society_id = (societyId or "").strip()
+    if not society_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="societyId is required")
+
+    filename = (file.filename or "").lower()
+    content_type = (file.content_type or "").lower()
+    if filename.endswith(".xlsx") or "spreadsheetml" in content_type:
+        rows = UnitService.iter_xlsx_units(file.file)
+    elif filename.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        rows = UnitService.iter_csv_units(file.file)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload a .csv or .xlsx file",
+        )
+
+    events = UnitService.import_units_stream(society_id=society_id, rows=rows)
+    return StreamingResponse(
+        (json.dumps(event) + "\n" for event in events),
+        media_type="application/x-ndjson",
+    )
@@ -3,6 +3,7 @@ Admin API routes
 """
 
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from app.services.admin_service import get_admin_service
@@ -81,6 +82,42 @@ def get_admin_stats(society_id: str):
     return admin_service.get_dashboard_stats(society_id)
 
 
+@router.get("/{society_id}/analytics", response_model=dict)
+def get_visitor_analytics(
+    society_id: str,
+    days: int = 7,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    flat_no: Optional[str] = None,
+):
+    """
+    Visitor trends: hourly arrivals, approval latency and per-flat rejection rates.
+    Range defaults to the last `days` UTC days; `end` is clamped to today and
+    ranges longer than 31 days (the rollup's retention) are rejected.
+    """
+    today = datetime.now(timezone.utc).date()
+    end = min(end or today, today)
+    start = start or end - timedelta(days=max(1, min(days, 31)) - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end"
+        )
+    if (end - start).days >= 31:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date range must be 31 days or less"
+        )
+
+    admin_service = get_admin_service()
+    return admin_service.get_visitor_analytics(
+        society_id=society_id,
+        start=start,
+        end=end,
+        flat_no=flat_no,
+    )
+
+
 @router.get("/residents", response_model=List[dict])
 def get_all_residents(society_id: str):
     """
@@ -2,7 +2,7 @@
 Complaint API routes
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from app.services.complaint_service import get_complaint_service
@@ -82,15 +82,17 @@ def get_resident_complaints(
     society_id: str,
     flat_no: str,
     resident_id: Optional[str] = None,
+    limit: Optional[int] = None,
 ):
     """
-    Get complaints for a specific resident/flat
+    Get complaints for a specific resident/flat (newest first)
     """
     service = get_complaint_service()
     return service.get_resident_complaints(
         society_id=society_id,
         flat_no=flat_no,
         resident_id=resident_id,
+        limit=limit,
     )
 
 
@@ -98,13 +100,34 @@ def get_resident_complaints(
 def get_all_complaints(
     society_id: str,
     status: Optional[str] = None,
+    limit: Optional[int] = None,
 ):
     """
-    Get all complaints for a society (admin view)
+    Get all complaints for a society (admin view, newest first)
     Optionally filter by status: PENDING, IN_PROGRESS, RESOLVED, REJECTED
     """
     service = get_complaint_service()
-    return service.get_all_complaints(society_id=society_id, status=status)
+    return service.get_all_complaints(society_id=society_id, status=status, limit=limit)
+
+
+@router.get("/aging", response_model=dict)
+def get_complaint_aging(
+    society_id: str,
+    category: Optional[str] = None,
+    oldest: int = Query(10, ge=0, le=100),
+):
+    """
+    SLA view for admins: oldest open complaints, open counts per age bucket
+    and mean time-to-resolve, per category
+    """
+    service = get_complaint_service()
+    try:
+        return service.get_complaint_aging(society_id=society_id, category=category, oldest=oldest)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
 
 
 @router.put("/{complaint_id}/status", response_model=ComplaintResponse)
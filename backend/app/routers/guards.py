@@ -2,7 +2,7 @@
 Guard API routes
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from app.models.schemas import GuardLoginRequest, GuardLoginResponse, FlatListResponse
 from app.services.guard_service import get_guard_service
 from app.services.flat_service import get_flat_service
@@ -14,7 +14,7 @@ router = APIRouter()
 
 
 @router.post("/login", response_model=GuardLoginResponse)
-async def guard_login(request: GuardLoginRequest):
+def guard_login(request: GuardLoginRequest, http_request: Request):
     """
     Guard login endpoint
     Authenticates guard using society_id and PIN
@@ -23,7 +23,8 @@ async def guard_login(request: GuardLoginRequest):
     
     guard = guard_service.authenticate(
         society_id=request.society_id,
-        pin=request.pin
+        pin=request.pin,
+        client_id=http_request.client.host if http_request.client else None,
     )
     
     if not guard:
@@ -41,25 +42,21 @@ async def get_guard_society_flats(guard_id: str):
     Get all flats for the guard's society
     Used for flat selection in visitor entry
     """
-    guard_service = get_guard_service()
     flat_service = get_flat_service()
     
-    # Verify guard exists
-    guard = guard_service.get_guard_by_id(guard_id)
-    if not guard:
+    # Verify guard exists and load its society's flats in one batch read
+    flats = await flat_service.aget_flats_for_guard(guard_id)
+    if flats is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Guard not found"
         )
     
-    society_id = guard.get('society_id', '')
-    flats = flat_service.get_flats_by_society(society_id)
-    
     return FlatListResponse(flats=flats, count=len(flats))
 
 
 @router.get("/profile/{guard_id}", response_model=GuardLoginResponse)
-async def get_guard_profile(guard_id: str):
+def get_guard_profile(guard_id: str):
     """
     Get guard profile details by ID.
     Used for dashboard and profile screen initialization.
@@ -2,12 +2,15 @@
 Notice API routes
 """
 
-from fastapi import APIRouter, HTTPException, status
+import logging
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from app.services.notice_service import get_notice_service
 
 router = APIRouter(prefix="/api/notices", tags=["Notices"])
+logger = logging.getLogger(__name__)
 
 
 # -----------------------------
@@ -86,18 +89,33 @@ def create_notice(payload: NoticeCreateRequest):
 
 @router.get("", response_model=List[dict])
 def get_notices(
+    request: Request,
+    response: Response,
     society_id: str,
     active_only: bool = True,
 ):
     """
     Get all notices for a society
     Visible to Guards, Residents, and Admins
+
+    Active notices carry an ETag; send it back as If-None-Match to get a 304
+    when nothing changed.
     """
-    from app.services.notice_service import logger
-    logger.info(f"GET /api/notices called with society_id={society_id}, active_only={active_only}")
     service = get_notice_service()
-    notices = service.get_all_notices(society_id=society_id, active_only=active_only)
-    logger.info(f"GET /api/notices returning {len(notices)} notices")
+    if not active_only:
+        return service.get_all_notices(society_id=society_id, active_only=False)
+
+    try:
+        notices, etag = service.get_active_notices(society_id)
+    except Exception as e:
+        logger.error(f"Error getting notices: {e}", exc_info=True)
+        return []
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
     return notices
 
 
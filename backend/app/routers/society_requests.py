@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import hashlib
 
@@ -5,7 +6,10 @@ from fastapi import APIRouter, Header, HTTPException, status
 from pydantic import BaseModel, Field
 from firebase_admin import firestore
 
+from app.observability.metrics import backend_call
+from app.observability.tracing import propagate
 from app.services.firebase_admin import get_db, verify_id_token
+from app.services.platform_counters_service import get_platform_counters_service
 
 router = APIRouter(prefix="/api/society-requests", tags=["society-requests"])
 
@@ -37,7 +41,8 @@ def _require_super_admin_uid(authorization: Optional[str]) -> str:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token missing uid")
 
     db = get_db()
-    platform_admin = db.collection("platform_admins").document(uid).get()
+    with backend_call("firestore", "get", "platform_admins"):
+        platform_admin = db.collection("platform_admins").document(uid).get()
     if not platform_admin.exists:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Super admin access required")
 
@@ -70,10 +75,11 @@ def list_pending_society_requests(
     )
 
     items = []
-    for s in snaps:
-        data = s.to_dict() or {}
-        data["id"] = s.id
-        items.append(data)
+    with backend_call("firestore", "stream", "society_creation_requests"):
+        for s in snaps:
+            data = s.to_dict() or {}
+            data["id"] = s.id
+            items.append(data)
 
     return {
         "ok": True,
@@ -82,6 +88,9 @@ def list_pending_society_requests(
     }
 
 
+RECENT_SOCIETY_FIELDS = ["name", "code", "city", "state", "active", "createdAt"]
+
+
 @router.get("/dashboard")
 def get_society_requests_dashboard(
     authorization: Optional[str] = Header(default=None),
@@ -89,49 +98,54 @@ def get_society_requests_dashboard(
     _require_super_admin_uid(authorization)
     db = get_db()
 
-    pending_items = []
-    for s in (
-        db.collection("society_creation_requests")
-        .where("status", "==", "PENDING")
-        .limit(100)
-        .stream()
-    ):
-        d = s.to_dict() or {}
-        d["id"] = s.id
-        pending_items.append(d)
-
-    total_societies = 0
-    active_societies = 0
-    recent_societies = []
-
-    for s in (
-        db.collection("societies")
-        .limit(200)
-        .stream()
-    ):
-        total_societies += 1
-        d = s.to_dict() or {}
-        if d.get("active") is True:
-            active_societies += 1
-        recent_societies.append({
-            "id": s.id,
-            "name": d.get("name"),
-            "code": d.get("code"),
-            "city": d.get("city"),
-            "state": d.get("state"),
-            "active": d.get("active") is True,
-            "createdAt": d.get("createdAt"),
-        })
+    societies = db.collection("societies")
+    pending = db.collection("society_creation_requests").where("status", "==", "PENDING")
+    counters = get_platform_counters_service()
+
+    def _recent_societies():
+        recent = []
+        with backend_call("firestore", "stream", "societies"):
+            for s in (
+                societies
+                .select(RECENT_SOCIETY_FIELDS)
+                .order_by("createdAt", direction=firestore.Query.DESCENDING)
+                .limit(20)
+                .stream()
+            ):
+                d = s.to_dict() or {}
+                recent.append({
+                    "id": s.id,
+                    "name": d.get("name"),
+                    "code": d.get("code"),
+                    "city": d.get("city"),
+                    "state": d.get("state"),
+                    "active": d.get("active") is True,
+                    "createdAt": d.get("createdAt"),
+                })
+        return recent
+
+    def _pending_preview():
+        items = []
+        with backend_call("firestore", "stream", "society_creation_requests"):
+            for s in pending.limit(20).stream():
+                d = s.to_dict() or {}
+                d["id"] = s.id
+                items.append(d)
+        return items
+
+    # Independent round trips: issue them together
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        # Summary comes from the cached counters document (no reads while fresh)
+        summary_f = pool.submit(propagate(counters.get_summary))
+        recent_f = pool.submit(propagate(_recent_societies))
+        pending_f = pool.submit(propagate(_pending_preview))
 
     return {
         "ok": True,
-        "summary": {
-            "total_societies": total_societies,
-            "active_societies": active_societies,
-            "pending_requests": len(pending_items),
-        },
-        "pending_requests": pending_items,
-        "recent_societies": recent_societies[:20],
+        "summary": summary_f.result(),
+        # Preview only; the full list is served by /pending
+        "pending_requests": pending_f.result(),
+        "recent_societies": recent_f.result(),
     }
 
 
@@ -231,45 +245,57 @@ def approve_society_request(
         "createdByUid": requester_uid,
     }
 
-    batch = db.batch()
-    batch.set(society_ref, society_doc)
-    batch.set(society_code_ref, {
-        "societyId": proposed_society_id,
-        "active": True,
-        "createdAt": now,
-        "createdByUid": requester_uid,
-    })
-    batch.set(db.collection("societies").document(proposed_society_id).collection("members").document(requester_uid), society_member_doc, merge=True)
-    batch.set(db.collection("members").document(requester_uid), root_member_doc, merge=True)
-    batch.set(db.collection("public_societies").document(proposed_society_id), public_society_doc, merge=True)
-    if requester_phone:
-        batch.set(
-            db.collection("phone_index").document(requester_phone),
-            {
+    counters = get_platform_counters_service()
+    counter_deltas = {"total_societies": 1, "active_societies": 1, "pending_requests": -1}
+
+    @firestore.transactional
+    def _approve(transaction):
+        # Re-check inside the transaction so concurrent approvals can't double count
+        if (req_ref.get(transaction=transaction).to_dict() or {}).get("status") != "PENDING":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request is not pending")
+
+        transaction.set(society_ref, society_doc)
+        transaction.set(society_code_ref, {
+            "societyId": proposed_society_id,
+            "active": True,
+            "createdAt": now,
+            "createdByUid": requester_uid,
+        })
+        transaction.set(db.collection("societies").document(proposed_society_id).collection("members").document(requester_uid), society_member_doc, merge=True)
+        transaction.set(db.collection("members").document(requester_uid), root_member_doc, merge=True)
+        transaction.set(db.collection("public_societies").document(proposed_society_id), public_society_doc, merge=True)
+        if requester_phone:
+            transaction.set(
+                db.collection("phone_index").document(requester_phone),
+                {
+                        "uid": requester_uid,
+                        "societyId": proposed_society_id,
+                        "systemRole": "admin",
+                        "active": True,
+                        "updatedAt": now,
+                    },
+                merge=True,
+            )
+            phone_hash = hashlib.sha256(requester_phone.encode("utf-8")).hexdigest()
+            transaction.set(
+                db.collection("unique_phones").document(phone_hash),
+                {
                     "uid": requester_uid,
-                    "societyId": proposed_society_id,
-                    "systemRole": "admin",
-                    "active": True,
                     "updatedAt": now,
                 },
-            merge=True,
-        )
-        phone_hash = hashlib.sha256(requester_phone.encode("utf-8")).hexdigest()
-        batch.set(
-            db.collection("unique_phones").document(phone_hash),
-            {
-                "uid": requester_uid,
-                "updatedAt": now,
-            },
-            merge=True,
-        )
-    batch.update(req_ref, {
-        "status": "APPROVED",
-        "approvedByUid": approver_uid,
-        "approvedAt": now,
-        "updatedAt": now,
-    })
-    batch.commit()
+                merge=True,
+            )
+        transaction.update(req_ref, {
+            "status": "APPROVED",
+            "approvedByUid": approver_uid,
+            "approvedAt": now,
+            "updatedAt": now,
+        })
+        counters.transaction_update(transaction, counter_deltas)
+
+    with backend_call("firestore", "transaction", "approve_society_request"):
+        _approve(db.transaction())
+    counters.apply_committed(counter_deltas)
 
     return {
         "ok": True,
@@ -297,13 +323,25 @@ def reject_society_request(
     if req.get("status") != "PENDING":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request is not pending")
 
-    req_ref.update({
-        "status": "REJECTED",
-        "rejectedByUid": approver_uid,
-        "rejectedAt": firestore.SERVER_TIMESTAMP,
-        "updatedAt": firestore.SERVER_TIMESTAMP,
-        "rejectionReason": payload.reason,
-    })
+    counters = get_platform_counters_service()
+    counter_deltas = {"pending_requests": -1}
+
+    @firestore.transactional
+    def _reject(transaction):
+        if (req_ref.get(transaction=transaction).to_dict() or {}).get("status") != "PENDING":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Request is not pending")
+        transaction.update(req_ref, {
+            "status": "REJECTED",
+            "rejectedByUid": approver_uid,
+            "rejectedAt": firestore.SERVER_TIMESTAMP,
+            "updatedAt": firestore.SERVER_TIMESTAMP,
+            "rejectionReason": payload.reason,
+        })
+        counters.transaction_update(transaction, counter_deltas)
+
+    with backend_call("firestore", "transaction", "reject_society_request"):
+        _reject(db.transaction())
+    counters.apply_committed(counter_deltas)
     requester_uid = (req.get("requestedByUid") or "").strip()
     if requester_uid:
         db.collection("members").document(requester_uid).set({
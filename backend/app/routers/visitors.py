@@ -9,6 +9,8 @@ from typing import Optional
 from fastapi import Header
 
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from app.models.schemas import (
     VisitorCreateRequest,
@@ -89,7 +91,8 @@ async def _best_effort_send_whatsapp_approval(
         # ✅ 1) Preferred: lookup resident in Residents sheet (NEW MVP way)
         resident = None
         try:
-            resident = visitor_service.sheets_client.get_resident_by_flat_no(
+            resident = await run_in_threadpool(
+                visitor_service.repos.residents.get_by_flat_no,
                 society_id=society_id,
                 flat_no=target_flat_no,
                 active_only=True,
@@ -103,7 +106,8 @@ async def _best_effort_send_whatsapp_approval(
         # ✅ 2) Fallback: resolve from Flats (if resident_phone exists there)
         if not resident_phone:
             try:
-                flat = visitor_service._resolve_flat(
+                flat = await run_in_threadpool(
+                    visitor_service._resolve_flat,
                     society_id=society_id,
                     flat_id=flat_id,
                     flat_no=target_flat_no,
@@ -172,7 +176,9 @@ async def create_visitor(request: VisitorCreateRequest):
         )
 
     try:
-        visitor = visitor_service.create_visitor(
+        # Storage calls may wait on the Sheets quota governor: keep them off the event loop
+        visitor = await run_in_threadpool(
+            visitor_service.create_visitor,
             flat_id=request.flat_id,
             flat_no=getattr(request, "flat_no", None),
             visitor_type=request.visitor_type,
@@ -260,7 +266,8 @@ async def create_visitor_with_photo(
 
         # ... keep your photo save code exactly same ...
 
-        visitor = visitor_service.create_visitor_with_photo(
+        visitor = await run_in_threadpool(
+            visitor_service.create_visitor_with_photo,
             flat_id=flat_id,
             flat_no=flat_no,
             visitor_type=visitor_type,
@@ -540,11 +547,19 @@ async def test_visitor_notification(request: VisitorNotificationTestRequest):
 
 
 
+def _visitor_list_response(visitor_service, visitors) -> StreamingResponse:
+    """
+    Stream a VisitorListResponse from raw rows (pre-encoded per visitor),
+    instead of building models for FastAPI to validate and serialize again.
+    """
+    return StreamingResponse(visitor_service.encode_visitor_list(visitors), media_type="application/json")
+
+
 @router.get("/today/{guard_id}", response_model=VisitorListResponse)
-async def get_today_visitors(guard_id: str):
+def get_today_visitors(guard_id: str):
     visitor_service = get_visitor_service()
-    visitors = visitor_service.get_visitors_today(guard_id)
-    return VisitorListResponse(visitors=visitors, count=len(visitors))
+    visitors = visitor_service.get_visitors_today_rows(guard_id)
+    return _visitor_list_response(visitor_service, visitors)
 
 
 @router.get(
@@ -552,12 +567,12 @@ async def get_today_visitors(guard_id: str):
     response_model=VisitorListResponse,
     summary="Get visitors by flat no for a guard's society",
 )
-async def get_visitors_by_flat_no(guard_id: str, flat_no: str):
+def get_visitors_by_flat_no(guard_id: str, flat_no: str):
     logger.info(f"🔥 HIT BY_FLAT route | guard_id={guard_id} flat_no={flat_no}")
 
     visitor_service = get_visitor_service()
-    visitors = visitor_service.get_visitors_by_flat_no(guard_id=guard_id, flat_no=flat_no)
-    return VisitorListResponse(visitors=visitors, count=len(visitors))
+    visitors = visitor_service.get_visitors_by_flat_no_rows(guard_id=guard_id, flat_no=flat_no)
+    return _visitor_list_response(visitor_service, visitors)
 
 
 @router.post(
@@ -565,7 +580,7 @@ async def get_visitors_by_flat_no(guard_id: str, flat_no: str):
     response_model=VisitorResponse,
     summary="Update visitor status (APPROVED/REJECTED/LEAVE_AT_GATE)",
 )
-async def update_visitor_status(visitor_id: str, request: VisitorStatusUpdateRequest):
+def update_visitor_status(visitor_id: str, request: VisitorStatusUpdateRequest):
     visitor_service = get_visitor_service()
     updated = visitor_service.update_visitor_status(
         visitor_id=visitor_id,
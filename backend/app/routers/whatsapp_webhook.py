@@ -1,6 +1,7 @@
 import os
 import logging
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from app.services.visitor_service import get_visitor_service
 from app.models.enums import VisitorStatus  # adjust if your enum is elsewhere
@@ -69,7 +70,8 @@ async def receive_webhook(request: Request):
         # IMPORTANT: We must map this click back to visitor_id
         # Best MVP trick: ask resident to click + we fetch latest PENDING for this resident
         visitor_service = get_visitor_service()
-        updated = visitor_service.update_latest_pending_for_resident(
+        updated = await run_in_threadpool(
+            visitor_service.update_latest_pending_for_resident,
             resident_phone=sender_wa,
             status=new_status,
             approved_by=sender_wa,
@@ -2,8 +2,14 @@
 Admin service for managing society operations
 """
 
+from datetime import date
 from typing import Optional, Dict, List
-from app.sheets.client import get_sheets_client
+from fastapi.concurrency import run_in_threadpool
+from app.repositories.storage import get_repositories
+from app.sheets.quota import PRIORITY_BULK, SheetsQuotaError, sheets_priority
+from app.observability.tracing import trace_methods
+from app.services.dashboard_stats_service import get_dashboard_stats_service
+from app.services.visitor_analytics_service import get_visitor_analytics_service
 from app.config import settings
 import logging
 
@@ -15,11 +21,12 @@ def get_admin_service():
     return AdminService()
 
 
+@trace_methods
 class AdminService:
     """Service for admin operations"""
 
     def __init__(self):
-        self.sheets = get_sheets_client()
+        self.repos = get_repositories()
 
     def authenticate(self, society_id: str, admin_id: str, pin: str) -> Optional[Dict]:
         """
@@ -31,7 +38,7 @@ class AdminService:
             pin_norm = (pin or "").strip()
             logger.info(f"[ADMIN_AUTH] society_id={society_id} admin_id={admin_id} pin={pin}")
 
-            admins = self.sheets.get_admins(society_id=society_id)
+            admins = self.repos.admins.list(society_id=society_id)
             logger.info(f"[ADMIN_AUTH] admins_found={len(admins)} sample={admins[:1]}")
 
             for a in admins:
@@ -47,56 +54,17 @@ class AdminService:
                     }
 
             return None
+        except SheetsQuotaError:
+            raise  # a 503 with Retry-After, not "invalid credentials"
         except Exception as e:
             logger.error(f"Admin authentication error: {e}")
             return None
 
 
     def get_dashboard_stats(self, society_id: str) -> Dict:
-        """Get dashboard statistics"""
+        """Get dashboard statistics (served from the materialized stats store)"""
         try:
-            # Get all residents
-            residents = self.sheets.get_residents(society_id=society_id)
-            total_residents = len(residents)
-
-            # Get all guards
-            guards = self.sheets.get_guards(society_id=society_id)
-            total_guards = len(guards)
-
-            # Get all flats
-            flats = self.sheets.get_flats(society_id=society_id)
-            total_flats = len(flats)
-
-            # Get visitors today
-            visitors = self.sheets.get_visitors(society_id=society_id)
-            from datetime import datetime, date
-            today = date.today()
-            visitors_today = []
-            for v in visitors:
-                created_at = v.get("created_at")
-                if created_at:
-                    try:
-                        # Try parsing ISO format
-                        if "T" in str(created_at):
-                            dt = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
-                        else:
-                            dt = datetime.fromisoformat(str(created_at))
-                        if dt.date() == today:
-                            visitors_today.append(v)
-                    except:
-                        pass
-            
-            pending_approvals = len([v for v in visitors_today if (v.get("status") or "").upper() == "PENDING"])
-            approved_today = len([v for v in visitors_today if (v.get("status") or "").upper() == "APPROVED"])
-
-            return {
-                "total_residents": total_residents,
-                "total_guards": total_guards,
-                "total_flats": total_flats,
-                "visitors_today": len(visitors_today),
-                "pending_approvals": pending_approvals,
-                "approved_today": approved_today,
-            }
+            return get_dashboard_stats_service().get_stats(society_id)
         except Exception as e:
             logger.error(f"Error getting dashboard stats: {e}")
             return {
@@ -108,21 +76,40 @@ class AdminService:
                 "approved_today": 0,
             }
 
+    def get_visitor_analytics(
+        self,
+        society_id: str,
+        start: date,
+        end: date,
+        flat_no: Optional[str] = None,
+    ) -> Dict:
+        """Visitor trends for a date range (served from in-memory rollups)"""
+        return get_visitor_analytics_service().get_analytics(
+            society_id=society_id,
+            start=start,
+            end=end,
+            flat_no=flat_no,
+        )
+
+    @sheets_priority(PRIORITY_BULK)
     def get_all_residents(self, society_id: str) -> List[Dict]:
         """Get all residents for society"""
-        return self.sheets.get_residents(society_id=society_id)
+        return self.repos.residents.list(society_id=society_id)
 
+    @sheets_priority(PRIORITY_BULK)
     def get_all_guards(self, society_id: str) -> List[Dict]:
         """Get all guards for society"""
-        return self.sheets.get_guards(society_id=society_id)
+        return self.repos.guards.list(society_id=society_id)
 
+    @sheets_priority(PRIORITY_BULK)
     def get_all_flats(self, society_id: str) -> List[Dict]:
         """Get all flats for society"""
-        return self.sheets.get_flats(society_id=society_id)
+        return self.repos.flats.list(society_id=society_id)
 
+    @sheets_priority(PRIORITY_BULK)
     def get_all_visitors(self, society_id: str, limit: int = 100) -> List[Dict]:
         """Get all visitors for society"""
-        visitors = self.sheets.get_visitors(society_id=society_id)
+        visitors = self.repos.visitors.list(society_id=society_id)
         # Sort by created_at descending and limit
         visitors.sort(
             key=lambda x: x.get("created_at") or "",
@@ -143,7 +130,7 @@ class AdminService:
         Create a new admin account.
         """
         try:
-            return self.sheets.create_admin(
+            return self.repos.admins.create(
                 society_id=society_id,
                 admin_id=admin_id,
                 admin_name=admin_name,
@@ -186,7 +173,8 @@ class AdminService:
             f.write(content)
         
         # Update admin record with image path
-        updated = self.sheets.update_admin_image(
+        updated = await run_in_threadpool(
+            self.repos.admins.update_image,
             admin_id=admin_id,
             society_id=society_id,
             image_path=file_path,
@@ -3,25 +3,220 @@ Complaint service for managing resident complaints
 """
 
 import uuid
-from datetime import datetime
-from typing import Optional, Dict, List
-from app.sheets.client import get_sheets_client
-from app.config import settings
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple
+from app.cache.shared import invalidate, on_invalidate
+from app.repositories.storage import get_repositories
+from app.sheets.quota import SheetsQuotaError
+from app.observability.metrics import record_cache
+from app.observability.tracing import trace_methods
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Statuses that stop the SLA clock
+CLOSED_STATUSES = ("RESOLVED", "REJECTED")
+
+# Upper bounds (days) of the aging buckets; the last bucket is open-ended
+AGING_BUCKETS_DAYS = (1, 3, 7, 14)
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    """Parse the sheet's ISO timestamps ('...Z') into naive UTC datetimes."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None) - dt.utcoffset()
+    return dt
+
+
+def _norm_flat(flat_no: Optional[str]) -> str:
+    """Flat matching used for complaints: case/space/hyphen-insensitive."""
+    return (flat_no or "").strip().upper().replace(" ", "").replace("-", "")
+
+
+def _category(complaint: Dict) -> str:
+    return (complaint.get("category") or "").strip().upper() or "GENERAL"
+
+
+_complaint_service = None
+
 
 def get_complaint_service():
-    """Get complaint service instance"""
-    return ComplaintService()
+    """Get singleton ComplaintService instance (it owns the complaint index)"""
+    global _complaint_service
+    if _complaint_service is None:
+        _complaint_service = ComplaintService()
+    return _complaint_service
 
 
+@trace_methods
 class ComplaintService:
     """Service for complaint operations"""
 
     def __init__(self):
-        self.sheets = get_sheets_client()
+        self.repos = get_repositories()
+
+        # -----------------------------
+        # Complaint index (per society, one storage read per society per TTL)
+        # -----------------------------
+        # society_id -> {"loaded_at", "complaints", sorted buckets...}, least
+        # recently used first (society_id comes from the client, so it is capped)
+        self._societies: "OrderedDict[str, Dict]" = OrderedDict()
+        self._index_ttl_sec: int = 300  # 5 minutes
+        self._index_max_societies: int = 1000
+        # Bumped on every eviction (per society / all): a load that raced with
+        # a write in another worker is served once but not cached
+        self._generation: Dict[str, int] = {}
+        self._generation_all: int = 0
+        self._lock = threading.Lock()
+
+        # Complaint writes in other workers
+        on_invalidate("complaints", self._evict_index)
+
+    # -----------------------------
+    # Index
+    # -----------------------------
+    def _empty_society_bucket(self) -> Dict:
+        return {
+            "loaded_at": time.time(),
+            "complaints": {},  # complaint_id -> complaint dict
+            # sorted ascending by (created_at, complaint_id); walk reversed for newest first
+            "all": [],
+            "by_status": {},  # STATUS -> sorted list
+            "by_flat": {},  # normalized flat_no -> sorted list
+            # SLA tracking: CATEGORY -> sorted list of open complaints (oldest first)
+            "open_by_category": {},
+            # CATEGORY -> [resolved_count, total_seconds_to_resolve]
+            "resolution": {},
+        }
+
+    def _society_generation(self, society_id: str) -> Tuple[int, int]:
+        # Caller holds self._lock
+        return self._generation_all, self._generation.get(society_id, 0)
+
+    def _get_society(self, society_id: str) -> Dict:
+        """
+        Build/return one society's complaint index. Storage is read outside
+        the lock, so other societies (and fresh entries) are never held up
+        behind a slow or quota-throttled read.
+        """
+        with self._lock:
+            entry = self._societies.get(society_id)
+            if entry and time.time() - entry["loaded_at"] < self._index_ttl_sec:
+                self._societies.move_to_end(society_id)
+                record_cache("complaint_index", True)
+                return entry
+            generation = self._society_generation(society_id)
+        record_cache("complaint_index", False)
+
+        entry = self._empty_society_bucket()
+        for complaint in self.repos.complaints.list(society_id=society_id):
+            if (complaint.get("complaint_id") or "").strip():
+                self._index_add(entry, complaint)
+
+        with self._lock:
+            if self._society_generation(society_id) == generation:
+                self._societies[society_id] = entry
+                self._societies.move_to_end(society_id)
+                while len(self._societies) > self._index_max_societies:
+                    self._societies.popitem(last=False)
+        logger.info(
+            f"COMPLAINT_INDEX_REFRESHED | society_id={society_id} complaints={len(entry['complaints'])}"
+        )
+        return entry
+
+    def clear_index(self, society_id: Optional[str] = None) -> None:
+        """Utility to drop the complaint index of one society (or all), e.g. after manual sheet edits."""
+        with self._lock:
+            if society_id:
+                self._societies.pop(society_id, None)
+                self._generation[society_id] = self._generation.get(society_id, 0) + 1
+            else:
+                self._societies.clear()
+                self._generation.clear()
+                self._generation_all += 1
+
+    def _evict_index(self, key: Optional[str] = None, data: Optional[Dict] = None) -> None:
+        # Writes publish their society; anything else drops every society
+        self.clear_index((data or {}).get("society_id") if key else None)
+
+    def _sort_key(self, complaint: Dict) -> Tuple[str, str]:
+        return (complaint.get("created_at") or "", (complaint.get("complaint_id") or "").strip())
+
+    def _buckets(self, society: Dict, complaint: Dict) -> List[List]:
+        status = (complaint.get("status") or "").strip().upper()
+        buckets = [
+            society["all"],
+            society["by_status"].setdefault(status, []),
+            society["by_flat"].setdefault(_norm_flat(complaint.get("flat_no")), []),
+        ]
+        if status not in CLOSED_STATUSES:
+            buckets.append(society["open_by_category"].setdefault(_category(complaint), []))
+        return buckets
+
+    def _resolution_seconds(self, complaint: Dict) -> Optional[float]:
+        """created_at -> resolved_at for RESOLVED complaints (None if not countable)."""
+        if (complaint.get("status") or "").strip().upper() != "RESOLVED":
+            return None
+        created = _parse_ts(complaint.get("created_at"))
+        resolved = _parse_ts(complaint.get("resolved_at"))
+        if not created or not resolved or resolved < created:
+            return None
+        return (resolved - created).total_seconds()
+
+    def _track_resolution(self, society: Dict, complaint: Dict, sign: int) -> None:
+        seconds = self._resolution_seconds(complaint)
+        if seconds is None:
+            return
+        stats = society["resolution"].setdefault(_category(complaint), [0, 0.0])
+        stats[0] += sign
+        stats[1] += sign * seconds
+
+    def _index_add(self, society: Dict, complaint: Dict) -> None:
+        complaint_id = (complaint.get("complaint_id") or "").strip()
+        society["complaints"][complaint_id] = complaint
+        key = self._sort_key(complaint)
+        for bucket in self._buckets(society, complaint):
+            bisect.insort(bucket, key)
+        self._track_resolution(society, complaint, 1)
+
+    def _index_remove(self, society: Dict, complaint_id: str) -> None:
+        complaint = society["complaints"].pop(complaint_id, None)
+        if complaint is None:
+            return
+        key = self._sort_key(complaint)
+        for bucket in self._buckets(society, complaint):
+            i = bisect.bisect_left(bucket, key)
+            if i < len(bucket) and bucket[i] == key:
+                bucket.pop(i)
+        self._track_resolution(society, complaint, -1)
+
+    def _walk(
+        self,
+        society: Dict,
+        bucket: List[Tuple[str, str]],
+        resident_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Newest-first walk over one bucket, stopping after `limit` matches."""
+        result = []
+        for _, complaint_id in reversed(bucket):
+            complaint = society["complaints"][complaint_id]
+            if resident_id and (complaint.get("resident_id") or "").strip() != resident_id:
+                continue
+            result.append(dict(complaint))
+            if limit and len(result) >= limit:
+                break
+        return result
 
     def create_complaint(
         self,
@@ -42,27 +237,7 @@ class ComplaintService:
             created_at = datetime.utcnow().isoformat() + "Z"
             status = "PENDING"
 
-            # Prepare row data
-            row_data = [
-                complaint_id,
-                society_id,
-                flat_no,
-                resident_id,
-                resident_name,
-                title,
-                description,
-                category,
-                status,
-                created_at,
-                "",  # resolved_at
-                "",  # resolved_by
-                "",  # admin_response
-            ]
-
-            # Append to Complaints sheet
-            self.sheets._append_to_sheet(settings.SHEET_COMPLAINTS, [row_data])
-
-            return {
+            complaint = {
                 "complaint_id": complaint_id,
                 "society_id": society_id,
                 "flat_no": flat_no,
@@ -77,6 +252,17 @@ class ComplaintService:
                 "resolved_by": None,
                 "admin_response": None,
             }
+
+            stored = self.repos.complaints.create(complaint)
+
+            # Keep this society's index current without re-reading storage
+            with self._lock:
+                society = self._societies.get(society_id)
+                if society is not None:
+                    self._index_add(society, stored)
+            invalidate("complaints", complaint_id, data={"society_id": society_id}, local=False)
+
+            return complaint
         except Exception as e:
             logger.error(f"Error creating complaint: {e}")
             raise Exception(f"Failed to create complaint: {str(e)}")
@@ -86,84 +272,37 @@ class ComplaintService:
         society_id: str,
         flat_no: str,
         resident_id: Optional[str] = None,
+        limit: Optional[int] = None,
     ) -> List[Dict]:
-        """Get complaints for a specific resident/flat"""
+        """Get complaints for a specific resident/flat (newest first)"""
         try:
-            rows = self.sheets._get_sheet_values(settings.SHEET_COMPLAINTS)
-            if not rows or len(rows) < 2:
-                return []
-
-            headers = [str(h).strip().lower() for h in rows[0]]
-            result = []
-
-            for row in rows[1:]:
-                if len(row) < len(headers):
-                    row.extend([""] * (len(headers) - len(row)))
-
-                complaint = dict(zip(headers, row))
-
-                # Filter by society_id and flat_no
-                if (complaint.get("society_id") or "").strip() != society_id:
-                    continue
-
-                # Normalize flat numbers for comparison (same logic as sheets client)
-                complaint_flat = (complaint.get("flat_no") or "").strip().upper().replace(" ", "").replace("-", "")
-                target_flat = flat_no.strip().upper().replace(" ", "").replace("-", "")
-                if complaint_flat != target_flat:
-                    continue
-
-                # Optional: filter by resident_id
-                if resident_id and (complaint.get("resident_id") or "").strip() != resident_id:
-                    continue
-
-                result.append(complaint)
-
-            # Sort by created_at descending
-            result.sort(
-                key=lambda x: x.get("created_at") or "",
-                reverse=True
-            )
-
-            return result
+            society = self._get_society(society_id)
+            with self._lock:
+                bucket = society["by_flat"].get(_norm_flat(flat_no), [])
+                return self._walk(society, bucket, resident_id=resident_id, limit=limit)
+        except SheetsQuotaError:
+            raise  # a 503 with Retry-After, not an empty result
         except Exception as e:
             logger.error(f"Error getting resident complaints: {e}")
             return []
 
-    def get_all_complaints(self, society_id: str, status: Optional[str] = None) -> List[Dict]:
-        """Get all complaints for a society, optionally filtered by status"""
+    def get_all_complaints(
+        self,
+        society_id: str,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Get all complaints for a society, optionally filtered by status (newest first)"""
         try:
-            rows = self.sheets._get_sheet_values(settings.SHEET_COMPLAINTS)
-            if not rows or len(rows) < 2:
-                return []
-
-            headers = [str(h).strip().lower() for h in rows[0]]
-            result = []
-
-            for row in rows[1:]:
-                if len(row) < len(headers):
-                    row.extend([""] * (len(headers) - len(row)))
-
-                complaint = dict(zip(headers, row))
-
-                # Filter by society_id
-                if (complaint.get("society_id") or "").strip() != society_id:
-                    continue
-
-                # Filter by status if provided
+            society = self._get_society(society_id)
+            with self._lock:
                 if status:
-                    complaint_status = (complaint.get("status") or "").strip().upper()
-                    if complaint_status != status.upper():
-                        continue
-
-                result.append(complaint)
-
-            # Sort by created_at descending
-            result.sort(
-                key=lambda x: x.get("created_at") or "",
-                reverse=True
-            )
-
-            return result
+                    bucket = society["by_status"].get(status.strip().upper(), [])
+                else:
+                    bucket = society["all"]
+                return self._walk(society, bucket, limit=limit)
+        except SheetsQuotaError:
+            raise  # a 503 with Retry-After, not an empty result
         except Exception as e:
             logger.error(f"Error getting all complaints: {e}")
             return []
@@ -179,49 +318,111 @@ class ComplaintService:
         Update complaint status (PENDING, IN_PROGRESS, RESOLVED, REJECTED)
         """
         try:
-            rows = self.sheets._get_sheet_values(settings.SHEET_COMPLAINTS)
-            if not rows or len(rows) < 2:
+            changes = {"status": status}
+            if status.upper() == "RESOLVED":
+                changes["resolved_at"] = datetime.utcnow().isoformat() + "Z"
+            if resolved_by:
+                changes["resolved_by"] = resolved_by
+            if admin_response:
+                changes["admin_response"] = admin_response
+
+            updated = self.repos.complaints.update(complaint_id, changes)
+            if updated is None:
                 return None
 
-            headers = [str(h).strip().lower() for h in rows[0]]
-            header_map = {h: i for i, h in enumerate(headers)}
-
-            if "complaint_id" not in header_map:
-                raise ValueError("Complaints sheet missing 'complaint_id' header")
-
-            for idx, row in enumerate(rows[1:], start=2):
-                if len(row) < len(headers):
-                    row.extend([""] * (len(headers) - len(row)))
-
-                complaint = dict(zip(headers, row))
+            society_id = (updated.get("society_id") or "").strip()
+            with self._lock:
+                society = self._societies.get(society_id)
+                if society is not None:
+                    self._index_remove(society, complaint_id)
+                    self._index_add(society, updated)
+            invalidate("complaints", complaint_id, data={"society_id": society_id}, local=False)
 
-                if (complaint.get("complaint_id") or "").strip() != complaint_id:
-                    continue
-
-                # Update status
-                if "status" in header_map:
-                    row[header_map["status"]] = status
-
-                # Update resolved_at if status is RESOLVED
-                if status.upper() == "RESOLVED" and "resolved_at" in header_map:
-                    row[header_map["resolved_at"]] = datetime.utcnow().isoformat() + "Z"
-
-                # Update resolved_by
-                if resolved_by and "resolved_by" in header_map:
-                    row[header_map["resolved_by"]] = resolved_by
-
-                # Update admin_response
-                if admin_response and "admin_response" in header_map:
-                    row[header_map["admin_response"]] = admin_response
-
-                # Update the row
-                end_col_letter = chr(ord("A") + len(headers) - 1)
-                range_name = f"A{idx}:{end_col_letter}{idx}"
-                self.sheets._update_sheet(settings.SHEET_COMPLAINTS, range_name, [row])
-
-                return dict(zip(headers, row))
-
-            return None
+            return dict(updated)
         except Exception as e:
             logger.error(f"Error updating complaint status: {e}")
             raise Exception(f"Failed to update complaint: {str(e)}")
+
+    # -----------------------------
+    # SLA / aging
+    # -----------------------------
+    def get_complaint_aging(
+        self,
+        society_id: str,
+        category: Optional[str] = None,
+        oldest: int = 10,
+    ) -> Dict:
+        """
+        Aging report for open complaints, per category:
+          - oldest N open complaints
+          - open counts per age bucket (bisect on the pre-sorted open lists)
+          - mean time-to-resolve from resolved_at (running totals)
+        """
+        society = self._get_society(society_id)
+        now = datetime.utcnow()
+
+        # created_at cutoffs, newest first: "< 1d" is everything after now-1d, etc.
+        labels = []
+        lower = 0
+        for upper in AGING_BUCKETS_DAYS:
+            labels.append(f"{lower}-{upper}d")
+            lower = upper
+        labels.append(f"{lower}d+")
+        cutoffs = [
+            ((now - timedelta(days=d)).isoformat() + "Z",) for d in AGING_BUCKETS_DAYS
+        ]
+
+        with self._lock:
+            if category:
+                wanted = [category.strip().upper()]
+            else:
+                wanted = sorted(set(society["open_by_category"]) | set(society["resolution"]))
+
+            categories = {}
+            total_open = 0
+            total_resolved, total_seconds = 0, 0.0
+            for cat in wanted:
+                open_list = society["open_by_category"].get(cat, [])
+                resolved, seconds = society["resolution"].get(cat, [0, 0.0])
+
+                counts = {}
+                newer = len(open_list)
+                for label, cutoff in zip(labels, cutoffs):
+                    boundary = bisect.bisect_left(open_list, cutoff)
+                    counts[label] = newer - boundary
+                    newer = boundary
+                counts[labels[-1]] = newer
+
+                oldest_items = []
+                for created_at, complaint_id in open_list[: max(0, oldest)]:
+                    complaint = society["complaints"][complaint_id]
+                    created = _parse_ts(created_at)
+                    oldest_items.append({
+                        "complaint_id": complaint_id,
+                        "flat_no": complaint.get("flat_no", ""),
+                        "title": complaint.get("title", ""),
+                        "status": complaint.get("status", ""),
+                        "created_at": created_at,
+                        "age_hours": round((now - created).total_seconds() / 3600, 1) if created else None,
+                    })
+
+                categories[cat] = {
+                    "open": len(open_list),
+                    "age_buckets": counts,
+                    "oldest": oldest_items,
+                    "resolved": resolved,
+                    "mean_time_to_resolve_hours": round(seconds / resolved / 3600, 2) if resolved else None,
+                }
+                total_open += len(open_list)
+                total_resolved += resolved
+                total_seconds += seconds
+
+        return {
+            "society_id": society_id,
+            "generated_at": now.isoformat() + "Z",
+            "total_open": total_open,
+            "mean_time_to_resolve_hours": (
+                round(total_seconds / total_resolved / 3600, 2) if total_resolved else None
+            ),
+            "categories": categories,
+        }
@@ -0,0 +1,267 @@
+"""
+Materialized admin dashboard counters
+
+Keeps per-society counts (residents, guards, flats) and per-day visitor counts
+by status in memory, so the admin dashboard is a dictionary read instead of a
+download of four tabs.
+
+- Visitor create / status-change events update the counters incrementally.
+- Every society is reconciled against the sheets periodically (in a background
+  thread once a snapshot exists, so readers never wait on Sheets).
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.cache.shared import on_invalidate
+from app.observability.metrics import record_cache
+from app.observability.tracing import trace_methods
+from app.repositories.storage import get_repositories
+from app.sheets.quota import PRIORITY_BULK, sheets_priority
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_created_day(created_at: Optional[str]) -> Optional[date]:
+    """Day a visitor timestamp falls on (same parsing the dashboard always used)."""
+    if not created_at:
+        return None
+    try:
+        if "T" in str(created_at):
+            dt = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        else:
+            dt = datetime.fromisoformat(str(created_at))
+        return dt.date()
+    except Exception:
+        return None
+
+
+@trace_methods
+class DashboardStatsService:
+    """In-memory per-society stats store"""
+
+    def __init__(self):
+        self.repos = get_repositories()
+
+        # society_id -> snapshot dict (see _empty_snapshot)
+        self._snapshots: Dict[str, Dict] = {}
+        self._reconcile_interval_sec: int = 300  # 5 minutes
+        self._retain_days: int = 7
+
+        self._reconciling: Set[str] = set()
+        # society_id -> events seen while a reconcile for it is in flight
+        self._replay: Dict[str, List[Tuple[str, Dict]]] = {}
+        self._lock = threading.Lock()
+
+        # Visitor events published by other workers
+        on_invalidate("visitor_events", self._on_remote_event)
+
+    def _empty_snapshot(self) -> Dict:
+        return {
+            "reconciled_at": 0.0,
+            "dirty": False,
+            "total_residents": 0,
+            "total_guards": 0,
+            "total_flats": 0,
+            # "YYYY-MM-DD" -> {status: count}
+            "visitors_by_day": {},
+            # visitor_id -> (day_key, status), only for retained days
+            "visitor_index": {},
+        }
+
+    def _oldest_retained_day(self) -> date:
+        return date.today() - timedelta(days=self._retain_days - 1)
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def get_stats(self, society_id: str) -> Dict:
+        """Dashboard numbers for today, reconciling in the background when stale."""
+        with self._lock:
+            snap = self._snapshots.get(society_id)
+
+        record_cache("dashboard_stats", snap is not None)
+        if snap is None:
+            snap = self.reconcile(society_id)
+        elif snap["dirty"] or time.time() - snap["reconciled_at"] > self._reconcile_interval_sec:
+            self._reconcile_in_background(society_id)
+
+        with self._lock:
+            today = snap["visitors_by_day"].get(date.today().isoformat(), {})
+            return {
+                "total_residents": snap["total_residents"],
+                "total_guards": snap["total_guards"],
+                "total_flats": snap["total_flats"],
+                "visitors_today": sum(today.values()),
+                "pending_approvals": today.get("PENDING", 0),
+                "approved_today": today.get("APPROVED", 0),
+            }
+
+    # -----------------------------
+    # Reconciliation
+    # -----------------------------
+    @sheets_priority(PRIORITY_BULK)
+    def reconcile(self, society_id: str) -> Dict:
+        """Rebuild one society's snapshot from the source tabs."""
+        with self._lock:
+            self._replay.setdefault(society_id, [])
+
+        try:
+            snap = self._load_snapshot(society_id)
+        except Exception:
+            with self._lock:
+                self._replay.pop(society_id, None)
+            raise
+
+        with self._lock:
+            for kind, visitor in self._replay.pop(society_id, []):
+                self._apply_event(snap, kind, visitor)
+            self._snapshots[society_id] = snap
+
+        logger.info(
+            f"DASHBOARD_STATS_RECONCILED | society_id={society_id} "
+            f"tracked_visitors={len(snap['visitor_index'])}"
+        )
+        return snap
+
+    def _load_snapshot(self, society_id: str) -> Dict:
+        # On Sheets: one batchGet for all source tabs instead of four sequential reads
+        overview = self.repos.society_overview(society_id)
+
+        snap = self._empty_snapshot()
+        snap["total_residents"] = len(overview["residents"])
+        snap["total_guards"] = len(overview["guards"])
+        snap["total_flats"] = len(overview["flats"])
+
+        oldest = self._oldest_retained_day()
+        for v in overview["visitors"]:
+            day = _parse_created_day(v.get("created_at"))
+            if day is None or day < oldest:
+                continue
+            status = (v.get("status") or "").strip().upper()
+            self._add(snap, day.isoformat(), status, 1)
+            visitor_id = (v.get("visitor_id") or "").strip()
+            if visitor_id:
+                snap["visitor_index"][visitor_id] = (day.isoformat(), status)
+
+        snap["reconciled_at"] = time.time()
+        return snap
+
+    def _reconcile_in_background(self, society_id: str) -> None:
+        with self._lock:
+            if society_id in self._reconciling:
+                return
+            self._reconciling.add(society_id)
+
+        def _run():
+            try:
+                self.reconcile(society_id)
+            except Exception as e:
+                logger.warning(f"DASHBOARD_STATS_RECONCILE_FAIL | society_id={society_id} err={e}")
+            finally:
+                with self._lock:
+                    self._reconciling.discard(society_id)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def invalidate(self, society_id: Optional[str] = None) -> None:
+        """Utility to drop snapshots (useful for testing)."""
+        with self._lock:
+            if society_id:
+                self._snapshots.pop(society_id, None)
+            else:
+                self._snapshots.clear()
+
+    # -----------------------------
+    # Events
+    # -----------------------------
+    def record_visitor_created(self, visitor: Dict) -> None:
+        """Count a newly appended visitor row."""
+        self._record_event("created", visitor)
+
+    def record_visitor_status(self, visitor: Dict) -> None:
+        """Move a visitor between status buckets after an update."""
+        self._record_event("status", visitor)
+
+    def _on_remote_event(self, kind: Optional[str], visitor: Optional[Dict]) -> None:
+        """Another worker's visitor event (kind None: events may have been lost)."""
+        if kind is None or visitor is None:
+            with self._lock:
+                for snap in self._snapshots.values():
+                    snap["dirty"] = True
+            return
+        self._record_event(kind, visitor)
+
+    def _record_event(self, kind: str, visitor: Dict) -> None:
+        society_id = (visitor.get("society_id") or "").strip()
+        if not society_id:
+            return
+        with self._lock:
+            if society_id in self._replay:
+                # A reconcile is reading the sheets right now; re-apply on its result
+                self._replay[society_id].append((kind, visitor))
+            snap = self._snapshots.get(society_id)
+            if snap is not None:
+                self._apply_event(snap, kind, visitor)
+
+    def _apply_event(self, snap: Dict, kind: str, visitor: Dict) -> None:
+        visitor_id = (visitor.get("visitor_id") or "").strip()
+        if not visitor_id:
+            return
+        status = (visitor.get("status") or "").strip().upper()
+        tracked: Optional[Tuple[str, str]] = snap["visitor_index"].get(visitor_id)
+
+        if kind == "created":
+            day = _parse_created_day(visitor.get("created_at"))
+            if tracked is not None or day is None or day < self._oldest_retained_day():
+                return
+            self._add(snap, day.isoformat(), status, 1)
+            snap["visitor_index"][visitor_id] = (day.isoformat(), status)
+            self._prune(snap)
+            return
+
+        if tracked is None:
+            day = _parse_created_day(visitor.get("created_at"))
+            if day is not None and day >= self._oldest_retained_day():
+                # Visitor we never saw being created (other process/manual edit)
+                snap["dirty"] = True
+            return
+        day_key, old_status = tracked
+        if old_status == status:
+            return
+        self._add(snap, day_key, old_status, -1)
+        self._add(snap, day_key, status, 1)
+        snap["visitor_index"][visitor_id] = (day_key, status)
+
+    # -----------------------------
+    # Helpers (caller holds the lock or owns the snapshot)
+    # -----------------------------
+    def _add(self, snap: Dict, day_key: str, status: str, delta: int) -> None:
+        by_status = snap["visitors_by_day"].setdefault(day_key, {})
+        by_status[status] = max(0, by_status.get(status, 0) + delta)
+
+    def _prune(self, snap: Dict) -> None:
+        oldest_key = self._oldest_retained_day().isoformat()
+        stale_days = [d for d in snap["visitors_by_day"] if d < oldest_key]
+        if not stale_days:
+            return
+        for d in stale_days:
+            snap["visitors_by_day"].pop(d, None)
+        snap["visitor_index"] = {
+            vid: entry for vid, entry in snap["visitor_index"].items() if entry[0] >= oldest_key
+        }
+
+
+# Singleton instance
+_dashboard_stats_service: Optional[DashboardStatsService] = None
+
+
+def get_dashboard_stats_service() -> DashboardStatsService:
+    """Get singleton DashboardStatsService instance"""
+    global _dashboard_stats_service
+    if _dashboard_stats_service is None:
+        _dashboard_stats_service = DashboardStatsService()
+    return _dashboard_stats_service
@@ -2,6 +2,8 @@ import os
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
 
+from app.observability.metrics import get_metrics_registry
+
 _db = None
 
 
@@ -31,6 +33,9 @@ def get_db():
     Requires GOOGLE_APPLICATION_CREDENTIALS env var OR defaults to ./firebase_service_account.json in backend root.
     """
     global _db
+    get_metrics_registry().counter(
+        "firestore_get_db_calls_total", "get_db() calls (one per Firestore-using request path)"
+    ).inc()
     if _db is not None:
         return _db
 
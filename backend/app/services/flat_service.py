@@ -3,24 +3,43 @@ Flat service for flat/resident operations
 """
 
 from typing import List, Optional
-from app.sheets.client import get_sheets_client
+from app.repositories.storage import get_repositories
+from app.observability.tracing import trace_methods
 from app.models.schemas import FlatResponse
 
 
+@trace_methods
 class FlatService:
     """Service for flat-related operations"""
     
     def __init__(self):
-        self.sheets_client = get_sheets_client()
+        self.repos = get_repositories()
     
     def get_flats_by_society(self, society_id: str) -> List[FlatResponse]:
         """Get all active flats for a society"""
-        flats = self.sheets_client.get_flats(society_id=society_id)
+        flats = self.repos.flats.list(society_id=society_id)
         return [self._dict_to_flat_response(f) for f in flats]
     
+    def get_flats_for_guard(self, guard_id: str) -> Optional[List[FlatResponse]]:
+        """
+        Get all active flats for the guard's society (one storage round trip).
+        Returns None if the guard does not exist or is inactive.
+        """
+        guard, flats = self.repos.guards.get_with_society_flats(guard_id)
+        if not guard:
+            return None
+        return [self._dict_to_flat_response(f) for f in flats]
+
+    async def aget_flats_for_guard(self, guard_id: str) -> Optional[List[FlatResponse]]:
+        """get_flats_for_guard without blocking the event loop on storage."""
+        guard, flats = await self.repos.guards.aget_with_society_flats(guard_id)
+        if not guard:
+            return None
+        return [self._dict_to_flat_response(f) for f in flats]
+
     def get_flat_by_id(self, flat_id: str) -> Optional[FlatResponse]:
         """Get a flat by flat_id"""
-        flat = self.sheets_client.get_flat_by_id(flat_id)
+        flat = self.repos.flats.get(flat_id)
         if not flat:
             return None
         return self._dict_to_flat_response(flat)
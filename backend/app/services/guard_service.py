@@ -2,41 +2,255 @@
 Guard service for authentication and guard operations
 """
 
-from typing import Optional
-from app.sheets.client import get_sheets_client
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.repositories.storage import get_repositories
+from app.sheets.quota import SheetsQuotaError
+from app.observability.metrics import record_cache
+from app.observability.tracing import trace_methods
 from app.models.schemas import GuardLoginResponse
 
+logger = logging.getLogger(__name__)
+
 
+def _pin_digest(society_id: str, pin: str) -> str:
+    """Hash a PIN scoped to its society so raw PINs never sit in the index."""
+    return hashlib.sha256(f"{society_id}:{pin}".encode("utf-8")).hexdigest()
+
+
+@trace_methods
 class GuardService:
     """Service for guard-related operations"""
-    
+
     def __init__(self):
-        self.sheets_client = get_sheets_client()
-    
-    def authenticate(self, society_id: str, pin: str) -> Optional[GuardLoginResponse]:
+        self.repos = get_repositories()
+
+        # -----------------------------
+        # Login index (society-scoped)
+        # -----------------------------
+        # society_id -> (loaded_at_epoch, {pin_digest: guard_dict}), least
+        # recently used first. society_id comes from the client, so the map is
+        # capped; an empty map is a society without active guards (or an
+        # unknown one) and is kept as a negative entry.
+        self._pin_index: "OrderedDict[str, Tuple[float, Dict[str, dict]]]" = OrderedDict()
+        self._pin_index_ttl_sec: int = 300  # 5 minutes
+        self._pin_index_max_societies: int = 1000
+        # A miss may force one early refresh (new guard added in the sheet),
+        # but never more often than this (societies without guards: the longer one).
+        self._pin_index_min_refresh_sec: int = 30
+        self._unknown_society_min_refresh_sec: int = 120
+
+        # society_id -> {pin_digest: expires_at_epoch}, only for indexed societies
+        self._pin_misses: Dict[str, Dict[str, float]] = {}
+        self._pin_miss_ttl_sec: int = 60
+
+        # client_id -> timestamps of index loads it caused. Checked before any
+        # storage read and independent of society_id, so rotating society_ids
+        # can't turn logins into a stream of Guards reads.
+        self._client_loads: Dict[str, Deque[float]] = {}
+        self._max_client_loads: int = 10
+        self._client_load_window_sec: int = 60
+
+        # (society_id, client_id) -> timestamps of failed attempts
+        self._failed_attempts: Dict[Tuple[str, str], Deque[float]] = {}
+        self._max_failed_attempts: int = 10
+        self._failed_window_sec: int = 300
+
+        self._lock = threading.Lock()
+
+    def clear_pin_index(self, society_id: Optional[str] = None) -> None:
+        """Utility to drop the login index (e.g. after guards are edited in the sheet)."""
+        with self._lock:
+            if society_id:
+                self._pin_index.pop(society_id, None)
+                self._pin_misses.pop(society_id, None)
+            else:
+                self._pin_index.clear()
+                self._pin_misses.clear()
+
+    def _load_pin_index(self, society_id: str) -> Dict[str, dict]:
+        """
+        Fetch active guards for one society and rebuild its digest -> guard map.
+        A failed read raises (503) instead of caching an empty map, which would
+        turn every login into a miss counted towards the lockout.
+        """
+        try:
+            guards = self.repos.guards.list(society_id=society_id, raise_on_error=True)
+        except SheetsQuotaError:
+            raise  # a 503 with Retry-After
+        except Exception as e:
+            logger.warning(f"GUARD_PIN_INDEX_LOAD_FAIL | society_id={society_id} err={e}")
+            raise HTTPException(
+                status_code=503,
+                detail="Guard login is temporarily unavailable. Please try again.",
+            )
+
+        m: Dict[str, dict] = {}
+        for g in guards:
+            pin = str(g.get("pin") or "").strip()
+            if pin:
+                m[_pin_digest(society_id, pin)] = g
+
+        with self._lock:
+            self._pin_index[society_id] = (time.time(), m)
+            self._pin_index.move_to_end(society_id)
+            # Fresh data supersedes any remembered misses for this society
+            self._pin_misses.pop(society_id, None)
+            while len(self._pin_index) > self._pin_index_max_societies:
+                evicted, _ = self._pin_index.popitem(last=False)
+                self._pin_misses.pop(evicted, None)
+
+        logger.info(
+            f"GUARD_PIN_INDEX_REFRESHED | society_id={society_id} guards_indexed={len(m)} "
+            f"ttl_sec={self._pin_index_ttl_sec}"
+        )
+        return m
+
+    def _lookup_pin(self, society_id: str, digest: str, client_id: str = "") -> Optional[dict]:
+        now = time.time()
+
+        with self._lock:
+            cached = self._pin_index.get(society_id)
+            if cached:
+                self._pin_index.move_to_end(society_id)
+            misses = self._pin_misses.get(society_id) or {}
+            miss_expires = misses.get(digest, 0.0)
+
+        if cached and cached[0] + self._pin_index_ttl_sec > now:
+            loaded_at, m = cached
+            guard = m.get(digest)
+            if guard or miss_expires > now:
+                record_cache("guard_pin_index", True)
+                return guard
+            # Unknown PIN: refresh early once in a while so newly added guards can log in
+            min_refresh = self._pin_index_min_refresh_sec if m else self._unknown_society_min_refresh_sec
+            if now - loaded_at < min_refresh:
+                self._remember_miss(society_id, digest, now)
+                record_cache("guard_pin_index", True)
+                return None
+
+        record_cache("guard_pin_index", False)
+        self._check_client_loads(client_id, society_id)
+        guard = self._load_pin_index(society_id).get(digest)
+        if not guard:
+            self._remember_miss(society_id, digest, now)
+        return guard
+
+    def _check_client_loads(self, client_id: str, society_id: str) -> None:
+        """Allow a client at most _max_client_loads index loads per window (429 beyond)."""
+        now = time.time()
+        cutoff = now - self._client_load_window_sec
+        with self._lock:
+            if len(self._client_loads) > 10000:
+                for k in [k for k, a in self._client_loads.items() if not a or a[-1] <= cutoff]:
+                    self._client_loads.pop(k, None)
+            loads = self._client_loads.setdefault(client_id, deque())
+            while loads and loads[0] <= cutoff:
+                loads.popleft()
+            blocked = len(loads) >= self._max_client_loads
+            if not blocked:
+                loads.append(now)
+            retry_after = int(loads[0] + self._client_load_window_sec - now) + 1 if loads else 1
+
+        if blocked:
+            logger.warning(f"GUARD_LOGIN_LOAD_LIMITED | client={client_id} society_id={society_id}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts. Please try again later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    def _remember_miss(self, society_id: str, digest: str, now: float) -> None:
+        with self._lock:
+            if society_id not in self._pin_index:
+                return  # evicted (or never indexed): nothing to remember against
+            misses = self._pin_misses.setdefault(society_id, {})
+            if len(misses) > 1000:
+                # Drop expired entries so a brute-force run can't grow this unbounded
+                for k in [k for k, exp in misses.items() if exp <= now]:
+                    misses.pop(k, None)
+            misses[digest] = now + self._pin_miss_ttl_sec
+
+    def _check_rate_limit(self, key: Tuple[str, str]) -> None:
+        now = time.time()
+        with self._lock:
+            attempts = self._failed_attempts.get(key)
+            if not attempts:
+                return
+            while attempts and attempts[0] <= now - self._failed_window_sec:
+                attempts.popleft()
+            if not attempts:
+                self._failed_attempts.pop(key, None)
+                return
+            blocked = len(attempts) >= self._max_failed_attempts
+            retry_after = int(attempts[0] + self._failed_window_sec - now) + 1
+
+        if blocked:
+            logger.warning(f"GUARD_LOGIN_RATE_LIMITED | society_id={key[0]} client={key[1]}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many failed login attempts. Please try again later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    def _record_failure(self, key: Tuple[str, str]) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._failed_attempts) > 10000:
+                # Keys are client-chosen (society_id), so sweep expired windows
+                # instead of waiting for the same key to be checked again
+                cutoff = now - self._failed_window_sec
+                for k in [k for k, a in self._failed_attempts.items() if not a or a[-1] <= cutoff]:
+                    self._failed_attempts.pop(k, None)
+            self._failed_attempts.setdefault(key, deque()).append(now)
+
+    def authenticate(
+        self,
+        society_id: str,
+        pin: str,
+        client_id: Optional[str] = None,
+    ) -> Optional[GuardLoginResponse]:
         """
         Authenticate guard by society_id and PIN
-        
-        Returns GuardLoginResponse if authentication succeeds, None otherwise
+
+        Returns GuardLoginResponse if authentication succeeds, None otherwise.
+        Raises HTTPException(429) once a client exceeds the failed-attempt limit.
         """
-        guard = self.sheets_client.get_guard_by_pin(society_id=society_id, pin=pin)
-        
+        society_id = (society_id or "").strip()
+        pin = (pin or "").strip()
+        limiter_key = (society_id, client_id or "")
+
+        self._check_rate_limit(limiter_key)
+
+        guard = self._lookup_pin(society_id, _pin_digest(society_id, pin), client_id or "")
+
         if not guard:
+            self._record_failure(limiter_key)
             return None
-        
+
+        with self._lock:
+            self._failed_attempts.pop(limiter_key, None)
+
         return GuardLoginResponse(
             guard_id=guard.get('guard_id', ''),
             guard_name=guard.get('guard_name', ''),
             society_id=guard.get('society_id', ''),
             token=None  # Future: JWT token
         )
-    
+
     # app/services/guard_service.py
     def get_guard_by_id(self, guard_id: str) -> Optional[dict]:
         """Get guard details by guard_id if active"""
         try:
-            # Fetch from Sheets Client
-            guard_data = self.sheets_client.get_guard_by_id(guard_id)
+            # Fetch from storage
+            guard_data = self.repos.guards.get(guard_id)
             print(f"guard_data : {guard_data}")
             # 1. If not found or inactive, return None (Router handles this)
             if not guard_data:
@@ -50,6 +264,8 @@ class GuardService:
                 "society_id": str(guard_data.get("society_id", "")),
                 "token": None 
             }
+        except SheetsQuotaError:
+            raise  # a 503 with Retry-After, not "guard not found"
         except Exception as e:
             print(f"ERROR in Guard Service: {e}")
             return None
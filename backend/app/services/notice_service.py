@@ -2,26 +2,384 @@
 Notice service for managing society notices/announcements
 """
 
+import re
 import uuid
+import heapq
+import hashlib
+import json
+import random
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Optional, Dict, List
-from app.sheets.client import get_sheets_client
-from app.config import settings
+from typing import Optional, Dict, List, Tuple
+from app.cache.shared import invalidate, on_invalidate
+from app.repositories.rows import notice_society
+from app.repositories.storage import get_repositories
+from app.observability.metrics import record_cache
+from app.observability.tracing import trace_methods
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _is_active(notice: Dict) -> bool:
+    # "TRUE" (is_active) or "ACTIVE" (status) both mean active
+    status_value = (
+        notice.get("status") or
+        notice.get("Status") or
+        notice.get("is_active") or
+        notice.get("is active") or
+        notice.get("isactive") or
+        ""
+    ).strip().upper()
+    return status_value in ["TRUE", "ACTIVE"]
+
+
+def _parse_expiry(notice: Dict) -> Optional[float]:
+    """
+    Expiry as a UTC epoch, None if the notice has no (parseable) expiry.
+    Naive timestamps are treated as UTC.
+    """
+    expiry_date = (
+        notice.get("expiry_date") or
+        notice.get("expiry date") or
+        notice.get("expirydate") or
+        ""
+    )
+    expiry_str = expiry_date.strip()
+    if not expiry_str:
+        return None
+    try:
+        expiry = datetime.fromisoformat(expiry_str.replace("Z", "+00:00"))
+    except ValueError as e:
+        logger.warning(f"Error parsing expiry_date '{expiry_date}': {e}")
+        return None  # If date parsing fails, include the notice
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry.timestamp()
+
+
+def _created_at(notice: Dict) -> str:
+    return notice.get("created_at") or notice.get("created at") or ""
+
+
+def _topic_key(raw: Optional[str]) -> str:
+    # Same normalization the mobile app uses when subscribing to topics
+    cleaned = re.sub(r"[^A-Z0-9]+", "_", (raw or "").strip().upper())
+    return re.sub(r"_+", "_", cleaned).strip("_")
+
+
+# Notice types/priorities that skip the coalescing window
+IMMEDIATE_NOTICE_TYPES = ("EMERGENCY",)
+IMMEDIATE_PRIORITIES = ("URGENT",)
+
+# FCM data payloads are capped at 4KB; keep the rendered notice well under it
+PUSH_CONTENT_MAX_CHARS = 1000
+PUSH_BATCH_CONTENT_MAX_CHARS = 200
+PUSH_BATCH_MAX_BYTES = 3000
+
+
+_notice_service = None
+
+
 def get_notice_service():
-    """Get notice service instance"""
-    return NoticeService()
+    """Get singleton NoticeService instance (it owns the active-notice cache)"""
+    global _notice_service
+    if _notice_service is None:
+        _notice_service = NoticeService()
+    return _notice_service
 
 
+@trace_methods
 class NoticeService:
     """Service for notice operations"""
 
     def __init__(self):
-        self.sheets = get_sheets_client()
+        self.repos = get_repositories()
+
+        # -----------------------------
+        # Active-notice cache (per society)
+        # -----------------------------
+        # society_id -> {"loaded_at", "notices" (newest first), "expiry_heap", "etag"}
+        self._active_cache: Dict[str, Dict] = {}
+        self._active_cache_ttl_sec: int = 300  # 5 minutes (covers edits made directly in the sheet)
+        # Bumped by every eviction (per society / all), so a load that raced
+        # with a write is not cached over the invalidation
+        self._active_generation: Dict[str, int] = {}
+        self._active_generation_all: int = 0
+        self._lock = threading.Lock()
+
+        # -----------------------------
+        # Notice push fan-out (per society)
+        # -----------------------------
+        # Notices created within the window go out as one push, and a society
+        # never gets more than one notice push per min interval.
+        self._push_window_sec: float = 10.0
+        self._push_min_interval_sec: float = 60.0
+        self._pending_pushes: Dict[str, List[Dict]] = {}  # society_id -> notices
+        self._push_timers: Dict[str, threading.Timer] = {}
+        self._last_push_at: Dict[str, float] = {}
+
+        # -----------------------------
+        # Compaction timer (tombstoned notice rows on Sheets)
+        # -----------------------------
+        # Checks are free until deletes are pending; the repository decides
+        # when a compaction is due (tombstones piled up / waited its interval)
+        self._compaction_check_sec: float = 60.0
+        self._compaction_stop = threading.Event()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        # Notice writes in other workers
+        on_invalidate("notices", self._evict_active)
+
+    # -----------------------------
+    # Active-notice cache
+    # -----------------------------
+    def invalidate_notices(self, society_id: Optional[str] = None) -> None:
+        """Drop cached active notices for one society (or all) in every worker."""
+        invalidate("notices", society_id or None)
+
+    def _evict_active(self, society_id: Optional[str], data: Optional[Dict] = None) -> None:
+        with self._lock:
+            if society_id:
+                self._active_cache.pop(society_id, None)
+                self._active_generation[society_id] = self._active_generation.get(society_id, 0) + 1
+            else:
+                self._active_cache.clear()
+                self._active_generation_all += 1
+
+    def _generation(self, society_id: str) -> Tuple[int, int]:
+        # Caller holds self._lock
+        return self._active_generation_all, self._active_generation.get(society_id, 0)
+
+    @staticmethod
+    def _etag(notices: List[Dict]) -> str:
+        digest = hashlib.sha1(
+            json.dumps(notices, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def _load_active_notices(self, society_id: str) -> Dict:
+        """Read the society's notices once and build its cache entry."""
+        now = time.time()
+        notices: List[Dict] = []
+        expiry_heap: List[Tuple[float, int, Dict]] = []
+
+        for notice in self.repos.notices.list(society_id=society_id):
+            if not _is_active(notice):
+                continue
+
+            expires_at = _parse_expiry(notice)
+            if expires_at is not None:
+                if expires_at <= now:
+                    continue  # Skip expired notices
+                expiry_heap.append((expires_at, len(expiry_heap), notice))
+
+            notices.append(notice)
+
+        # Sort by created_at descending (newest first)
+        notices.sort(key=_created_at, reverse=True)
+        heapq.heapify(expiry_heap)
+
+        logger.info(
+            f"NOTICE_CACHE_REFRESHED | society_id={society_id} active={len(notices)} "
+            f"with_expiry={len(expiry_heap)}"
+        )
+        return {
+            "loaded_at": now,
+            "notices": notices,
+            "expiry_heap": expiry_heap,
+            "etag": self._etag(notices),
+        }
+
+    def get_active_notices(self, society_id: str) -> Tuple[List[Dict], str]:
+        """
+        Active, unexpired notices for a society (newest first) and their ETag.
+
+        Expired notices are dropped by popping the expiry min-heap, so nothing
+        is re-parsed on the read path.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._active_cache.get(society_id)
+            generation = self._generation(society_id)
+
+        fresh = entry is not None and now - entry["loaded_at"] <= self._active_cache_ttl_sec
+        record_cache("active_notices", fresh)
+        if not fresh:
+            entry = self._load_active_notices(society_id)
+            with self._lock:
+                # An invalidation during the load means it may predate that write:
+                # serve it to this caller, but don't cache it
+                if self._generation(society_id) == generation:
+                    self._active_cache[society_id] = entry
+
+        with self._lock:
+            heap = entry["expiry_heap"]
+            if heap and heap[0][0] <= now:
+                expired = set()
+                while heap and heap[0][0] <= now:
+                    expired.add(id(heapq.heappop(heap)[2]))
+                entry["notices"] = [n for n in entry["notices"] if id(n) not in expired]
+                entry["etag"] = self._etag(entry["notices"])
+            return list(entry["notices"]), entry["etag"]
+
+    # -----------------------------
+    # Compaction
+    # -----------------------------
+    def compact_notices(self, due_only: bool = False) -> int:
+        """
+        Reclaim space left by deleted notices (tombstoned rows on Sheets);
+        returns rows removed. due_only skips it unless a compaction is due.
+        """
+        if due_only:
+            return self.repos.notices.compact_if_due()
+        return self.repos.notices.compact()
+
+    def start_compaction_timer(self) -> None:
+        """Run due compactions from a daemon thread (app startup; no-op if running)."""
+        with self._lock:
+            if self._compaction_thread is not None:
+                return
+            self._compaction_stop.clear()
+            self._compaction_thread = threading.Thread(
+                target=self._compaction_loop, name="notice-compaction", daemon=True
+            )
+            self._compaction_thread.start()
+        logger.info(f"NOTICE_COMPACTION_TIMER_STARTED | check_sec={self._compaction_check_sec}")
+
+    def stop_compaction_timer(self) -> None:
+        """Stop the compaction thread (app shutdown)."""
+        with self._lock:
+            thread, self._compaction_thread = self._compaction_thread, None
+        self._compaction_stop.set()
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _compaction_loop(self) -> None:
+        # Random first check so workers started together don't compact at once
+        delay = random.uniform(0, self._compaction_check_sec)
+        while not self._compaction_stop.wait(delay):
+            delay = self._compaction_check_sec
+            try:
+                self.compact_notices(due_only=True)
+            except Exception as e:
+                logger.warning(f"NOTICE_COMPACTION_FAIL | err={e}")
+
+    # -----------------------------
+    # Push fan-out
+    # -----------------------------
+    def _queue_notice_push(self, notice: Dict) -> None:
+        """
+        Schedule a society-wide push for a new notice.
+
+        The first notice opens a coalescing window; anything created before it
+        closes rides along in the same push. Emergency/urgent notices flush the
+        window right away.
+        """
+        society_id = notice["society_id"]
+        immediate = (
+            (notice.get("notice_type") or "").upper() in IMMEDIATE_NOTICE_TYPES
+            or (notice.get("priority") or "").upper() in IMMEDIATE_PRIORITIES
+        )
+
+        with self._lock:
+            self._pending_pushes.setdefault(society_id, []).append(notice)
+            timer = self._push_timers.get(society_id)
+            if immediate:
+                if timer:
+                    timer.cancel()
+                delay = 0.0
+            elif timer:
+                return  # Already scheduled; coalesce
+            else:
+                next_allowed = self._last_push_at.get(society_id, 0.0) + self._push_min_interval_sec
+                delay = max(self._push_window_sec, next_allowed - time.time())
+
+            timer = threading.Timer(delay, self._flush_notice_push, args=(society_id,))
+            timer.daemon = True
+            self._push_timers[society_id] = timer
+
+        timer.start()
+        logger.info(
+            f"NOTICE_PUSH_QUEUED | society_id={society_id} notice_id={notice['notice_id']} "
+            f"delay_sec={delay:.1f}"
+        )
+
+    def _flush_notice_push(self, society_id: str) -> None:
+        with self._lock:
+            notices = self._pending_pushes.pop(society_id, [])
+            self._push_timers.pop(society_id, None)
+            if not notices:
+                return
+            self._last_push_at[society_id] = time.time()
+
+        title, body, data = self._build_notice_push(society_id, notices)
+
+        # Canonical topic format used by mobile subscription: society_<societyKey>
+        canonical_topic = f"society_{_topic_key(society_id)}"
+        # Legacy topic (raw society id, older implementation)
+        legacy_topic = f"society_{society_id}"
+        topics = [canonical_topic]
+        if legacy_topic != canonical_topic:
+            topics.append(legacy_topic)
+
+        try:
+            from app.services.notification_service import get_notification_service
+            notification_service = get_notification_service()
+
+            for topic in topics:
+                ok = notification_service.send_to_topic(
+                    topic=topic,
+                    title=title,
+                    body=body,
+                    data=data,
+                    sound="notification_sound",
+                )
+                logger.info(
+                    f"NOTICE_PUSH_TOPIC | topic={topic} notices={len(notices)} ok={ok}"
+                )
+        except Exception as e:
+            # Don't fail anything upstream if notification fails
+            logger.warning(f"Failed to send notice push for society {society_id}: {e}")
+
+    def _build_notice_push(self, society_id: str, notices: List[Dict]) -> Tuple[str, str, Dict[str, str]]:
+        """
+        Title/body plus an FCM data payload (string values only) that carries
+        enough of each notice for the app to render it without fetching.
+        """
+        if len(notices) == 1:
+            n = notices[0]
+            data = {k: str(v or "") for k, v in n.items()}
+            data["type"] = "notice"
+            data["content"] = data["content"][:PUSH_CONTENT_MAX_CHARS]
+            return "📢 New Notice", n["title"], data
+
+        compact = [
+            {
+                "notice_id": n["notice_id"],
+                "title": n["title"],
+                "content": (n.get("content") or "")[:PUSH_BATCH_CONTENT_MAX_CHARS],
+                "notice_type": n.get("notice_type") or "",
+                "priority": n.get("priority") or "",
+                "created_at": n.get("created_at") or "",
+            }
+            for n in sorted(notices, key=_created_at, reverse=True)
+        ]
+        encoded = json.dumps(compact, ensure_ascii=False)
+        while len(encoded.encode("utf-8")) > PUSH_BATCH_MAX_BYTES and len(compact) > 1:
+            # Drop the oldest; the app still knows the total from "count"
+            compact.pop()
+            encoded = json.dumps(compact, ensure_ascii=False)
+
+        data = {
+            "type": "notice_batch",
+            "society_id": society_id,
+            "count": str(len(notices)),
+            "notices": encoded,
+        }
+        body = " • ".join(n["title"] for n in compact)
+        return f"📢 {len(notices)} New Notices", body, data
 
     def create_notice(
         self,
@@ -37,10 +395,9 @@ class NoticeService:
         """
         Create a new notice
         Returns the created notice with notice_id and created_at
-        
-        ✅ IMPORTANT:
-        Writes the row using the Notices sheet headers order.
-        This makes it safe even if columns are added/reordered.
+
+        notice_data carries the common header spellings ("Notice ID", ...);
+        on Sheets the row is written in the tab's own header order.
         """
         try:
             notice_id = str(uuid.uuid4())
@@ -48,25 +405,6 @@ class NoticeService:
             is_active = "TRUE"  # For "is_active" field
             status_active = "ACTIVE"  # For "status" field (alternative header name)
 
-            # Read headers first to get the correct column order
-            try:
-                rows = self.sheets._get_sheet_values(settings.SHEET_NOTICES)
-            except Exception as e:
-                logger.error(f"Error reading Notices sheet: {e}")
-                raise ValueError(
-                    f"Failed to read sheet '{settings.SHEET_NOTICES}'. "
-                    f"Please ensure the sheet exists. Error: {str(e)}"
-                )
-            
-            if not rows:
-                raise ValueError(
-                    f"Sheet '{settings.SHEET_NOTICES}' is empty or headers are missing. "
-                    f"Please ensure the sheet exists with proper headers."
-                )
-
-            headers = rows[0]
-            logger.info(f"Notices sheet headers: {headers}")
-
             # Build notice data dict (keys should match sheet headers)
             # Common header formats: "notice_id", "Notice ID", "Notice_ID", etc.
             # Default values for missing fields
@@ -106,123 +444,25 @@ class NoticeService:
             notice_data["Created At"] = created_at
             notice_data["Expiry Date"] = expiry_date or ""
             
-            logger.info(f"Notice data keys being prepared: {list(notice_data.keys())}")
-
-            # Build row in exact header order (matching visitor creation pattern)
-            row = []
-            for h in headers:
-                key = (h or "").strip()
-                value = None
-                
-                # Try multiple matching strategies
-                # 1. Exact match
-                value = notice_data.get(key)
-                
-                # 2. Case-insensitive match
-                if value is None:
-                    for k, v in notice_data.items():
-                        if str(k).strip().lower() == key.lower():
-                            value = v
-                            break
-                
-                # 3. Try with spaces replaced by underscores (and vice versa)
-                if value is None:
-                    key_variations = [
-                        key.replace(" ", "_"),
-                        key.replace("_", " "),
-                        key.replace(" ", "_").lower(),
-                        key.replace("_", " ").lower(),
-                    ]
-                    for var_key in key_variations:
-                        if var_key in notice_data:
-                            value = notice_data[var_key]
-                            break
-                
-                # 4. Try title case and other case variations
-                if value is None:
-                    key_variations = [
-                        key.title(),
-                        key.upper(),
-                        key.lower(),
-                        key.capitalize(),
-                    ]
-                    for var_key in key_variations:
-                        if var_key in notice_data:
-                            value = notice_data[var_key]
-                            break
-                
-                # 5. Special handling for common field name variations
-                if value is None:
-                    # Map common variations
-                    field_mapping = {
-                        "created_by": ["admin_id", "created_by", "admin id", "created by"],
-                        "created_by_name": ["admin_name", "created_by_name", "admin name", "created by name"],
-                        "pinned": ["pinned", "is_pinned", "is pinned"],
-                        "status": ["status", "is_active", "is active", "state"],
-                        "expiry_date": ["expiry_date", "expiry date", "expirydate", "expires_at", "expires at"],
-                    }
-                    
-                    key_lower = key.lower().replace(" ", "_")
-                    for mapped_key, variations in field_mapping.items():
-                        if key_lower in variations:
-                            for var_key in variations:
-                                if var_key in notice_data:
-                                    value = notice_data[var_key]
-                                    break
-                            if value:
-                                break
-                
-                if value is None:
-                    # Log missing header for debugging
-                    logger.warning(
-                        f"Notice header '{key}' not found in notice_data. "
-                        f"Available keys: {list(notice_data.keys())}"
-                    )
-                    value = ""  # Default to empty string
-                
-                row.append(str(value) if value is not None else "")
-
-            # Log the row being written for debugging
-            logger.info(f"Writing notice row with {len(row)} columns")
-            logger.info(f"Row data: {row}")
-            logger.info(f"Header-to-value mapping:")
-            for i, h in enumerate(headers):
-                if i < len(row):
-                    logger.info(f"  {h} = {row[i]}")
-            
-            # Append to Notices sheet
-            try:
-                self.sheets._append_to_sheet(settings.SHEET_NOTICES, [row])
-                logger.info(f"Successfully created notice: {notice_id}")
-            except Exception as e:
-                logger.error(f"Error appending to Notices sheet: {e}")
-                logger.error(f"Row data: {row}")
-                logger.error(f"Headers: {headers}")
-                raise Exception(f"Failed to append notice to sheet: {str(e)}")
+            logger.debug(f"Notice data keys being prepared: {list(notice_data.keys())}")
 
-            # Send push notification to all users in the society
-            try:
-                from app.services.notification_service import get_notification_service
-                notification_service = get_notification_service()
-                
-                # Send to topic (all users subscribed to this society)
-                topic = f"society_{society_id}"
-                notification_service.send_to_topic(
-                    topic=topic,
-                    title="📢 New Notice",
-                    body=f"{title}",
-                    data={
-                        "type": "notice",
-                        "notice_id": notice_id,
-                        "society_id": society_id,
-                        "notice_type": notice_type,
-                    },
-                    sound="notification_sound",
-                )
-                logger.info(f"Notification sent for new notice: {notice_id}")
-            except Exception as e:
-                # Don't fail notice creation if notification fails
-                logger.warning(f"Failed to send notification for notice {notice_id}: {e}")
+            self.repos.notices.create(notice_data)
+            logger.info(f"Successfully created notice: {notice_id}")
+
+            self.invalidate_notices(society_id)
+
+            # Push to everyone in the society (coalesced, rate-limited)
+            self._queue_notice_push({
+                "notice_id": notice_id,
+                "society_id": society_id,
+                "admin_name": admin_name,
+                "title": title,
+                "content": content,
+                "notice_type": notice_type,
+                "priority": priority,
+                "created_at": created_at,
+                "expiry_date": expiry_date or "",
+            })
 
             return notice_data
         except ValueError as e:
@@ -239,107 +479,17 @@ class NoticeService:
     ) -> List[Dict]:
         """Get all notices for a society"""
         try:
-            rows = self.sheets._get_sheet_values(settings.SHEET_NOTICES)
-            if not rows or len(rows) < 2:
-                logger.info(f"No notices found in sheet (rows: {len(rows) if rows else 0})")
-                return []
-
-            # Normalize headers: convert to lowercase and replace spaces with underscores
-            # This handles "Society ID" -> "society_id", "Notice ID" -> "notice_id", etc.
-            original_headers = rows[0]
-            headers = []
-            for h in original_headers:
-                header = str(h).strip()
-                # Normalize: lowercase and replace spaces with underscores
-                normalized = header.lower().replace(" ", "_")
-                headers.append(normalized)
-            
-            logger.info(f"Reading notices with headers: {original_headers} -> normalized: {headers}")
-            result = []
-
-            for idx, row in enumerate(rows[1:], start=2):
-                if len(row) < len(headers):
-                    row.extend([""] * (len(headers) - len(row)))
-
-                notice = dict(zip(headers, row))
-                
-                # Get society_id with multiple key variations
-                notice_society_id = (
-                    notice.get("society_id") or 
-                    notice.get("society id") or
-                    notice.get("societyid") or
-                    ""
-                ).strip()
-                
-                logger.debug(f"Row {idx}: notice_society_id='{notice_society_id}', looking for '{society_id}'")
-
-                # Filter by society_id
-                if notice_society_id != society_id:
-                    logger.debug(f"Row {idx}: Skipping - society_id mismatch")
-                    continue
-
-                # Filter by active status if requested
-                # Handle both "is_active" and "status" field names
-                if active_only:
-                    # Try multiple field name variations
-                    status_value = (
-                        notice.get("status") or  # Check "status" field first (your sheet uses this)
-                        notice.get("Status") or
-                        notice.get("is_active") or 
-                        notice.get("is active") or
-                        notice.get("isactive") or
-                        ""
-                    ).strip().upper()
-                    
-                    # Check if active: "TRUE" or "ACTIVE" both mean active
-                    # If status is empty or not active, skip it
-                    if status_value not in ["TRUE", "ACTIVE"]:
-                        logger.debug(f"Row {idx}: Skipping - not active (status='{status_value}')")
-                        continue
-                else:
-                    # When active_only=False, include all notices regardless of status
-                    logger.debug(f"Row {idx}: Including notice (active_only=False, status='{notice.get('status') or notice.get('is_active')}')")
-                
-                # Check expiry date if active_only=True (only filter expired when showing active notices)
-                # When active_only=False, show all notices including expired ones
-                if active_only:
-                    expiry_date = (
-                        notice.get("expiry_date") or 
-                        notice.get("expiry date") or
-                        notice.get("expirydate") or
-                        ""
-                    )
-                    if expiry_date and expiry_date.strip():
-                        try:
-                            # Parse expiry date with timezone awareness
-                            expiry_str = expiry_date.strip()
-                            if expiry_str.endswith("Z"):
-                                expiry = datetime.fromisoformat(expiry_str.replace("Z", "+00:00"))
-                            else:
-                                expiry = datetime.fromisoformat(expiry_str)
-                            
-                            # Ensure both datetimes are timezone-aware
-                            if expiry.tzinfo is None:
-                                expiry = expiry.replace(tzinfo=timezone.utc)
-                            
-                            now_utc = datetime.now(timezone.utc)
-                            if now_utc > expiry:
-                                logger.debug(f"Row {idx}: Skipping - expired (expiry={expiry}, now={now_utc})")
-                                continue  # Skip expired notices
-                        except Exception as e:
-                            logger.warning(f"Row {idx}: Error parsing expiry_date '{expiry_date}': {e}")
-                            pass  # If date parsing fails, include the notice
-
-                logger.info(f"Row {idx}: Including notice: {notice.get('title', 'Untitled')}")
-                result.append(notice)
+            if active_only:
+                notices, _ = self.get_active_notices(society_id)
+                return notices
+
+            # When active_only=False, include all notices regardless of status or expiry
+            result = self.repos.notices.list(society_id=society_id)
 
             logger.info(f"Found {len(result)} notices for society_id={society_id}, active_only={active_only}")
 
             # Sort by created_at descending (newest first)
-            result.sort(
-                key=lambda x: x.get("created_at") or x.get("created at") or "",
-                reverse=True
-            )
+            result.sort(key=_created_at, reverse=True)
 
             return result
         except Exception as e:
@@ -355,82 +505,30 @@ class NoticeService:
         Update notice active status (activate/deactivate)
         """
         try:
-            rows = self.sheets._get_sheet_values(settings.SHEET_NOTICES)
-            if not rows or len(rows) < 2:
+            updated = self.repos.notices.update(
+                notice_id, {"is_active": "TRUE" if is_active else "FALSE"},
+            )
+            if updated is None:
                 return None
 
-            headers = [str(h).strip().lower() for h in rows[0]]
-            header_map = {h: i for i, h in enumerate(headers)}
-
-            if "notice_id" not in header_map:
-                raise ValueError("Notices sheet missing 'notice_id' header")
-
-            for idx, row in enumerate(rows[1:], start=2):
-                if len(row) < len(headers):
-                    row.extend([""] * (len(headers) - len(row)))
-
-                notice = dict(zip(headers, row))
-
-                if (notice.get("notice_id") or "").strip() != notice_id:
-                    continue
-
-                # Update is_active
-                if "is_active" in header_map:
-                    row[header_map["is_active"]] = "TRUE" if is_active else "FALSE"
-
-                # Update the row
-                end_col_letter = chr(ord("A") + len(headers) - 1)
-                range_name = f"A{idx}:{end_col_letter}{idx}"
-                self.sheets._update_sheet(settings.SHEET_NOTICES, range_name, [row])
-
-                return dict(zip(headers, row))
-
-            return None
+            self.invalidate_notices(notice_society(updated))
+            return updated
         except Exception as e:
             logger.error(f"Error updating notice status: {e}")
             raise Exception(f"Failed to update notice: {str(e)}")
 
     def delete_notice(self, notice_id: str) -> bool:
         """
-        Delete a notice by removing the row from Google Sheets
+        Delete a notice. On Sheets the row is tombstoned in place and removed
+        later in a batch (see compact_notices).
         """
         try:
-            rows = self.sheets._get_sheet_values(settings.SHEET_NOTICES)
-            if not rows or len(rows) < 2:
-                logger.warning(f"No notices found in sheet")
+            deleted = self.repos.notices.delete(notice_id)
+            if deleted is None:
                 return False
 
-            headers = rows[0]
-            
-            # Find the row index of the notice to delete
-            for idx, row in enumerate(rows[1:], start=2):  # start=2 because row 1 is header, row 2 is first data
-                if len(row) < len(headers):
-                    row.extend([""] * (len(headers) - len(row)))
-                
-                # Try to find notice_id in various header formats
-                notice_id_col_idx = None
-                for col_idx, header in enumerate(headers):
-                    header_lower = str(header).strip().lower()
-                    if header_lower in ["notice_id", "notice id", "noticeid"]:
-                        notice_id_col_idx = col_idx
-                        break
-                
-                if notice_id_col_idx is None:
-                    logger.error("Could not find 'notice_id' column in Notices sheet")
-                    return False
-                
-                # Check if this row matches the notice_id
-                row_notice_id = (row[notice_id_col_idx] if notice_id_col_idx < len(row) else "").strip()
-                
-                if row_notice_id == notice_id:
-                    # Found the notice, delete the row
-                    logger.info(f"Deleting notice {notice_id} at row {idx}")
-                    self.sheets._delete_row(settings.SHEET_NOTICES, idx)
-                    logger.info(f"Successfully deleted notice {notice_id}")
-                    return True
-            
-            logger.warning(f"Notice {notice_id} not found in sheet")
-            return False
+            self.invalidate_notices(notice_society(deleted))
+            return True
         except Exception as e:
             logger.error(f"Error deleting notice: {e}", exc_info=True)
             raise Exception(f"Failed to delete notice: {str(e)}")
@@ -6,6 +6,9 @@ import os
 import logging
 from typing import List, Optional, Dict
 
+from app.observability.metrics import backend_call
+from app.observability.tracing import trace_methods
+
 logger = logging.getLogger(__name__)
 
 # Firebase Admin SDK initialization
@@ -80,6 +83,7 @@ def _initialize_firebase():
         _firebase_initialized = False
 
 
+@trace_methods
 class NotificationService:
     """Service for sending push notifications"""
 
@@ -152,7 +156,10 @@ class NotificationService:
             )
 
             # Send notification
-            response = messaging.send_multicast(message)
+            with backend_call("fcm", "send_multicast") as call:
+                response = messaging.send_multicast(message)
+                if response.success_count == 0:
+                    call.fail()
             
             logger.info(
                 f"Notification sent | success={response.success_count} "
@@ -241,7 +248,8 @@ class NotificationService:
             )
 
             # Send notification
-            response = messaging.send(message)
+            with backend_call("fcm", "send_to_topic"):
+                response = messaging.send(message)
             logger.info(f"Notification sent to topic '{topic}': {response}")
             return True
 
@@ -0,0 +1,175 @@
+"""
+Platform-wide society counters for the super-admin dashboard
+
+A single Firestore document holds total/active societies and pending creation
+requests. Approve/reject update it inside their own transactions; this service
+keeps a short-TTL in-process copy so repeated dashboard loads cost no reads,
+and periodically recounts with count() aggregations to absorb drift (requests
+are created directly by the mobile app, and societies can be edited in the
+console).
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from firebase_admin import firestore
+
+from app.observability.metrics import backend_call, record_cache
+from app.observability.tracing import propagate, trace_methods
+from app.services.firebase_admin import get_db
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "platform_stats"
+COUNTERS_DOC_ID = "society_counters"
+COUNTER_FIELDS = ("total_societies", "active_societies", "pending_requests")
+
+
+def count_query(query) -> int:
+    """Server-side count() aggregation (no documents are downloaded)."""
+    with backend_call("firestore", "count"):
+        result = query.count(alias="n").get()
+    return int(result[0][0].value) if result and result[0] else 0
+
+
+@trace_methods
+class PlatformCountersService:
+    """Cached reader / transactional updater for the society counters document"""
+
+    def __init__(self):
+        self._cache: Optional[Dict[str, int]] = None
+        self._cache_loaded_at: float = 0.0
+        self._cache_ttl_sec: int = 30
+        # Recount from source collections at most this often
+        self._reconcile_interval_sec: int = 300  # 5 minutes
+        self._last_reconcile_at: float = 0.0
+        self._reconciling = False
+        self._lock = threading.Lock()
+
+    def _ref(self):
+        return get_db().collection(COUNTERS_COLLECTION).document(COUNTERS_DOC_ID)
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def get_summary(self) -> Dict[str, int]:
+        """Dashboard summary; served from memory while the cache is fresh."""
+        now = time.time()
+        with self._lock:
+            cached = self._cache
+            fresh = cached is not None and now - self._cache_loaded_at < self._cache_ttl_sec
+
+        record_cache("platform_counters", fresh)
+        if not fresh:
+            with backend_call("firestore", "get", COUNTERS_COLLECTION):
+                snap = self._ref().get()
+            data = snap.to_dict() if snap.exists else None
+            if not data or any(f not in data for f in COUNTER_FIELDS):
+                return self.reconcile()
+            cached = {f: int(data.get(f) or 0) for f in COUNTER_FIELDS}
+            with self._lock:
+                self._cache = cached
+                self._cache_loaded_at = now
+                if not self._last_reconcile_at:
+                    # Trust the stored reconcile time across restarts
+                    reconciled_at = data.get("reconciledAt")
+                    if hasattr(reconciled_at, "timestamp"):
+                        self._last_reconcile_at = reconciled_at.timestamp()
+
+        if now - self._last_reconcile_at > self._reconcile_interval_sec:
+            self._reconcile_in_background()
+
+        return dict(cached)
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def transaction_update(self, transaction, deltas: Dict[str, int]) -> None:
+        """Add counter increments to a caller's transaction (or batch)."""
+        update = {f: firestore.Increment(d) for f, d in deltas.items() if d}
+        update["updatedAt"] = firestore.SERVER_TIMESTAMP
+        transaction.set(self._ref(), update, merge=True)
+
+    def apply_committed(self, deltas: Dict[str, int]) -> None:
+        """Mirror a committed transaction's increments into the cache."""
+        with self._lock:
+            if self._cache is None:
+                return
+            for f, d in deltas.items():
+                self._cache[f] = max(0, self._cache.get(f, 0) + d)
+
+    # -----------------------------
+    # Reconciliation
+    # -----------------------------
+    def reconcile(self) -> Dict[str, int]:
+        """Recount from the source collections and overwrite the counters document."""
+        db = get_db()
+        societies = db.collection("societies")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            total_f = pool.submit(propagate(count_query), societies)
+            active_f = pool.submit(propagate(count_query), societies.where("active", "==", True))
+            pending_f = pool.submit(
+                propagate(count_query),
+                db.collection("society_creation_requests").where("status", "==", "PENDING"),
+            )
+        counts = {
+            "total_societies": total_f.result(),
+            "active_societies": active_f.result(),
+            "pending_requests": pending_f.result(),
+        }
+
+        with backend_call("firestore", "set", COUNTERS_COLLECTION):
+            self._ref().set({
+                **counts,
+                "reconciledAt": firestore.SERVER_TIMESTAMP,
+                "updatedAt": firestore.SERVER_TIMESTAMP,
+            }, merge=True)
+
+        now = time.time()
+        with self._lock:
+            self._cache = dict(counts)
+            self._cache_loaded_at = now
+            self._last_reconcile_at = now
+
+        logger.info(
+            f"PLATFORM_COUNTERS_RECONCILED | total={counts['total_societies']} "
+            f"active={counts['active_societies']} pending={counts['pending_requests']}"
+        )
+        return dict(counts)
+
+    def _reconcile_in_background(self) -> None:
+        with self._lock:
+            if self._reconciling:
+                return
+            self._reconciling = True
+
+        def _run():
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.warning(f"PLATFORM_COUNTERS_RECONCILE_FAIL | err={e}")
+            finally:
+                with self._lock:
+                    self._reconciling = False
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def invalidate(self) -> None:
+        """Utility to drop the cached counters (useful for testing)."""
+        with self._lock:
+            self._cache = None
+
+
+# Singleton instance
+_platform_counters_service: Optional[PlatformCountersService] = None
+
+
+def get_platform_counters_service() -> PlatformCountersService:
+    """Get singleton PlatformCountersService instance"""
+    global _platform_counters_service
+    if _platform_counters_service is None:
+        _platform_counters_service = PlatformCountersService()
+    return _platform_counters_service
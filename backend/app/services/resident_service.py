@@ -3,9 +3,13 @@ import re
 from typing import Optional, List, Dict
 from datetime import datetime, timezone
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from app.sheets.client import get_sheets_client
+from app.repositories.storage import get_repositories
+from app.sheets.quota import PRIORITY_CRITICAL, sheets_priority
+from app.observability.tracing import trace_methods
 from app.services.notification_service import get_notification_service
+from app.services.visitor_service import publish_visitor_event
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,7 @@ def _topic_key(raw: str) -> str:
     return re.sub(r"_+", "_", cleaned).strip("_")
 
 
+@trace_methods
 class ResidentService:
     def __init__(self):
         """
@@ -23,23 +28,24 @@ class ResidentService:
         In older deployments this always created a Google Sheets client and
         crashed the app if SHEETS_SPREADSHEET_ID / credentials were missing.
         To allow running without Sheets (Firebase-only mode), we now make the
-        Sheets client **optional**:
-        - If configuration is present → self.sheets is a real SheetsClient.
-        - If configuration is missing → self.sheets is None and any Sheets-
+        storage **optional**:
+        - If configuration is present → self.repos is the configured storage
+          (Sheets or SQLite, see app/repositories).
+        - If configuration is missing → self.repos is None and any storage-
           backed methods will fail at call time instead of preventing startup.
         """
         try:
-            self.sheets = get_sheets_client()
+            self.repos = get_repositories()
         except Exception as e:
             logger.warning(
-                "Google Sheets client not configured for ResidentService; "
+                "Storage not configured for ResidentService; "
                 "Sheets-based endpoints will be unavailable. %s",
                 e,
             )
-            self.sheets = None
+            self.repos = None
 
     def get_profile(self, society_id: str, flat_no: str, phone: Optional[str] = None) -> Dict:
-        r = self.sheets.get_resident_by_flat_no(
+        r = self.repos.residents.get_by_flat_no(
             society_id=society_id,
             flat_no=flat_no,
             active_only=True,
@@ -94,7 +100,7 @@ class ResidentService:
         )
 
     def pending_approvals(self, society_id: str, flat_no: str) -> List[Dict]:
-        return self.sheets.get_visitors_by_flat(
+        return self.repos.visitors.list_by_flat(
             society_id=society_id,
             flat_no=flat_no,
             status="PENDING",
@@ -102,7 +108,7 @@ class ResidentService:
         )
 
     def history(self, society_id: str, flat_no: str, limit: int = 50) -> List[Dict]:
-        return self.sheets.get_visitors_by_flat(
+        return self.repos.visitors.list_by_flat(
             society_id=society_id,
             flat_no=flat_no,
             status="ALL_NON_PENDING",
@@ -113,6 +119,7 @@ class ResidentService:
         """Alias for history"""
         return self.history(society_id=society_id, flat_no=flat_no, limit=limit)
 
+    @sheets_priority(PRIORITY_CRITICAL)
     def decide(
         self,
         society_id: str,
@@ -128,7 +135,7 @@ class ResidentService:
 
         now = datetime.now(timezone.utc).isoformat()
 
-        updated = self.sheets.update_visitor_status(
+        updated = self.repos.visitors.update_status(
             visitor_id=visitor_id,
             status=decision_up,
             approved_at=now,
@@ -138,10 +145,11 @@ class ResidentService:
         if not updated:
             raise HTTPException(status_code=404, detail="Visitor not found")
 
+        publish_visitor_event("status", updated)
         return {"visitor_id": visitor_id, "status": decision_up, "updated": True}
 
     def save_fcm_token(self, society_id: str, flat_no: str, resident_id: str, fcm_token: str) -> None:
-        ok = self.sheets.upsert_resident_fcm_token(
+        ok = self.repos.residents.upsert_fcm_token(
             society_id=society_id,
             flat_no=flat_no,
             resident_id=resident_id,
@@ -150,6 +158,7 @@ class ResidentService:
         if not ok:
             raise HTTPException(status_code=400, detail="Unable to save fcm_token")
 
+    @sheets_priority(PRIORITY_CRITICAL)
     def send_sos_alert(
         self,
         society_id: str,
@@ -224,7 +233,7 @@ class ResidentService:
         if not society_id or not phone or not pin:
             raise HTTPException(status_code=400, detail="society_id, phone, pin are required")
 
-        r = self.sheets.get_resident_by_phone_and_pin(
+        r = self.repos.residents.get_by_phone_and_pin(
             society_id=society_id,
             phone=phone,
             pin=pin,
@@ -257,7 +266,7 @@ class ResidentService:
         """
         Update resident profile information (name, phone).
         """
-        updated = self.sheets.update_resident_profile(
+        updated = self.repos.residents.update_profile(
             resident_id=resident_id,
             society_id=society_id,
             flat_no=flat_no,
@@ -301,7 +310,8 @@ class ResidentService:
             f.write(content)
         
         # Update resident record with image path
-        updated = self.sheets.update_resident_image(
+        updated = await run_in_threadpool(
+            self.repos.residents.update_image,
             resident_id=resident_id,
             society_id=society_id,
             flat_no=flat_no,
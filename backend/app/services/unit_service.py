@@ -1,8 +1,151 @@
-from typing import List, Dict, Any
+import csv
+import hashlib
+import io
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, Optional, Tuple
 from firebase_admin import firestore
+from app.observability.metrics import backend_call
+from app.observability.tracing import propagate, trace_methods
 from app.services.firebase_admin import get_db
 
+logger = logging.getLogger(__name__)
+
+# Firestore batched writes limit is 500 operations.
+UNIT_BATCH_SIZE = 450
+# Batches committed at once by bulk_create_units
+UNIT_COMMIT_CONCURRENCY = 4
+UNIT_COMMIT_MAX_ATTEMPTS = 3
+UNIT_COMMIT_BACKOFF_SEC = 0.5
+
+# Fields that define a unit's content (hashed to skip no-op writes in sync mode)
+UNIT_CONTENT_FIELDS = ("unitId", "label", "block", "floor", "type", "active", "sortKey")
+# Cap on unit ids echoed back per diff category
+UNIT_SYNC_MAX_IDS = 100
+
+# Emit a progress event every N rows during streaming imports
+UNIT_IMPORT_PROGRESS_EVERY = 500
+
+# Spreadsheet header (lowercased, spaces/_/- removed) -> unit field
+UNIT_IMPORT_COLUMNS = {
+    "unitid": "unitId",
+    "unit": "unitId",
+    "flatno": "unitId",
+    "label": "label",
+    "block": "block",
+    "tower": "block",
+    "floor": "floor",
+    "type": "type",
+    "unittype": "type",
+    "active": "active",
+    "sortkey": "sortKey",
+}
+
+
+def _column_key(header: Any) -> Optional[str]:
+    key = str(header or "").strip().lower()
+    for ch in (" ", "_", "-"):
+        key = key.replace(ch, "")
+    return UNIT_IMPORT_COLUMNS.get(key)
+
+
+def _content_hash(unit: Dict[str, Any]) -> str:
+    content = {f: unit.get(f) for f in UNIT_CONTENT_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _units_ref(db, society_id: str):
+    # ✅ FIX: write to PUBLIC directory (Find Society flow reads from here)
+    return (
+        db.collection("public_societies")
+          .document(society_id)
+          .collection("units")
+    )
+
+
+@trace_methods
 class UnitService:
+    @staticmethod
+    def _normalize_unit(u: Dict[str, Any], idx: int) -> Dict[str, Any]:
+        """
+        Validate one unit and build its Firestore document.
+        Raises ValueError with a row-level message.
+        """
+        unit_id = str(u.get("unitId") or "").strip()
+        if not unit_id:
+            raise ValueError("Each unit must have unitId")
+        if "/" in unit_id:
+            raise ValueError(f"unitId cannot contain '/': {unit_id}")
+
+        # Optional: stable ordering if your Flutter query uses orderBy('sortKey')
+        sort_key = u.get("sortKey")
+        if sort_key is None or sort_key == "":
+            sort_key = idx
+        try:
+            sort_key = int(sort_key)
+        except (TypeError, ValueError):
+            sort_key = idx
+
+        label = str(u.get("label") or unit_id).strip()
+        if not label:
+            label = unit_id
+
+        unit_type = str(u.get("type") or "FLAT").strip().upper()
+        if not unit_type:
+            unit_type = "FLAT"
+
+        active_raw = u.get("active", True)
+        if isinstance(active_raw, bool):
+            active = active_raw
+        elif active_raw is None or str(active_raw).strip() == "":
+            active = True
+        else:
+            active = str(active_raw).strip().lower() in ("true", "1", "yes", "y")
+
+        floor = u.get("floor")
+        if isinstance(floor, str):
+            floor = floor.strip() or None
+        if floor is not None:
+            try:
+                floor = int(float(floor))
+            except (TypeError, ValueError):
+                raise ValueError(f"floor must be a number: {u.get('floor')}")
+
+        block = u.get("block")
+        if isinstance(block, str):
+            block = block.strip() or None
+
+        doc = {
+            "unitId": unit_id,
+            "label": label,
+            "block": block,
+            "floor": floor,
+            "type": unit_type,
+            "active": active,
+            "sortKey": sort_key,
+        }
+        doc["contentHash"] = _content_hash(doc)
+        doc["createdAt"] = firestore.SERVER_TIMESTAMP
+        doc["updatedAt"] = firestore.SERVER_TIMESTAMP
+        return doc
+
+    @staticmethod
+    def _normalize_units(units: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate a whole payload up front so a bad row fails the request before any write."""
+        docs: List[Dict[str, Any]] = []
+        seen_ids = set()
+        for idx, u in enumerate(units, start=1):
+            doc = UnitService._normalize_unit(u, idx)
+            if doc["unitId"] in seen_ids:
+                raise ValueError(f"Duplicate unitId in payload: {doc['unitId']}")
+            seen_ids.add(doc["unitId"])
+            docs.append(doc)
+        return docs
+
     @staticmethod
     def bulk_create_units(
         society_id: str,
@@ -16,86 +159,356 @@ class UnitService:
         if not units:
             raise ValueError("Units list cannot be empty")
 
-        # ✅ FIX: write to PUBLIC directory (Find Society flow reads from here)
-        units_ref = (
-            db.collection("public_societies")
-              .document(society_id)
-              .collection("units")
+        units_ref = _units_ref(db, society_id)
+        docs = UnitService._normalize_units(units)
+
+        chunks = [docs[i:i + UNIT_BATCH_SIZE] for i in range(0, len(docs), UNIT_BATCH_SIZE)]
+        stats = UnitService._commit_chunks(db, units_ref, chunks)
+
+        logger.info(
+            f"UNIT_BULK_CREATE | society_id={society_id} units={len(docs)} batches={len(chunks)} "
+            f"retries={stats['retries']} elapsed_ms={stats['elapsedMs']}"
         )
+        return {
+            "created": len(docs),
+            "societyId": society_id,
+            "path": f"public_societies/{society_id}/units",
+            "stats": stats,
+        }
 
-        batch = db.batch()
-        writes_in_batch = 0
-        processed = 0
-        seen_ids = set()
+    @staticmethod
+    def sync_units(
+        society_id: str,
+        units: List[Dict[str, Any]],
+        deactivate_missing: bool = True,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Diff the payload against the existing units and write only what changed.
 
-        def _flush():
-            nonlocal batch, writes_in_batch
-            if writes_in_batch == 0:
-                return
-            batch.commit()
-            batch = db.batch()
-            writes_in_batch = 0
+        Existing units are read once with a projection on the content fields
+        (plus contentHash). A unit is written when it is new, when its content
+        hash differs, or (with deactivate_missing) when it is active but absent
+        from the payload, in which case only active=False is written.
+        Unchanged units are not touched, so their updatedAt and app listeners stay quiet.
+        """
+        db = get_db()
+        society_id = (society_id or "").strip()
+        if not society_id:
+            raise ValueError("societyId is required")
 
-        for idx, u in enumerate(units, start=1):
-            unit_id = str(u.get("unitId") or "").strip()
-            if not unit_id:
-                raise ValueError("Each unit must have unitId")
-            if "/" in unit_id:
-                raise ValueError(f"unitId cannot contain '/': {unit_id}")
-            if unit_id in seen_ids:
-                raise ValueError(f"Duplicate unitId in payload: {unit_id}")
-            seen_ids.add(unit_id)
-
-            doc_ref = units_ref.document(unit_id)
-
-            # Optional: stable ordering if your Flutter query uses orderBy('sortKey')
-            sort_key = u.get("sortKey")
-            if sort_key is None:
-                sort_key = idx
-            try:
-                sort_key = int(sort_key)
-            except (TypeError, ValueError):
-                sort_key = idx
+        if not units:
+            raise ValueError("Units list cannot be empty")
 
-            label = str(u.get("label") or unit_id).strip()
-            if not label:
-                label = unit_id
+        units_ref = _units_ref(db, society_id)
+        docs = UnitService._normalize_units(units)
 
-            unit_type = str(u.get("type") or "FLAT").strip().upper()
-            if not unit_type:
-                unit_type = "FLAT"
+        t0 = time.perf_counter()
+        existing: Dict[str, Dict[str, Any]] = {}
+        with backend_call("firestore", "stream", "units"):
+            for snap in units_ref.select(list(UNIT_CONTENT_FIELDS) + ["contentHash"]).stream():
+                data = snap.to_dict() or {}
+                data.setdefault("unitId", snap.id)
+                existing[snap.id] = data
+        read_ms = round((time.perf_counter() - t0) * 1000, 1)
 
-            active_raw = u.get("active", True)
-            if isinstance(active_raw, bool):
-                active = active_raw
-            else:
-                active = str(active_raw).strip().lower() == "true"
+        added: List[Dict[str, Any]] = []
+        changed: List[Dict[str, Any]] = []
+        unchanged = 0
+        for doc in docs:
+            current = existing.get(doc["unitId"])
+            if current is None:
+                added.append(doc)
+                continue
+            current_hash = current.get("contentHash") or _content_hash(current)
+            if current_hash == doc["contentHash"]:
+                unchanged += 1
+                continue
+            changed_doc = dict(doc)
+            changed_doc.pop("createdAt", None)  # Keep the original creation time
+            changed.append(changed_doc)
 
-            batch.set(
-                doc_ref,
-                {
+        deactivated: List[Dict[str, Any]] = []
+        if deactivate_missing:
+            payload_ids = {d["unitId"] for d in docs}
+            for unit_id, current in existing.items():
+                if unit_id in payload_ids or current.get("active") is False:
+                    continue
+                content = dict(current, active=False)
+                deactivated.append({
                     "unitId": unit_id,
-                    "label": label,
-                    "block": u.get("block"),
-                    "floor": u.get("floor"),
-                    "type": unit_type,
-                    "active": active,
-                    "sortKey": sort_key,
-                    "createdAt": firestore.SERVER_TIMESTAMP,
+                    "active": False,
+                    "contentHash": _content_hash(content),
                     "updatedAt": firestore.SERVER_TIMESTAMP,
-                },
-                merge=True,  # ✅ safe if you re-run upload
-            )
-            writes_in_batch += 1
-            processed += 1
-            # Firestore batched writes limit is 500 operations.
-            if writes_in_batch >= 450:
-                _flush()
+                })
 
-        _flush()
+        writes = added + changed + deactivated
+        stats: Dict[str, Any] = {"readMs": read_ms, "existing": len(existing)}
+        if writes and not dry_run:
+            chunks = [writes[i:i + UNIT_BATCH_SIZE] for i in range(0, len(writes), UNIT_BATCH_SIZE)]
+            stats.update(UnitService._commit_chunks(db, units_ref, chunks))
 
+        logger.info(
+            f"UNIT_SYNC | society_id={society_id} added={len(added)} changed={len(changed)} "
+            f"deactivated={len(deactivated)} unchanged={unchanged} dry_run={dry_run}"
+        )
         return {
-            "created": processed,
+            "mode": "sync",
+            "dryRun": dry_run,
+            "societyId": society_id,
+            "path": f"public_societies/{society_id}/units",
+            "added": len(added),
+            "changed": len(changed),
+            "deactivated": len(deactivated),
+            "unchanged": unchanged,
+            "writes": 0 if dry_run else len(writes),
+            "addedIds": [d["unitId"] for d in added[:UNIT_SYNC_MAX_IDS]],
+            "changedIds": [d["unitId"] for d in changed[:UNIT_SYNC_MAX_IDS]],
+            "deactivatedIds": [d["unitId"] for d in deactivated[:UNIT_SYNC_MAX_IDS]],
+            "stats": stats,
+        }
+
+    @staticmethod
+    def _commit_chunks(db, units_ref, chunks: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Commit one WriteBatch per chunk, at most UNIT_COMMIT_CONCURRENCY in flight.
+
+        A failed chunk is rebuilt and committed again (merge=True makes the
+        retry idempotent). Raises once every chunk has finished if any chunk
+        ran out of attempts.
+        """
+        lock = threading.Lock()
+        retries = 0
+        commit_ms: List[float] = []
+
+        def _commit(chunk: List[Dict[str, Any]]) -> None:
+            nonlocal retries
+            for attempt in range(1, UNIT_COMMIT_MAX_ATTEMPTS + 1):
+                batch = db.batch()
+                for doc in chunk:
+                    batch.set(
+                        units_ref.document(doc["unitId"]),
+                        doc,
+                        merge=True,  # ✅ safe if you re-run upload
+                    )
+                t0 = time.perf_counter()
+                try:
+                    with backend_call("firestore", "batch_commit", "units"):
+                        batch.commit()
+                except Exception as e:
+                    if attempt == UNIT_COMMIT_MAX_ATTEMPTS:
+                        raise
+                    with lock:
+                        retries += 1
+                    delay = UNIT_COMMIT_BACKOFF_SEC * (2 ** (attempt - 1))
+                    logger.warning(
+                        f"UNIT_BATCH_RETRY | units={len(chunk)} attempt={attempt} err={e}"
+                    )
+                    time.sleep(delay + random.uniform(0, delay))
+                    continue
+                with lock:
+                    commit_ms.append((time.perf_counter() - t0) * 1000)
+                return
+
+        started = time.perf_counter()
+        failures: List[str] = []
+        with ThreadPoolExecutor(max_workers=UNIT_COMMIT_CONCURRENCY) as pool:
+            pending = set()
+            for chunk in chunks:
+                if len(pending) >= UNIT_COMMIT_CONCURRENCY:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    failures.extend(str(f.exception()) for f in done if f.exception())
+                pending.add(pool.submit(propagate(_commit), chunk))
+            done, _ = wait(pending)
+            failures.extend(str(f.exception()) for f in done if f.exception())
+
+        elapsed = time.perf_counter() - started
+        if failures:
+            raise Exception(
+                f"{len(failures)} of {len(chunks)} unit batches failed after "
+                f"{UNIT_COMMIT_MAX_ATTEMPTS} attempts: {failures[0]}"
+            )
+
+        units = sum(len(c) for c in chunks)
+        return {
+            "batches": len(chunks),
+            "batchSize": UNIT_BATCH_SIZE,
+            "concurrency": UNIT_COMMIT_CONCURRENCY,
+            "retries": retries,
+            "elapsedMs": round(elapsed * 1000, 1),
+            "avgBatchCommitMs": round(sum(commit_ms) / len(commit_ms), 1) if commit_ms else 0.0,
+            "maxBatchCommitMs": round(max(commit_ms), 1) if commit_ms else 0.0,
+            "unitsPerSec": round(units / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    # -----------------------------
+    # Streaming import (CSV / XLSX)
+    # -----------------------------
+    @staticmethod
+    def _rows_to_units(rows: Iterator[Iterable[Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(row_number, raw unit dict) for each non-empty data row; row 1 is the header."""
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("File is empty")
+        columns = [_column_key(h) for h in header]
+        if "unitId" not in columns:
+            raise ValueError("Header row must include a unitId column")
+
+        for row_number, values in enumerate(rows, start=2):
+            values = list(values)
+            if not any(v not in (None, "") for v in values):
+                continue
+            yield row_number, {
+                field: value
+                for field, value in zip(columns, values)
+                if field is not None
+            }
+
+    @staticmethod
+    def iter_csv_units(fileobj: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Parse a CSV upload row by row (utf-8, BOM tolerated)."""
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+        try:
+            yield from UnitService._rows_to_units(iter(csv.reader(text)))
+        finally:
+            text.detach()  # Leave the underlying upload open for its owner
+
+    @staticmethod
+    def iter_xlsx_units(fileobj: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Parse the first worksheet of an XLSX upload in openpyxl's read-only (streaming) mode."""
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("XLSX import needs openpyxl. Install with: pip install openpyxl")
+
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            yield from UnitService._rows_to_units(
+                workbook.worksheets[0].iter_rows(values_only=True)
+            )
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _validated_units(
+        rows: Iterator[Tuple[int, Dict[str, Any]]],
+        seen: Dict[str, int],
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+        """(row_number, doc, None) for valid rows, (row_number, None, error) otherwise."""
+        for row_number, raw in rows:
+            try:
+                doc = UnitService._normalize_unit(raw, row_number - 1)
+            except ValueError as e:
+                yield row_number, None, str(e)
+                continue
+            first_row = seen.get(doc["unitId"])
+            if first_row is not None:
+                yield row_number, None, f"Duplicate unitId {doc['unitId']} (first seen on row {first_row})"
+                continue
+            seen[doc["unitId"]] = row_number
+            yield row_number, doc, None
+
+    @staticmethod
+    def import_units_stream(
+        society_id: str,
+        rows: Iterator[Tuple[int, Dict[str, Any]]],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Validate and write units as they are parsed, yielding events:
+          {"event": "error", "row", "unitId", "error"}    per bad row / failed write
+          {"event": "progress", "rows", "queued", "written", "errors"}
+          {"event": "done", ...summary}
+
+        Writes go through Firestore's BulkWriter, which batches and commits
+        concurrently with its own retry/backoff; nothing is buffered here beyond
+        the unitId -> row map used for duplicate detection.
+        """
+        db = get_db()
+        units_ref = _units_ref(db, society_id)
+        started = time.perf_counter()
+
+        seen: Dict[str, int] = {}
+        lock = threading.Lock()
+        written = 0
+        failed: List[Dict[str, Any]] = []  # write failures reported by BulkWriter threads
+
+        def _on_result(reference, result, bulk_writer) -> None:
+            nonlocal written
+            with lock:
+                written += 1
+
+        def _on_error(failure, bulk_writer) -> bool:
+            if failure.attempts < 5:
+                return True  # Retry
+            unit_id = failure.operation.reference.id
+            with lock:
+                failed.append({
+                    "event": "error",
+                    "row": seen.get(unit_id),
+                    "unitId": unit_id,
+                    "error": f"Write failed: {failure.message}",
+                })
+            return False
+
+        writer = db.bulk_writer()
+        writer.on_write_result(_on_result)
+        writer.on_write_error(_on_error)
+
+        total_rows = 0
+        queued = 0
+        invalid = 0
+
+        def _drain_failures() -> List[Dict[str, Any]]:
+            with lock:
+                drained = list(failed)
+                failed.clear()
+            return drained
+
+        try:
+            for row_number, doc, error in UnitService._validated_units(rows, seen):
+                total_rows += 1
+                if error:
+                    invalid += 1
+                    yield {"event": "error", "row": row_number, "unitId": None, "error": error}
+                else:
+                    writer.set(units_ref.document(doc["unitId"]), doc, merge=True)
+                    queued += 1
+
+                if total_rows % UNIT_IMPORT_PROGRESS_EVERY == 0:
+                    for event in _drain_failures():
+                        invalid += 1
+                        yield event
+                    with lock:
+                        done_writes = written
+                    yield {
+                        "event": "progress",
+                        "rows": total_rows,
+                        "queued": queued,
+                        "written": done_writes,
+                        "errors": invalid,
+                    }
+        except ValueError as e:
+            # Header/format problem: nothing more can be parsed
+            invalid += 1
+            yield {"event": "error", "row": None, "unitId": None, "error": str(e)}
+        finally:
+            writer.close()
+
+        for event in _drain_failures():
+            invalid += 1
+            yield event
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"UNIT_IMPORT_DONE | society_id={society_id} rows={total_rows} written={written} "
+            f"errors={invalid} elapsed_sec={elapsed:.2f}"
+        )
+        yield {
+            "event": "done",
             "societyId": society_id,
-            "path": f"public_societies/{society_id}/units"
+            "rows": total_rows,
+            "written": written,
+            "errors": invalid,
+            "elapsedSec": round(elapsed, 2),
+            "path": f"public_societies/{society_id}/units",
         }
@@ -0,0 +1,383 @@
+"""
+Visitor analytics rollups
+
+Folds visitor events into compact time buckets so admin trend views never
+re-scan the Visitors tab:
+
+- per society, per UTC day: hourly arrays (24 slots) of created / approved /
+  rejected / leave-at-gate counts, bucketed by the hour the visitor arrived
+- per society, per UTC day: created -> approved latency histogram
+- per society, per flat, per UTC day: [created, approved, rejected, leave_at_gate]
+
+A society is seeded from one Visitors scan on first use and refreshed from the
+sheet at most once per _reseed_interval_sec; in between, visitor create and
+status-change events keep the buckets current.
+"""
+
+import logging
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.cache.shared import on_invalidate
+from app.repositories.storage import get_repositories
+from app.sheets.quota import PRIORITY_BULK, sheets_priority
+from app.observability.tracing import trace_methods
+
+logger = logging.getLogger(__name__)
+
+# Series stored per hour / per flat, in array slot order
+SERIES = ("created", "approved", "rejected", "leave_at_gate")
+_OUTCOME_SLOT = {"APPROVED": 1, "REJECTED": 2, "LEAVE_AT_GATE": 3}
+
+# Upper bounds (seconds) of the created -> approved latency buckets; last bucket is open-ended
+LATENCY_BUCKETS_SEC = (30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _latency_bucket(seconds: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS_SEC):
+        if seconds <= bound:
+            return i
+    return len(LATENCY_BUCKETS_SEC)
+
+
+@trace_methods
+class VisitorAnalyticsService:
+    """In-memory rollup engine for visitor trends"""
+
+    def __init__(self):
+        self.repos = get_repositories()
+
+        # society_id -> rollup dict (see _empty_rollup)
+        self._rollups: Dict[str, Dict] = {}
+        self._retain_days: int = 31
+        self._reseed_interval_sec: int = 3600  # 1 hour
+
+        self._seeding: Set[str] = set()
+        # society_id -> events seen while a seed for it is in flight
+        self._replay: Dict[str, List[Tuple[str, Dict]]] = {}
+        self._lock = threading.Lock()
+
+        # Visitor events published by other workers
+        on_invalidate("visitor_events", self._on_remote_event)
+
+    def _empty_rollup(self) -> Dict:
+        return {
+            "seeded_at": 0.0,
+            # day_key -> array('i', 24 * len(SERIES)), slot = series * 24 + hour
+            "hourly": {},
+            # day_key -> (array('i', len(LATENCY_BUCKETS_SEC) + 1), [sum_seconds])
+            "latency": {},
+            # flat_no -> {day_key: array('i', len(SERIES))}
+            "flats": {},
+            # visitor_id -> (day_key, hour, flat_no, status, latency_sec or None)
+            "visitors": {},
+        }
+
+    def _oldest_retained_day(self) -> date:
+        return datetime.now(timezone.utc).date() - timedelta(days=self._retain_days - 1)
+
+    # -----------------------------
+    # Seeding
+    # -----------------------------
+    def _get_rollup(self, society_id: str) -> Dict:
+        with self._lock:
+            rollup = self._rollups.get(society_id)
+
+        if rollup is None:
+            return self.seed(society_id)
+        if time.time() - rollup["seeded_at"] > self._reseed_interval_sec:
+            self._seed_in_background(society_id)
+        return rollup
+
+    @sheets_priority(PRIORITY_BULK)
+    def seed(self, society_id: str) -> Dict:
+        """Rebuild one society's rollups from the Visitors tab."""
+        with self._lock:
+            self._replay.setdefault(society_id, [])
+
+        try:
+            rollup = self._empty_rollup()
+            for v in self.repos.visitors.list(society_id=society_id):
+                self._apply_event(rollup, "created", v)
+                if (v.get("status") or "").strip().upper() != "PENDING":
+                    self._apply_event(rollup, "status", v)
+            rollup["seeded_at"] = time.time()
+        except Exception:
+            with self._lock:
+                self._replay.pop(society_id, None)
+            raise
+
+        with self._lock:
+            for kind, visitor in self._replay.pop(society_id, []):
+                self._apply_event(rollup, kind, visitor)
+            self._rollups[society_id] = rollup
+
+        logger.info(
+            f"VISITOR_ANALYTICS_SEEDED | society_id={society_id} "
+            f"tracked_visitors={len(rollup['visitors'])}"
+        )
+        return rollup
+
+    def _seed_in_background(self, society_id: str) -> None:
+        with self._lock:
+            if society_id in self._seeding:
+                return
+            self._seeding.add(society_id)
+
+        def _run():
+            try:
+                self.seed(society_id)
+            except Exception as e:
+                logger.warning(f"VISITOR_ANALYTICS_SEED_FAIL | society_id={society_id} err={e}")
+            finally:
+                with self._lock:
+                    self._seeding.discard(society_id)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    # -----------------------------
+    # Events
+    # -----------------------------
+    def record_visitor_created(self, visitor: Dict) -> None:
+        self._record_event("created", visitor)
+
+    def record_visitor_status(self, visitor: Dict) -> None:
+        self._record_event("status", visitor)
+
+    def _on_remote_event(self, kind: Optional[str], visitor: Optional[Dict]) -> None:
+        """Another worker's visitor event (kind None: events may have been lost, so reseed)."""
+        if kind is None or visitor is None:
+            with self._lock:
+                for rollup in self._rollups.values():
+                    rollup["seeded_at"] = 0.0
+            return
+        self._record_event(kind, visitor)
+
+    def _record_event(self, kind: str, visitor: Dict) -> None:
+        society_id = (visitor.get("society_id") or "").strip()
+        if not society_id:
+            return
+        with self._lock:
+            if society_id in self._replay:
+                self._replay[society_id].append((kind, visitor))
+            rollup = self._rollups.get(society_id)
+            if rollup is not None:
+                self._apply_event(rollup, kind, visitor)
+
+    def _apply_event(self, rollup: Dict, kind: str, visitor: Dict) -> None:
+        visitor_id = (visitor.get("visitor_id") or "").strip()
+        if not visitor_id:
+            return
+        tracked = rollup["visitors"].get(visitor_id)
+
+        if kind == "created":
+            created = _parse_ts(visitor.get("created_at"))
+            if tracked is not None or created is None or created.date() < self._oldest_retained_day():
+                return
+            day_key = created.date().isoformat()
+            flat_no = (visitor.get("flat_no") or "").strip().upper()
+            self._hourly(rollup, day_key)[created.hour] += 1
+            self._flat_day(rollup, flat_no, day_key)[0] += 1
+            rollup["visitors"][visitor_id] = (day_key, created.hour, flat_no, "PENDING", None)
+            self._prune(rollup)
+            return
+
+        if tracked is None:
+            return
+        day_key, hour, flat_no, old_status, old_latency = tracked
+        status = (visitor.get("status") or "").strip().upper()
+        if status == old_status:
+            return
+
+        hourly = self._hourly(rollup, day_key)
+        flat_day = self._flat_day(rollup, flat_no, day_key)
+
+        old_slot = _OUTCOME_SLOT.get(old_status)
+        if old_slot is not None:
+            hourly[old_slot * 24 + hour] -= 1
+            flat_day[old_slot] -= 1
+        if old_latency is not None:
+            hist, total = self._latency(rollup, day_key)
+            hist[_latency_bucket(old_latency)] -= 1
+            total[0] -= old_latency
+
+        new_slot = _OUTCOME_SLOT.get(status)
+        if new_slot is not None:
+            hourly[new_slot * 24 + hour] += 1
+            flat_day[new_slot] += 1
+
+        latency = None
+        if status == "APPROVED":
+            created = _parse_ts(visitor.get("created_at"))
+            approved = _parse_ts(visitor.get("approved_at"))
+            if created and approved and approved >= created:
+                latency = (approved - created).total_seconds()
+                hist, total = self._latency(rollup, day_key)
+                hist[_latency_bucket(latency)] += 1
+                total[0] += latency
+
+        rollup["visitors"][visitor_id] = (day_key, hour, flat_no, status, latency)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def get_analytics(
+        self,
+        society_id: str,
+        start: date,
+        end: date,
+        flat_no: Optional[str] = None,
+        top_flats: int = 20,
+    ) -> Dict:
+        """
+        Trends for [start, end] (UTC days, inclusive, clamped to the retained window).
+        """
+        rollup = self._get_rollup(society_id)
+
+        start = max(start, self._oldest_retained_day())
+        end = min(end, datetime.now(timezone.utc).date())
+        days: List[str] = []
+        d = start
+        while d <= end:
+            days.append(d.isoformat())
+            d += timedelta(days=1)
+
+        flat_filter = (flat_no or "").strip().upper() or None
+        n_buckets = len(LATENCY_BUCKETS_SEC) + 1
+
+        with self._lock:
+            hourly_out = []
+            daily_out = []
+            latency_counts = [0] * n_buckets
+            latency_sum = 0.0
+
+            for day_key in days:
+                if flat_filter:
+                    per_flat = rollup["flats"].get(flat_filter, {}).get(day_key)
+                    totals = list(per_flat) if per_flat else [0] * len(SERIES)
+                else:
+                    hourly = rollup["hourly"].get(day_key)
+                    series = (
+                        {name: list(hourly[i * 24:(i + 1) * 24]) for i, name in enumerate(SERIES)}
+                        if hourly
+                        else {name: [0] * 24 for name in SERIES}
+                    )
+                    hourly_out.append({"date": day_key, **series})
+                    totals = [sum(series[name]) for name in SERIES]
+
+                    latency = rollup["latency"].get(day_key)
+                    if latency:
+                        for i, c in enumerate(latency[0]):
+                            latency_counts[i] += c
+                        latency_sum += latency[1][0]
+
+                daily_out.append({"date": day_key, **dict(zip(SERIES, totals))})
+
+            flats_out = []
+            if not flat_filter:
+                day_set = set(days)
+                for f_no, by_day in rollup["flats"].items():
+                    totals = [0] * len(SERIES)
+                    for day_key, counts in by_day.items():
+                        if day_key in day_set:
+                            for i, c in enumerate(counts):
+                                totals[i] += c
+                    if not totals[0]:
+                        continue
+                    flats_out.append({
+                        "flat_no": f_no,
+                        **dict(zip(SERIES, totals)),
+                        "rejection_rate": round(totals[2] / totals[0], 4),
+                    })
+                flats_out.sort(key=lambda x: x["created"], reverse=True)
+                flats_out = flats_out[:top_flats]
+
+        approved_with_latency = sum(latency_counts)
+        result = {
+            "society_id": society_id,
+            "from": days[0] if days else start.isoformat(),
+            "to": end.isoformat(),
+            "timezone": "UTC",
+            "series": list(SERIES),
+            "daily": daily_out,
+        }
+        if flat_filter:
+            result["flat_no"] = flat_filter
+        else:
+            result["hourly"] = hourly_out
+            result["approval_latency"] = {
+                "bucket_upper_bounds_sec": list(LATENCY_BUCKETS_SEC),
+                "counts": latency_counts,
+                "mean_sec": round(latency_sum / approved_with_latency, 1) if approved_with_latency else None,
+            }
+            result["flats"] = flats_out
+        return result
+
+    # -----------------------------
+    # Helpers (caller holds the lock or owns the rollup)
+    # -----------------------------
+    def _hourly(self, rollup: Dict, day_key: str) -> array:
+        hourly = rollup["hourly"].get(day_key)
+        if hourly is None:
+            hourly = rollup["hourly"][day_key] = array("i", [0] * (24 * len(SERIES)))
+        return hourly
+
+    def _flat_day(self, rollup: Dict, flat_no: str, day_key: str) -> array:
+        by_day = rollup["flats"].setdefault(flat_no, {})
+        counts = by_day.get(day_key)
+        if counts is None:
+            counts = by_day[day_key] = array("i", [0] * len(SERIES))
+        return counts
+
+    def _latency(self, rollup: Dict, day_key: str) -> Tuple[array, List[float]]:
+        latency = rollup["latency"].get(day_key)
+        if latency is None:
+            latency = rollup["latency"][day_key] = (
+                array("i", [0] * (len(LATENCY_BUCKETS_SEC) + 1)),
+                [0.0],
+            )
+        return latency
+
+    def _prune(self, rollup: Dict) -> None:
+        oldest_key = self._oldest_retained_day().isoformat()
+        if not any(d < oldest_key for d in rollup["hourly"]):
+            return
+        for bucket in (rollup["hourly"], rollup["latency"]):
+            for d in [d for d in bucket if d < oldest_key]:
+                bucket.pop(d, None)
+        for f_no in list(rollup["flats"]):
+            by_day = rollup["flats"][f_no]
+            for d in [d for d in by_day if d < oldest_key]:
+                by_day.pop(d, None)
+            if not by_day:
+                rollup["flats"].pop(f_no, None)
+        rollup["visitors"] = {
+            vid: entry for vid, entry in rollup["visitors"].items() if entry[0] >= oldest_key
+        }
+
+
+# Singleton instance
+_visitor_analytics_service: Optional[VisitorAnalyticsService] = None
+
+
+def get_visitor_analytics_service() -> VisitorAnalyticsService:
+    """Get singleton VisitorAnalyticsService instance"""
+    global _visitor_analytics_service
+    if _visitor_analytics_service is None:
+        _visitor_analytics_service = VisitorAnalyticsService()
+    return _visitor_analytics_service
@@ -2,34 +2,93 @@
 Visitor service for visitor entry management
 """
 
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Tuple
+from functools import lru_cache
+from typing import Iterator, List, Optional, Dict
 import uuid
 import logging
-import time
+import threading
 import re
 
 from fastapi import HTTPException
 
-from app.sheets.client import get_sheets_client
+from app.cache.shared import SharedCache, invalidate
+from app.repositories.storage import get_repositories
+from app.sheets.quota import PRIORITY_CRITICAL, sheets_priority
+from app.observability.tracing import trace_methods, traced
 from app.models.schemas import VisitorResponse
 from app.models.enums import VisitorStatus
 
 logger = logging.getLogger(__name__)
 
+# Encoded visitor JSON fragments kept for list endpoints (keyed by the whole row)
+VISITOR_FRAGMENT_CACHE_SIZE = 20000
+# Visitors per chunk when streaming a list response
+VISITOR_STREAM_CHUNK = 256
+
+
+@lru_cache(maxsize=65536)
+def parse_visitor_ts(value: str) -> Optional[datetime]:
+    """
+    ISO timestamp from the sheet -> aware UTC datetime (None if unparseable).
+    Cached: list endpoints see the same created_at strings on every call.
+    """
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def publish_visitor_event(kind: str, visitor: dict) -> None:
+    """
+    Best-effort fan-out of a visitor "created"/"status" event to in-memory
+    aggregates, in this worker and (via the cache bus) every other one.
+    Never raises: counters are reconciled from the sheet anyway.
+    """
+    from app.services.dashboard_stats_service import get_dashboard_stats_service
+    from app.services.visitor_analytics_service import get_visitor_analytics_service
 
+    for get_sink in (get_dashboard_stats_service, get_visitor_analytics_service):
+        try:
+            sink = get_sink()
+            if kind == "created":
+                sink.record_visitor_created(visitor)
+            else:
+                sink.record_visitor_status(visitor)
+        except Exception as e:
+            logger.warning(f"VISITOR_EVENT_PUBLISH_FAIL | kind={kind} sink={get_sink.__name__} err={e}")
+
+    try:
+        invalidate("visitor_events", kind, data=visitor, local=False)
+    except Exception as e:
+        logger.warning(f"VISITOR_EVENT_PUBLISH_FAIL | kind={kind} sink=cache_bus err={e}")
+
+
+@trace_methods
 class VisitorService:
     """Service for visitor-related operations"""
 
     def __init__(self):
-        self.sheets_client = get_sheets_client()
+        self.repos = get_repositories()
 
         # -----------------------------
         # Flat cache (society-scoped)
         # -----------------------------
-        # society_id -> (expires_at_epoch, {flat_no_norm: flat_dict})
-        self._flat_cache: Dict[str, Tuple[float, Dict[str, dict]]] = {}
+        # society_id -> {flat_no_norm: flat_dict}, shared by all workers
         self._flat_cache_ttl_sec: int = 300  # 5 minutes
+        self._flat_cache = SharedCache("visitor_flat_map", self._flat_cache_ttl_sec)
+
+        # -----------------------------
+        # Encoded visitor fragments (LRU)
+        # -----------------------------
+        # tuple(row items) -> VisitorResponse JSON bytes; an edited row is a new
+        # key, so entries never need invalidating
+        self._fragment_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._fragment_lock = threading.Lock()
 
     # -----------------------------
     # Flat No Normalizer
@@ -42,25 +101,20 @@ class VisitorService:
         return re.sub(r"_+", "_", cleaned).strip("_")
 
     def clear_flat_cache(self, society_id: Optional[str] = None) -> None:
-        """Utility to clear flat cache (useful for testing)."""
-        if society_id:
-            self._flat_cache.pop(society_id, None)
-        else:
-            self._flat_cache.clear()
+        """Utility to clear flat cache in every worker (useful for testing)."""
+        self._flat_cache.delete(society_id or None)
 
     def _get_flat_map_cached(self, society_id: str) -> Dict[str, dict]:
         """
         Build/return cached map: flat_no_norm -> flat_dict for a society.
-        Uses SheetsClient.get_flats(society_id=...) which already returns active flats only.
+        Uses repos.flats.list(society_id=...) which already returns active flats only.
         """
-        now = time.time()
         cached = self._flat_cache.get(society_id)
-
-        if cached and cached[0] > now:
-            return cached[1]
+        if cached is not None:
+            return cached
 
         # Cache miss/expired: fetch once and build map
-        flats = self.sheets_client.get_flats(society_id=society_id)
+        flats = self.repos.flats.list(society_id=society_id)
 
         m: Dict[str, dict] = {}
         for f in flats:
@@ -68,7 +122,7 @@ class VisitorService:
             if k:
                 m[k] = f
 
-        self._flat_cache[society_id] = (now + self._flat_cache_ttl_sec, m)
+        self._flat_cache.set(society_id, m)
 
         logger.info(
             f"FLAT_CACHE_REFRESHED | society_id={society_id} flats_cached={len(m)} ttl_sec={self._flat_cache_ttl_sec}"
@@ -78,6 +132,7 @@ class VisitorService:
     # -----------------------------
     # Flat Resolver
     # -----------------------------
+    @traced()
     def _resolve_flat(
         self,
         society_id: str,
@@ -93,7 +148,7 @@ class VisitorService:
 
         # 1) Try flat_id if provided (no change)
         if flat_id:
-            flat = self.sheets_client.get_flat_by_id(flat_id, active_only=True)
+            flat = self.repos.flats.get(flat_id, active_only=True)
             if flat:
                 return flat
 
@@ -112,7 +167,7 @@ class VisitorService:
                 logger.warning(f"RESOLVE_FLAT_CACHE_FAIL | society_id={society_id} err={e}")
 
             # 2b) Fallback: direct sheet lookup (keeps existing behavior intact)
-            flat = self.sheets_client.get_flat_by_no(
+            flat = self.repos.flats.get_by_no(
                 society_id=society_id,
                 flat_no=flat_no_norm,
                 active_only=True,
@@ -135,6 +190,7 @@ class VisitorService:
             detail="Flat not found. Please enter valid Flat No (e.g., A-101).",
         )
 
+    @sheets_priority(PRIORITY_CRITICAL)
     def create_visitor(
         self,
         flat_id: Optional[str],
@@ -154,7 +210,7 @@ class VisitorService:
         """
 
         # Validate guard exists FIRST (source of truth for society_id)
-        guard = self.sheets_client.get_guard_by_id(guard_id)
+        guard = self.repos.guards.get(guard_id)
         if not guard:
             raise HTTPException(status_code=400, detail=f"Guard with ID {guard_id} not found")
 
@@ -198,7 +254,8 @@ class VisitorService:
         }
 
         # Append to Visitors sheet
-        self.sheets_client.create_visitor(visitor_data)
+        self.repos.visitors.create(visitor_data)
+        publish_visitor_event("created", visitor_data)
 
         # Log approval stub to resident phone
         self._log_approval_request(flat, visitor_data)
@@ -344,6 +401,7 @@ class VisitorService:
 
 
 
+    @sheets_priority(PRIORITY_CRITICAL)
     def create_visitor_with_photo(
         self,
         flat_id: Optional[str],
@@ -368,6 +426,10 @@ class VisitorService:
         MVP semantics: return visitors from the LAST 24 HOURS (rolling window),
         instead of calendar 'today'. This avoids timezone confusion.
         """
+        return [self._dict_to_visitor_response(v) for v in self.get_visitors_today_rows(guard_id)]
+
+    def get_visitors_today_rows(self, guard_id: str) -> List[Dict]:
+        """get_visitors_today as raw sheet dicts (for encode_visitor_list)"""
         now_utc = datetime.now(timezone.utc)
         cutoff = now_utc - timedelta(hours=24)
 
@@ -376,7 +438,7 @@ class VisitorService:
         )
 
         # Fetch by guard only (fast + minimal)
-        visitors = self.sheets_client.get_visitors(guard_id=guard_id)
+        visitors = self.repos.visitors.list(guard_id=guard_id)
 
         filtered = []
         for v in visitors:
@@ -384,34 +446,38 @@ class VisitorService:
             if not created_at_str:
                 continue
 
-            try:
-                dt = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-
-                # keep only last 24 hours
-                if dt >= cutoff:
-                    filtered.append(v)
-
-            except Exception as e:
+            dt = parse_visitor_ts(created_at_str)
+            if dt is None:
                 logger.warning(
-                    f"RECENT_24H_PARSE_FAIL | guard_id={guard_id} created_at='{created_at_str}' err={e}"
+                    f"RECENT_24H_PARSE_FAIL | guard_id={guard_id} created_at='{created_at_str}'"
                 )
                 continue
 
+            # keep only last 24 hours
+            if dt >= cutoff:
+                filtered.append(v)
+
         # Sort newest first
         filtered.sort(key=lambda x: x.get("created_at", ""), reverse=True)
 
         logger.info(f"RECENT_VISITORS_24H_RESULT | guard_id={guard_id} count={len(filtered)}")
-        return [self._dict_to_visitor_response(v) for v in filtered]
+        return filtered
 
     def get_visitors_by_flat(self, flat_id: str) -> List[VisitorResponse]:
         """Legacy: Get all visitors for a flat by flat_id"""
-        visitors = self.sheets_client.get_visitors(flat_id=flat_id)
+        visitors = self.repos.visitors.list(flat_id=flat_id)
         return [self._dict_to_visitor_response(v) for v in visitors]
 
     def get_visitors_by_flat_no(self, guard_id: str, flat_no: str) -> List[VisitorResponse]:
+        return [
+            self._dict_to_visitor_response(v)
+            for v in self.get_visitors_by_flat_no_rows(guard_id=guard_id, flat_no=flat_no)
+        ]
+
+    def get_visitors_by_flat_no_rows(self, guard_id: str, flat_no: str) -> List[Dict]:
         """
+        get_visitors_by_flat_no as raw sheet dicts (for encode_visitor_list).
+
         MVP approach:
         - Guard enters flat_no (A-101)
         - Validate guard and society_id
@@ -426,7 +492,7 @@ class VisitorService:
             raise HTTPException(status_code=400, detail="flat_no is required")
 
         # 1) Validate guard & derive society_id
-        guard = self.sheets_client.get_guard_by_id(guard_id)
+        guard = self.repos.guards.get(guard_id)
         if not guard:
             logger.warning(f"GET_VISITORS_BY_FLAT_NO_GUARD_NOT_FOUND | guard_id={guard_id}")
             raise HTTPException(status_code=400, detail=f"Guard with ID {guard_id} not found")
@@ -441,59 +507,42 @@ class VisitorService:
         # 2) Resolve flat to ensure active/valid (now cache-backed via _resolve_flat)
         _ = self._resolve_flat(society_id=society_id, flat_id=None, flat_no=flat_no_norm)
 
-        # 3) Fetch visitors (prefer by flat_no + society_id)
-        try:
-            visitors = self.sheets_client.get_visitors(
-                society_id=society_id,
-                flat_no=flat_no_norm,
-            )
-        except TypeError:
-            # Fallback for older sheets_client that doesn't support flat_no filter
-            logger.warning(
-                "Sheets client get_visitors does not support flat_no filter yet; falling back to flat_id resolution."
-            )
-            flat = self._resolve_flat(society_id=society_id, flat_no=flat_no_norm)
-            resolved_flat_id = flat.get("flat_id")
-            visitors = self.sheets_client.get_visitors(flat_id=resolved_flat_id)
+        # 3) Fetch visitors by flat_no + society_id
+        visitors = self.repos.visitors.list(society_id=society_id, flat_no=flat_no_norm)
 
         logger.info(f"GET_VISITORS_BY_FLAT_NO_RESULT | flat_no={flat_no_norm} count={len(visitors)}")
-        return [self._dict_to_visitor_response(v) for v in visitors]
+        return visitors
 
     def _dict_to_visitor_response(self, visitor_dict: dict) -> VisitorResponse:
         """Convert visitor dict to VisitorResponse"""
+        return VisitorResponse(**self._visitor_fields(visitor_dict))
+
+    def _visitor_fields(self, visitor_dict: dict) -> dict:
+        """VisitorResponse fields of a visitor dict (timestamps parsed, photo URL derived)"""
 
         created_at_str = visitor_dict.get("created_at", "")
         approved_at_str = visitor_dict.get("approved_at", "")
 
         # Parse created_at (ISO UTC format)
-        try:
+        created_at = parse_visitor_ts(created_at_str) if created_at_str else None
+        if created_at is None:
             if created_at_str:
-                created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                if created_at.tzinfo is None:
-                    created_at = created_at.replace(tzinfo=timezone.utc)
-            else:
-                created_at = datetime.now(timezone.utc)
-        except Exception as e:
-            logger.warning(f"Failed to parse created_at '{created_at_str}': {e}")
+                logger.warning(f"Failed to parse created_at '{created_at_str}'")
             created_at = datetime.now(timezone.utc)
 
         # Parse approved_at (optional)
         approved_at = None
         if approved_at_str:
-            try:
-                approved_at = datetime.fromisoformat(approved_at_str.replace("Z", "+00:00"))
-                if approved_at.tzinfo is None:
-                    approved_at = approved_at.replace(tzinfo=timezone.utc)
-            except Exception as e:
-                logger.warning(f"Failed to parse approved_at '{approved_at_str}': {e}")
-                approved_at = None
+            approved_at = parse_visitor_ts(approved_at_str)
+            if approved_at is None:
+                logger.warning(f"Failed to parse approved_at '{approved_at_str}'")
 
         photo_path = visitor_dict.get("photo_path") or None
         photo_url = None
         if photo_path:
             photo_url = f"/uploads/{photo_path}".replace("//", "/")
 
-        return VisitorResponse(
+        return dict(
             visitor_id=visitor_dict.get("visitor_id", ""),
             society_id=visitor_dict.get("society_id", ""),
             flat_id=visitor_dict.get("flat_id", ""),
@@ -510,6 +559,48 @@ class VisitorService:
             note=visitor_dict.get("note") or None,
         )
 
+    # -----------------------------
+    # List serialization fast path
+    # -----------------------------
+    def _visitor_json(self, visitor_dict: dict) -> bytes:
+        """One VisitorResponse as JSON bytes, served from the fragment cache when the row is unchanged."""
+        try:
+            key = tuple(visitor_dict.items())
+            hash(key)
+        except TypeError:
+            key = None
+
+        if key is not None:
+            with self._fragment_lock:
+                fragment = self._fragment_cache.get(key)
+                if fragment is not None:
+                    self._fragment_cache.move_to_end(key)
+                    return fragment
+
+        # Hot path for long lists: sheet rows are plain strings, so skip
+        # re-validating them (every other caller builds a validated model)
+        visitor = VisitorResponse.model_construct(**self._visitor_fields(visitor_dict))
+        fragment = visitor.model_dump_json().encode("utf-8")
+
+        # Rows without a parseable created_at render "now"; don't freeze that
+        if key is not None and parse_visitor_ts(visitor_dict.get("created_at") or "") is not None:
+            with self._fragment_lock:
+                self._fragment_cache[key] = fragment
+                if len(self._fragment_cache) > VISITOR_FRAGMENT_CACHE_SIZE:
+                    self._fragment_cache.popitem(last=False)
+        return fragment
+
+    def encode_visitor_list(self, visitors: List[Dict]) -> Iterator[bytes]:
+        """
+        VisitorListResponse JSON ({"visitors": [...], "count": n}) in chunks,
+        so long histories are never held as one big string.
+        """
+        yield b'{"visitors":['
+        for start in range(0, len(visitors), VISITOR_STREAM_CHUNK):
+            chunk = b",".join(self._visitor_json(v) for v in visitors[start:start + VISITOR_STREAM_CHUNK])
+            yield (b"," + chunk) if start else chunk
+        yield b'],"count":%d}' % len(visitors)
+
     def _log_approval_request(self, flat: dict, visitor_data: dict):
         """Stub approval log (WhatsApp/SMS in future)"""
         resident_phone = flat.get("resident_phone", "")
@@ -531,6 +622,7 @@ class VisitorService:
         print(f"  Visitor ID: {visitor_id}")
         print(f"  Message: Reply YES/NO to approve/reject")
 
+    @sheets_priority(PRIORITY_CRITICAL)
     def update_visitor_status(
         self,
         visitor_id: str,
@@ -559,7 +651,7 @@ class VisitorService:
             f"UPDATE_STATUS | visitor_id={visitor_id} status={status_norm} approved_by={approved_by} note={note}"
         )
 
-        updated = self.sheets_client.update_visitor_status(
+        updated = self.repos.visitors.update_status(
             visitor_id=visitor_id,
             status=status_norm,
             approved_at=approved_at,
@@ -570,9 +662,9 @@ class VisitorService:
         if not updated:
             raise HTTPException(status_code=404, detail="Visitor not found")
 
+        publish_visitor_event("status", updated)
         return self._dict_to_visitor_response(updated)
 
-
 # Singleton instance
 _visitor_service: Optional[VisitorService] = None
 
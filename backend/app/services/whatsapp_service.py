@@ -3,6 +3,9 @@ import logging
 import httpx
 from typing import Optional
 
+from app.observability.metrics import backend_call
+from app.observability.tracing import trace_methods
+
 logger = logging.getLogger(__name__)
 
 WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
@@ -10,6 +13,7 @@ PHONE_NUMBER_ID = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
 API_VERSION = os.getenv("WHATSAPP_API_VERSION", "v21.0")
 
 
+@trace_methods
 class WhatsAppService:
     def __init__(self):
         if not WHATSAPP_TOKEN or not PHONE_NUMBER_ID:
@@ -33,8 +37,11 @@ class WhatsAppService:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(self.base_url, json=payload, headers=headers)
+        with backend_call("whatsapp", "send_text") as call:
+            async with httpx.AsyncClient(timeout=20) as client:
+                resp = await client.post(self.base_url, json=payload, headers=headers)
+            if resp.status_code >= 400:
+                call.fail()
 
         try:
             data = resp.json()
@@ -88,8 +95,11 @@ class WhatsAppService:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(self.base_url, json=payload, headers=headers)
+        with backend_call("whatsapp", "send_template") as call:
+            async with httpx.AsyncClient(timeout=20) as client:
+                resp = await client.post(self.base_url, json=payload, headers=headers)
+            if resp.status_code >= 400:
+                call.fail()
 
         try:
             data = resp.json()
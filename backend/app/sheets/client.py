@@ -4,26 +4,73 @@ Handles all interactions with Google Sheets
 """
 
 import os
+import hmac
+import time
+import bisect
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import Callable, List, Dict, Optional, Tuple
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app.cache.shared import invalidate, on_invalidate
 from app.config import settings
+from app.observability.metrics import backend_call, record_cache, record_coalesced, record_rows_read
+from app.observability.tracing import trace_methods
+from app.repositories.rows import normalize_flat_no, normalize_phone
+from app.sheets.quota import SheetsQuotaError, current_priority, get_quota_governor
+from app.sheets.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 settings.GOOGLE_SERVICE_ACCOUNT_FILE
 
 
+def _col_letters(index: int) -> str:
+    """0-based column index -> A1 letters (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def _copy_rows(rows: List[List]) -> List[List]:
+    return [list(row) for row in rows]
+
+
+def _copy_tabs(tabs: Dict[str, List[List]]) -> Dict[str, List[List]]:
+    return {name: _copy_rows(rows) for name, rows in tabs.items()}
+
+
+@trace_methods
 class SheetsClient:
     """Google Sheets client wrapper"""
 
     def __init__(self):
         self.service = None
         self.spreadsheet_id = settings.SHEETS_SPREADSHEET_ID
+        if settings.SHEETS_BACKEND == "fake":
+            self.spreadsheet_id = self.spreadsheet_id or "fake"
+
+        # -----------------------------
+        # Residents replica (shared by login/profile/FCM lookups)
+        # -----------------------------
+        self._residents_replica: Optional[Dict] = None
+        self._residents_replica_ttl_sec: int = 120
+        self._residents_replica_min_refresh_sec: int = 30
+        self._residents_lock = threading.Lock()
+
+        # In-flight reads keyed by range; writes to a sheet detach its reads
+        self._reads = SingleFlight(on_join=self._on_read_coalesced)
+        # Token buckets + retry policy shared by every API call
+        self._quota = get_quota_governor()
+
+        # sheet title -> numeric sheetId (needed for row deletes)
+        self._sheet_ids: Dict[str, int] = {}
 
         # Validate configuration
         if not self.spreadsheet_id:
@@ -35,8 +82,17 @@ class SheetsClient:
         self._initialize_service()
         self._validate_connection()
 
+        # Residents writes in other workers
+        on_invalidate("residents", self._evict_residents_replica)
+
     def _initialize_service(self):
         """Initialize Google Sheets API service"""
+        if settings.SHEETS_BACKEND == "fake":
+            from app.sheets.fake_backend import FakeSheetsService, get_fake_spreadsheet
+
+            self.service = FakeSheetsService(get_fake_spreadsheet())
+            logger.warning("SHEETS_BACKEND=fake: using the in-process Sheets stand-in")
+            return
         try:
             creds_path = settings.GOOGLE_SHEETS_CREDENTIALS_PATH
             if not os.path.exists(creds_path):
@@ -77,41 +133,121 @@ class SheetsClient:
             else:
                 raise Exception(f"Error accessing spreadsheet: {str(e)}")
 
+    # -----------------------------
+    # Reads (single-flight: concurrent identical reads share one API call)
+    # -----------------------------
+    @staticmethod
+    def _read_key(op: str, target) -> tuple:
+        # Priority is part of the key: a read shares its caller's quota reserve
+        # and wait budget, so a critical read must not join (and inherit the
+        # SheetsQuotaError of) a bulk read's flight
+        return (op, target, current_priority())
+
     def _get_sheet_values(self, sheet_name: str, range_name: str = None) -> List[List]:
         """Get values from a sheet"""
+        range_str = f"{sheet_name}!{range_name}" if range_name else sheet_name
+        return self._reads.do(
+            self._read_key("read", range_str),
+            lambda: self._fetch_sheet_values(sheet_name, range_str),
+            copy=_copy_rows,
+            tags=(sheet_name,),
+        )
+
+    async def aget_sheet_values(self, sheet_name: str, range_name: str = None) -> List[List]:
+        """_get_sheet_values for async callers (joins the same in-flight reads)."""
+        range_str = f"{sheet_name}!{range_name}" if range_name else sheet_name
+        return await self._reads.ado(
+            self._read_key("read", range_str),
+            lambda: self._fetch_sheet_values(sheet_name, range_str),
+            copy=_copy_rows,
+            tags=(sheet_name,),
+        )
+
+    def _batch_get_sheet_values(self, sheet_names: List[str]) -> Dict[str, List[List]]:
+        """
+        Get values from several sheets in one round trip (values.batchGet).
+        Returns {sheet_name: rows}, rows being [] for an empty sheet.
+        """
+        if not sheet_names:
+            return {}
+        return self._reads.do(
+            self._read_key("batch_read", tuple(sorted(sheet_names))),
+            lambda: self._fetch_batch_values(sheet_names),
+            copy=_copy_tabs,
+            tags=sheet_names,
+        )
+
+    async def abatch_get_sheet_values(self, sheet_names: List[str]) -> Dict[str, List[List]]:
+        """_batch_get_sheet_values for async callers (joins the same in-flight reads)."""
+        if not sheet_names:
+            return {}
+        return await self._reads.ado(
+            self._read_key("batch_read", tuple(sorted(sheet_names))),
+            lambda: self._fetch_batch_values(sheet_names),
+            copy=_copy_tabs,
+            tags=sheet_names,
+        )
+
+    def _execute(self, bucket: str, op: str, target: str, request, idempotent: bool = True):
+        """Execute one API request under the quota governor (token bucket + retries)."""
+        def _attempt():
+            with backend_call("sheets", op, target):
+                return request.execute()
+
+        return self._quota.call(bucket, _attempt, idempotent=idempotent)
+
+    def _on_read_coalesced(self, key: tuple) -> None:
+        op, target, _ = key
+        record_coalesced("sheets", op, target if isinstance(target, str) else ",".join(target))
+
+    def _fetch_sheet_values(self, sheet_name: str, range_str: str) -> List[List]:
         try:
-            if range_name:
-                range_str = f"{sheet_name}!{range_name}"
-            else:
-                range_str = sheet_name
-
-            result = (
-                self.service.spreadsheets()
-                .values()
-                .get(spreadsheetId=self.spreadsheet_id, range=range_str)
-                .execute()
+            result = self._execute(
+                "read", "read", sheet_name,
+                self.service.spreadsheets().values().get(spreadsheetId=self.spreadsheet_id, range=range_str),
             )
 
-            return result.get("values", [])
+            values = result.get("values", [])
+            record_rows_read(sheet_name, len(values))
+            return values
         except HttpError as e:
             raise Exception(f"Error reading from sheet {sheet_name}: {str(e)}")
 
+    def _fetch_batch_values(self, sheet_names: List[str]) -> Dict[str, List[List]]:
+        try:
+            result = self._execute(
+                "read", "batch_read", ",".join(sorted(sheet_names)),
+                self.service.spreadsheets().values().batchGet(
+                    spreadsheetId=self.spreadsheet_id, ranges=list(sheet_names),
+                ),
+            )
+
+            # valueRanges come back in request order
+            values = {name: [] for name in sheet_names}
+            for name, vr in zip(sheet_names, result.get("valueRanges", [])):
+                values[name] = vr.get("values", [])
+                record_rows_read(name, len(values[name]))
+            return values
+        except HttpError as e:
+            raise Exception(f"Error reading from sheets {', '.join(sheet_names)}: {str(e)}")
+
     def _append_to_sheet(self, sheet_name: str, values: List[List]) -> Dict:
         """Append values to a sheet"""
         try:
             body = {"values": values}
-            result = (
-                self.service.spreadsheets()
-                .values()
-                .append(
+            # Not idempotent: retried on 429 only
+            result = self._execute(
+                "write", "append", sheet_name,
+                self.service.spreadsheets().values().append(
                     spreadsheetId=self.spreadsheet_id,
                     range=f"{sheet_name}!A:Z",
                     valueInputOption="RAW",
                     insertDataOption="INSERT_ROWS",
                     body=body,
-                )
-                .execute()
+                ),
+                idempotent=False,
             )
+            self._reads.forget(sheet_name)
             return result
         except HttpError as e:
             raise Exception(f"Error appending to sheet {sheet_name}: {str(e)}")
@@ -120,44 +256,116 @@ class SheetsClient:
         """Update values in a sheet"""
         try:
             body = {"values": values}
-            result = (
-                self.service.spreadsheets()
-                .values()
-                .update(
+            result = self._execute(
+                "write", "update", sheet_name,
+                self.service.spreadsheets().values().update(
                     spreadsheetId=self.spreadsheet_id,
                     range=f"{sheet_name}!{range_name}",
                     valueInputOption="RAW",
                     body=body,
-                )
-                .execute()
+                ),
             )
+            self._reads.forget(sheet_name)
             return result
         except HttpError as e:
             raise Exception(f"Error updating sheet {sheet_name}: {str(e)}")
 
+    def _update_row_cells(
+        self,
+        sheet_name: str,
+        row_number: int,
+        width: int,
+        key_col: int,
+        expected_key: str,
+        cells: Dict[int, str],
+    ) -> Optional[List]:
+        """
+        Write only `cells` ({0-based column: value}) of a row addressed by a
+        cached row number. The row is re-read first and nothing is written
+        unless its key cell still holds `expected_key`: rows inserted, deleted
+        or sorted in the sheet since the cache was built would otherwise send
+        the write to a different record, and writing the whole cached row
+        would revert cells edited directly in the sheet.
+
+        Returns the current row with `cells` applied, or None if the row no
+        longer matches (the caller reloads and retries).
+        """
+        range_name = f"A{row_number}:{_col_letters(width - 1)}{row_number}"
+        current = self._get_sheet_values(sheet_name, range_name)
+        row = list(current[0]) if current else []
+        row.extend([""] * (width - len(row)))
+        if str(row[key_col] or "").strip() != str(expected_key or "").strip():
+            logger.warning(
+                f"SHEETS_ROW_MOVED | sheet={sheet_name} row={row_number} expected={expected_key} "
+                f"found={row[key_col]}"
+            )
+            return None
+
+        if cells:
+            data = [
+                {"range": f"{sheet_name}!{_col_letters(col)}{row_number}", "values": [[value]]}
+                for col, value in sorted(cells.items())
+            ]
+            try:
+                self._execute(
+                    "write", "batch_update", sheet_name,
+                    self.service.spreadsheets().values().batchUpdate(
+                        spreadsheetId=self.spreadsheet_id,
+                        body={"valueInputOption": "RAW", "data": data},
+                    ),
+                )
+            except HttpError as e:
+                raise Exception(f"Error updating sheet {sheet_name}: {str(e)}")
+            self._reads.forget(sheet_name)
+            for col, value in cells.items():
+                row[col] = value
+        return row
+
+    def _get_sheet_id(self, sheet_name: str) -> int:
+        """Numeric sheetId for a tab (cached; tabs are not renamed at runtime)"""
+        sheet_id = self._sheet_ids.get(sheet_name)
+        if sheet_id is not None:
+            return sheet_id
+
+        sheet_metadata = self._execute(
+            "read", "metadata", "", self.service.spreadsheets().get(spreadsheetId=self.spreadsheet_id),
+        )
+        for sheet in sheet_metadata.get("sheets", []):
+            self._sheet_ids[sheet["properties"]["title"]] = sheet["properties"]["sheetId"]
+
+        if sheet_name not in self._sheet_ids:
+            raise ValueError(f"Sheet '{sheet_name}' not found")
+        return self._sheet_ids[sheet_name]
+
     def _delete_row(self, sheet_name: str, row_index: int) -> Dict:
         """
         Delete a row from a sheet
         row_index: 1-based row index (1 = header row, 2 = first data row, etc.)
         """
+        return self._delete_rows(sheet_name, [row_index])
+
+    def _delete_rows(self, sheet_name: str, row_indexes: List[int]) -> Dict:
+        """
+        Delete several rows from a sheet in one batchUpdate
+        row_indexes: 1-based row indexes (1 = header row, 2 = first data row, etc.)
+
+        Contiguous rows are merged into one range, and ranges are deleted
+        bottom-up so earlier deletions don't shift later ones.
+        """
         try:
-            # Get sheet ID
-            sheet_metadata = (
-                self.service.spreadsheets()
-                .get(spreadsheetId=self.spreadsheet_id)
-                .execute()
-            )
-            
-            sheet_id = None
-            for sheet in sheet_metadata.get("sheets", []):
-                if sheet["properties"]["title"] == sheet_name:
-                    sheet_id = sheet["properties"]["sheetId"]
-                    break
-            
-            if sheet_id is None:
-                raise ValueError(f"Sheet '{sheet_name}' not found")
-            
-            # Delete the row using batchUpdate
+            if not row_indexes:
+                return {}
+
+            sheet_id = self._get_sheet_id(sheet_name)
+
+            # (start, end) 1-based inclusive runs, highest first
+            runs: List[List[int]] = []
+            for row_index in sorted(set(row_indexes), reverse=True):
+                if runs and runs[-1][0] == row_index + 1:
+                    runs[-1][0] = row_index
+                else:
+                    runs.append([row_index, row_index])
+
             request_body = {
                 "requests": [
                     {
@@ -165,34 +373,40 @@ class SheetsClient:
                             "range": {
                                 "sheetId": sheet_id,
                                 "dimension": "ROWS",
-                                "startIndex": row_index - 1,  # 0-based index
-                                "endIndex": row_index,  # endIndex is exclusive
+                                "startIndex": start - 1,  # 0-based index
+                                "endIndex": end,  # endIndex is exclusive
                             }
                         }
                     }
+                    for start, end in runs
                 ]
             }
-            
-            result = (
-                self.service.spreadsheets()
-                .batchUpdate(
-                    spreadsheetId=self.spreadsheet_id,
-                    body=request_body,
-                )
-                .execute()
+
+            # Not idempotent (rows shift): retried on 429 only
+            result = self._execute(
+                "write", "delete_rows", sheet_name,
+                self.service.spreadsheets().batchUpdate(spreadsheetId=self.spreadsheet_id, body=request_body),
+                idempotent=False,
+            )
+            self._reads.forget(sheet_name)
+
+            logger.info(
+                f"Deleted {len(set(row_indexes))} row(s) in {len(runs)} range(s) from sheet '{sheet_name}'"
             )
-            
-            logger.info(f"Deleted row {row_index} from sheet '{sheet_name}'")
             return result
         except HttpError as e:
-            raise Exception(f"Error deleting row from sheet {sheet_name}: {str(e)}")
+            raise Exception(f"Error deleting rows from sheet {sheet_name}: {str(e)}")
         except Exception as e:
-            raise Exception(f"Error deleting row from sheet {sheet_name}: {str(e)}")
+            raise Exception(f"Error deleting rows from sheet {sheet_name}: {str(e)}")
 
     # Flats operations
-    def get_flats(self, society_id: Optional[str] = None) -> List[Dict]:
-        """Get all flats, optionally filtered by society_id"""
-        rows = self._get_sheet_values(settings.SHEET_FLATS)
+    def get_flats(self, society_id: Optional[str] = None, rows: Optional[List[List]] = None) -> List[Dict]:
+        """
+        Get all flats, optionally filtered by society_id.
+        rows: pre-fetched Flats values (e.g. from _batch_get_sheet_values)
+        """
+        if rows is None:
+            rows = self._get_sheet_values(settings.SHEET_FLATS)
         if not rows:
             return []
 
@@ -241,10 +455,21 @@ class SheetsClient:
     # Guards operations
 
     # Guards operations in client.py
-    def get_guards(self, society_id: Optional[str] = None) -> List[Dict]:
-        """Get all guards, optionally filtered by society_id"""
+    def get_guards(
+        self,
+        society_id: Optional[str] = None,
+        rows: Optional[List[List]] = None,
+        raise_on_error: bool = False,
+    ) -> List[Dict]:
+        """
+        Get all guards, optionally filtered by society_id.
+        rows: pre-fetched Guards values (e.g. from _batch_get_sheet_values)
+        raise_on_error: re-raise read errors instead of returning [] (for
+        callers that must tell "read failed" from "no guards")
+        """
         try:
-            rows = self._get_sheet_values(settings.SHEET_GUARDS)
+            if rows is None:
+                rows = self._get_sheet_values(settings.SHEET_GUARDS)
             if not rows or len(rows) < 2:
                 return []
 
@@ -270,14 +495,19 @@ class SheetsClient:
                 guards.append(guard)
 
             return guards
+        except SheetsQuotaError:
+            raise  # a 503 with Retry-After, not an empty result
         except Exception as e:
             print(f"ERROR in get_guards: {e}")
+            if raise_on_error:
+                raise
             return []
 
-    def get_guard_by_id(self, guard_id: str) -> Optional[Dict]:
+    def get_guard_by_id(self, guard_id: str, rows: Optional[List[List]] = None) -> Optional[Dict]:
         """Get a guard by guard_id specifically"""
         # We call the sheet values directly to avoid double-filtering
-        rows = self._get_sheet_values(settings.SHEET_GUARDS)
+        if rows is None:
+            rows = self._get_sheet_values(settings.SHEET_GUARDS)
         if not rows or len(rows) < 2:
             return None
 
@@ -296,6 +526,27 @@ class SheetsClient:
                     return guard
         return None
 
+    def get_guard_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Resolve an active guard and the active flats of their society
+        with a single batchGet of Guards + Flats.
+        """
+        tabs = self._batch_get_sheet_values([settings.SHEET_GUARDS, settings.SHEET_FLATS])
+        return self._guard_with_society_flats(guard_id, tabs)
+
+    async def aget_guard_with_society_flats(self, guard_id: str) -> Tuple[Optional[Dict], List[Dict]]:
+        """get_guard_with_society_flats for async callers (shift-start bursts share one batchGet)."""
+        tabs = await self.abatch_get_sheet_values([settings.SHEET_GUARDS, settings.SHEET_FLATS])
+        return self._guard_with_society_flats(guard_id, tabs)
+
+    def _guard_with_society_flats(self, guard_id: str, tabs: Dict[str, List[List]]) -> Tuple[Optional[Dict], List[Dict]]:
+        guard = self.get_guard_by_id(guard_id, rows=tabs[settings.SHEET_GUARDS])
+        if not guard:
+            return None, []
+
+        society_id = guard.get("society_id", "")
+        return guard, self.get_flats(society_id=society_id, rows=tabs[settings.SHEET_FLATS])
+
     def get_guard_by_pin(self, society_id: str, pin: str) -> Optional[Dict]:
         """Get a guard by society_id and PIN"""
         guards = self.get_guards(society_id=society_id)
@@ -314,7 +565,8 @@ class SheetsClient:
         This makes it safe even if columns are added/reordered (like flat_no).
         """
         
-        rows = self._get_sheet_values(settings.SHEET_VISITORS)
+        # Header row only: no need to download every visitor to learn the column order
+        rows = self._get_sheet_values(settings.SHEET_VISITORS, "1:1")
 
         if not rows:
             raise ValueError(
@@ -342,9 +594,11 @@ class SheetsClient:
         flat_no: Optional[str] = None,
         guard_id: Optional[str] = None,
         date_filter: Optional[str] = None,
+        rows: Optional[List[List]] = None,
     ) -> List[Dict]:
 
-        rows = self._get_sheet_values(settings.SHEET_VISITORS)
+        if rows is None:
+            rows = self._get_sheet_values(settings.SHEET_VISITORS)
         if not rows:
             return []
 
@@ -447,20 +701,8 @@ class SheetsClient:
 
 
     def _normalize_flat_no(self, flat_no: str) -> str:
-        """
-        Normalize flat numbers for tolerant matching.
-        Examples:
-          "A-101" -> "A101"
-          "a 101" -> "A101"
-          "FLAT_101" -> "101"
-          "flat- A-101" -> "A101"
-        """
-        s = (flat_no or "").strip().upper()
-        s = s.replace("FLAT", "")
-        s = s.replace("_", "")
-        s = s.replace("-", "")
-        s = s.replace(" ", "")
-        return s
+        """Tolerant flat_no matching ("A-101" == "a 101" == "FLAT_A101")."""
+        return normalize_flat_no(flat_no)
 
     def get_flat_by_no(self, society_id: str, flat_no: str, active_only: bool = False) -> Optional[Dict]:
         """
@@ -556,6 +798,210 @@ class SheetsClient:
         # -----------------------------
     # Residents operations (NEW)
     # -----------------------------
+    @staticmethod
+    def _normalize_phone(phone: Optional[str]) -> str:
+        """Digits only, so '+91 98765-43210' and '919876543210' index the same."""
+        return normalize_phone(phone)
+
+    def _get_residents_replica(self, force_refresh: bool = False) -> Dict:
+        """
+        In-memory copy of the Residents tab plus lookup indexes.
+
+        One full-tab read serves every society until the TTL expires, so login,
+        profile and FCM-token calls don't each download the tab.
+        force_refresh reloads early (e.g. after a login miss for a just-added
+        resident), but never more often than _residents_replica_min_refresh_sec.
+        """
+        with self._residents_lock:
+            now = time.time()
+            replica = self._residents_replica
+            if replica:
+                age = now - replica["loaded_at"]
+                if age < self._residents_replica_ttl_sec and (
+                    not force_refresh or age < self._residents_replica_min_refresh_sec
+                ):
+                    record_cache("residents_replica", True)
+                    return replica
+
+            record_cache("residents_replica", False)
+
+            rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
+            replica = self._build_residents_replica(rows)
+            self._residents_replica = replica
+
+            logger.info(
+                f"RESIDENTS_REPLICA_REFRESHED | rows={len(replica['rows'])} "
+                f"ttl_sec={self._residents_replica_ttl_sec}"
+            )
+            return replica
+
+    def get_society_overview(self, society_id: str) -> Dict[str, List[Dict]]:
+        """
+        Active residents, guards, flats and all visitors of one society,
+        fetched with a single batchGet (Residents is skipped while its replica is fresh).
+        Returns {"residents": [...], "guards": [...], "flats": [...], "visitors": [...]}
+        """
+        with self._residents_lock:
+            replica = self._residents_replica
+            residents_fresh = bool(
+                replica and time.time() - replica["loaded_at"] < self._residents_replica_ttl_sec
+            )
+
+        sheet_names = [settings.SHEET_GUARDS, settings.SHEET_FLATS, settings.SHEET_VISITORS]
+        if not residents_fresh:
+            sheet_names.append(settings.SHEET_RESIDENTS)
+
+        tabs = self._batch_get_sheet_values(sheet_names)
+
+        if not residents_fresh:
+            replica = self._build_residents_replica(tabs[settings.SHEET_RESIDENTS])
+            with self._residents_lock:
+                self._residents_replica = replica
+
+        return {
+            "residents": self.get_residents(society_id=society_id),
+            "guards": self.get_guards(society_id=society_id, rows=tabs[settings.SHEET_GUARDS]),
+            "flats": self.get_flats(society_id=society_id, rows=tabs[settings.SHEET_FLATS]),
+            "visitors": self.get_visitors(society_id=society_id, rows=tabs[settings.SHEET_VISITORS]),
+        }
+
+    def clear_residents_replica(self) -> None:
+        """Utility to drop the Residents replica (e.g. after manual sheet edits)."""
+        with self._residents_lock:
+            self._residents_replica = None
+
+    def _evict_residents_replica(self, key: Optional[str] = None, data: Optional[Dict] = None) -> None:
+        self.clear_residents_replica()
+
+    def _build_residents_replica(self, rows: List[List]) -> Dict:
+        headers = [str(h).strip().lower() for h in rows[0]] if rows else []
+        header_map = {h: i for i, h in enumerate(headers)}
+
+        if "resident_phone" in header_map:
+            phone_col = "resident_phone"
+        elif "phone" in header_map:
+            phone_col = "phone"
+        else:
+            phone_col = None
+
+        replica = {
+            "loaded_at": time.time(),
+            "headers": headers,
+            "header_map": header_map,
+            "phone_col": phone_col,
+            "rows": [],
+            # (society_id, normalized phone) -> [replica row index, ...] in sheet order
+            "by_phone": {},
+            # (society_id, normalized flat_no) -> [replica row index, ...] in sheet order
+            "by_flat": {},
+        }
+
+        for i, row in enumerate(rows[1:] if rows else []):
+            if len(row) < len(headers):
+                row.extend([""] * (len(headers) - len(row)))
+            replica["rows"].append(row)
+            self._index_resident_row(replica, i)
+
+        return replica
+
+    def _resident_index_keys(self, replica: Dict, row: List) -> Tuple[Optional[tuple], tuple]:
+        header_map = replica["header_map"]
+
+        def col(name: str) -> str:
+            idx = header_map.get(name)
+            return str(row[idx] or "").strip() if idx is not None and idx < len(row) else ""
+
+        society_id = col("society_id")
+        phone_key = None
+        if replica["phone_col"]:
+            phone = self._normalize_phone(col(replica["phone_col"]))
+            if phone:
+                phone_key = (society_id, phone)
+        flat_key = (society_id, self._normalize_flat_no(col("flat_no")))
+        return phone_key, flat_key
+
+    def _index_resident_row(self, replica: Dict, i: int) -> None:
+        phone_key, flat_key = self._resident_index_keys(replica, replica["rows"][i])
+        if phone_key:
+            bisect.insort(replica["by_phone"].setdefault(phone_key, []), i)
+        bisect.insort(replica["by_flat"].setdefault(flat_key, []), i)
+
+    def _unindex_resident_row(self, replica: Dict, i: int) -> None:
+        phone_key, flat_key = self._resident_index_keys(replica, replica["rows"][i])
+        for index, key in ((replica["by_phone"], phone_key), (replica["by_flat"], flat_key)):
+            bucket = index.get(key) if key else None
+            if bucket and i in bucket:
+                bucket.remove(i)
+                if not bucket:
+                    index.pop(key, None)
+
+    def _resident_dict(self, replica: Dict, i: int) -> Dict:
+        return dict(zip(replica["headers"], replica["rows"][i]))
+
+    def _find_resident_row(
+        self,
+        replica: Dict,
+        society_id: str,
+        flat_no: str,
+        resident_id: Optional[str],
+    ) -> Optional[int]:
+        """First replica row matching society_id + flat_no (+ resident_id if given)."""
+        key = ((society_id or "").strip(), self._normalize_flat_no(flat_no))
+        for i in replica["by_flat"].get(key, []):
+            r = self._resident_dict(replica, i)
+            if resident_id and str(r.get("resident_id") or "").strip() != str(resident_id).strip():
+                continue
+            return i
+        return None
+
+    def _update_resident_cells(
+        self,
+        society_id: str,
+        flat_no: str,
+        resident_id: Optional[str],
+        changes: Callable[[Dict, List], Dict[int, str]],
+    ) -> bool:
+        """
+        Write the cells `changes(replica, row)` returns ({column: value}, empty =
+        nothing to write) to the matching resident's row and patch the replica.
+        The sheet row (replica index + 2) is checked to still hold the same
+        resident_id first; if rows moved, the replica is reloaded and this
+        retries once.
+        """
+        for attempt in range(2):
+            replica = self._get_residents_replica()
+            if not replica["rows"]:
+                return False
+
+            i = self._find_resident_row(replica, society_id, flat_no, resident_id)
+            if i is None:
+                return False
+
+            cells = changes(replica, replica["rows"][i])
+            if not cells:
+                return True
+
+            id_col = replica["header_map"]["resident_id"]
+            row = self._update_row_cells(
+                settings.SHEET_RESIDENTS, i + 2, len(replica["headers"]), id_col, replica["rows"][i][id_col], cells,
+            )
+            if row is None:
+                # Rows moved under the replica: drop it (bypassing the early-refresh limit)
+                with self._residents_lock:
+                    if self._residents_replica is replica:
+                        self._residents_replica = None
+                continue
+
+            invalidate("residents", local=False)
+            with self._residents_lock:
+                if self._residents_replica is replica:
+                    self._unindex_resident_row(replica, i)
+                    replica["rows"][i] = row
+                    self._index_resident_row(replica, i)
+            return True
+
+        return False
+
     def get_residents(self, society_id: Optional[str] = None) -> List[Dict]:
         """
         Get all residents, optionally filtered by society_id.
@@ -563,20 +1009,14 @@ class SheetsClient:
         - active == TRUE
         - whatsapp_opt_in == TRUE (if column exists)
         """
-        rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
-        if not rows or len(rows) < 2:
+        replica = self._get_residents_replica()
+        if not replica["rows"]:
             return []
 
-        # Normalize headers to lowercase for safety
-        headers_raw = rows[0]
-        headers = [str(h).strip().lower() for h in headers_raw]
         residents: List[Dict] = []
 
-        for row in rows[1:]:
-            if len(row) < len(headers):
-                row.extend([""] * (len(headers) - len(row)))
-
-            r = dict(zip(headers, row))
+        for i in range(len(replica["rows"])):
+            r = self._resident_dict(replica, i)
 
             if society_id and (r.get("society_id") or "").strip() != society_id:
                 continue
@@ -606,39 +1046,27 @@ class SheetsClient:
         Resolve resident by society_id + flat_no (tolerant match like flats).
         Returns first matching resident.
         """
-        rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
-        if not rows or len(rows) < 2:
+        replica = self._get_residents_replica()
+        if not replica["rows"]:
             return None
 
-        headers = [str(h).strip().lower() for h in rows[0]]
-        target = self._normalize_flat_no(flat_no)
-
-        for row in rows[1:]:
-            if len(row) < len(headers):
-                row.extend([""] * (len(headers) - len(row)))
-
-            r = dict(zip(headers, row))
-
-            if (r.get("society_id") or "").strip() != society_id:
-                continue
+        i = self._find_resident_row(replica, society_id, flat_no, resident_id=None)
+        if i is None:
+            return None
 
-            r_flat_no = self._normalize_flat_no(r.get("flat_no") or "")
-            if r_flat_no != target:
-                continue
+        r = self._resident_dict(replica, i)
 
-            if active_only:
-                active_val = str(r.get("active") or "").strip().lower()
-                if active_val and active_val != "true":
-                    return None
-
-            if whatsapp_opt_in_only:
-                opt_in_val = str(r.get("whatsapp_opt_in") or "").strip().lower()
-                if opt_in_val and opt_in_val != "true":
-                    return None
+        if active_only:
+            active_val = str(r.get("active") or "").strip().lower()
+            if active_val and active_val != "true":
+                return None
 
-            return r
+        if whatsapp_opt_in_only:
+            opt_in_val = str(r.get("whatsapp_opt_in") or "").strip().lower()
+            if opt_in_val and opt_in_val != "true":
+                return None
 
-        return None
+        return r
 
     def upsert_resident_fcm_token(
         self,
@@ -651,12 +1079,11 @@ class SheetsClient:
         Save resident FCM token into Residents sheet.
         Requires column header: fcm_token (recommended)
         """
-        rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
-        if not rows or len(rows) < 2:
+        replica = self._get_residents_replica()
+        if not replica["rows"]:
             return False
 
-        headers = [str(h).strip().lower() for h in rows[0]]
-        header_map = {h: i for i, h in enumerate(headers)}
+        header_map = replica["header_map"]
 
         # Ensure required columns exist
         if "resident_id" not in header_map:
@@ -666,35 +1093,12 @@ class SheetsClient:
         if "fcm_token" not in header_map:
             raise ValueError("Residents sheet missing 'fcm_token' header (please add it)")
 
-        target_flat = self._normalize_flat_no(flat_no)
-
-        for idx, row in enumerate(rows[1:], start=2):  # sheet row number
-            if len(row) < len(headers):
-                row.extend([""] * (len(headers) - len(row)))
-
-            r = dict(zip(headers, row))
-
-            if (r.get("society_id") or "").strip() != society_id:
-                continue
-
-            if self._normalize_flat_no(r.get("flat_no") or "") != target_flat:
-                continue
-
-            # Match resident_id if provided (more strict)
-            if resident_id and str(r.get("resident_id") or "").strip() != str(resident_id).strip():
-                continue
+        def changes(replica: Dict, row: List) -> Dict[int, str]:
+            col = replica["header_map"]["fcm_token"]
+            # Same device re-registering on cold start: nothing to write
+            return {} if row[col] == fcm_token else {col: fcm_token}
 
-            # Update token in row
-            row[header_map["fcm_token"]] = fcm_token
-
-            # Write back full row
-            end_col_letter = chr(ord("A") + len(headers) - 1)
-            range_name = f"A{idx}:{end_col_letter}{idx}"
-
-            self._update_sheet(settings.SHEET_RESIDENTS, range_name, [row])
-            return True
-
-        return False
+        return self._update_resident_cells(society_id, flat_no, resident_id, changes)
     
 
 
@@ -710,47 +1114,38 @@ class SheetsClient:
 
         Additive, tolerant implementation:
         - Works whether the sheet uses `resident_phone` or `phone`
+        - Phones are compared digits-only via the replica's phone index
         - Enforces active_only if active column exists and has a value
         - Does NOT enforce whatsapp_opt_in
         """
-        rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
-        if not rows or len(rows) < 2:
+        target_society = (society_id or "").strip()
+        target_phone = self._normalize_phone(phone)
+        target_pin = (pin or "").strip()
+
+        replica = self._get_residents_replica()
+        candidates = replica["by_phone"].get((target_society, target_phone))
+        if not candidates and replica["rows"]:
+            # Resident may have been added to the sheet since the last refresh
+            replica = self._get_residents_replica(force_refresh=True)
+            candidates = replica["by_phone"].get((target_society, target_phone))
+
+        if not replica["rows"]:
             return None
 
-        headers = [str(h).strip().lower() for h in rows[0]]
-        header_set = set(headers)
+        header_map = replica["header_map"]
 
-        if "society_id" not in header_set:
+        if "society_id" not in header_map:
             raise ValueError("Residents sheet missing 'society_id' header")
-        if "resident_pin" not in header_set:
+        if "resident_pin" not in header_map:
             raise ValueError("Residents sheet missing 'resident_pin' header")
-
-        # Phone column: prefer resident_phone, else phone
-        phone_col = None
-        if "resident_phone" in header_set:
-            phone_col = "resident_phone"
-        elif "phone" in header_set:
-            phone_col = "phone"
-        else:
+        if not replica["phone_col"]:
             raise ValueError("Residents sheet missing 'resident_phone' or 'phone' header")
 
-        target_society = (society_id or "").strip()
-        target_phone = (phone or "").strip()
-        target_pin = (pin or "").strip()
-
-        for row in rows[1:]:
-            if len(row) < len(headers):
-                row.extend([""] * (len(headers) - len(row)))
-
-            r = dict(zip(headers, row))
-
-            if (r.get("society_id") or "").strip() != target_society:
-                continue
-
-            if (r.get("resident_phone") or "").strip() != target_phone:
-                continue
+        for i in candidates or []:
+            r = self._resident_dict(replica, i)
 
-            if (r.get("resident_pin") or "").strip() != target_pin:
+            row_pin = (r.get("resident_pin") or "").strip()
+            if not hmac.compare_digest(row_pin.encode("utf-8"), target_pin.encode("utf-8")):
                 continue
 
             if active_only:
@@ -773,52 +1168,32 @@ class SheetsClient:
         """
         Update resident profile information in Residents sheet.
         """
-        rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
-        if not rows or len(rows) < 2:
+        replica = self._get_residents_replica()
+        if not replica["rows"]:
             return False
 
-        headers = [str(h).strip().lower() for h in rows[0]]
-        header_map = {h: i for i, h in enumerate(headers)}
+        header_map = replica["header_map"]
 
         if "resident_id" not in header_map:
             raise ValueError("Residents sheet missing 'resident_id' header")
 
-        target_flat = self._normalize_flat_no(flat_no)
-
-        for idx, row in enumerate(rows[1:], start=2):
-            if len(row) < len(headers):
-                row.extend([""] * (len(headers) - len(row)))
-
-            r = dict(zip(headers, row))
-
-            if (r.get("society_id") or "").strip() != society_id:
-                continue
-
-            if self._normalize_flat_no(r.get("flat_no") or "") != target_flat:
-                continue
-
-            if str(r.get("resident_id") or "").strip() != str(resident_id).strip():
-                continue
+        def changes(replica: Dict, row: List) -> Dict[int, str]:
+            header_map = replica["header_map"]
+            cells: Dict[int, str] = {}
 
             # Update fields if provided
             if resident_name is not None and "resident_name" in header_map:
-                row[header_map["resident_name"]] = resident_name.strip()
+                cells[header_map["resident_name"]] = resident_name.strip()
 
             if resident_phone is not None:
                 # Try both column names
                 if "resident_phone" in header_map:
-                    row[header_map["resident_phone"]] = resident_phone.strip()
+                    cells[header_map["resident_phone"]] = resident_phone.strip()
                 elif "phone" in header_map:
-                    row[header_map["phone"]] = resident_phone.strip()
+                    cells[header_map["phone"]] = resident_phone.strip()
+            return cells
 
-            # Write back full row
-            end_col_letter = chr(ord("A") + len(headers) - 1)
-            range_name = f"A{idx}:{end_col_letter}{idx}"
-
-            self._update_sheet(settings.SHEET_RESIDENTS, range_name, [row])
-            return True
-
-        return False
+        return self._update_resident_cells(society_id, flat_no, str(resident_id), changes)
 
     def update_resident_image(
         self,
@@ -830,12 +1205,11 @@ class SheetsClient:
         """
         Update resident profile image path in Residents sheet.
         """
-        rows = self._get_sheet_values(settings.SHEET_RESIDENTS)
-        if not rows or len(rows) < 2:
+        replica = self._get_residents_replica()
+        if not replica["rows"]:
             return False
 
-        headers = [str(h).strip().lower() for h in rows[0]]
-        header_map = {h: i for i, h in enumerate(headers)}
+        header_map = replica["header_map"]
 
         if "resident_id" not in header_map:
             raise ValueError("Residents sheet missing 'resident_id' header")
@@ -846,35 +1220,14 @@ class SheetsClient:
             logger.warning("Residents sheet missing 'profile_image' or 'image_path' column")
             return False
 
-        image_col = header_map.get("profile_image") or header_map.get("image_path")
-        target_flat = self._normalize_flat_no(flat_no)
-
-        for idx, row in enumerate(rows[1:], start=2):
-            if len(row) < len(headers):
-                row.extend([""] * (len(headers) - len(row)))
-
-            r = dict(zip(headers, row))
-
-            if (r.get("society_id") or "").strip() != society_id:
-                continue
-
-            if self._normalize_flat_no(r.get("flat_no") or "") != target_flat:
-                continue
-
-            if str(r.get("resident_id") or "").strip() != str(resident_id).strip():
-                continue
-
-            # Update image path
-            row[image_col] = image_path
+        def changes(replica: Dict, row: List) -> Dict[int, str]:
+            header_map = replica["header_map"]
+            image_col = header_map.get("profile_image")
+            if image_col is None:
+                image_col = header_map["image_path"]
+            return {image_col: image_path}
 
-            # Write back full row
-            end_col_letter = chr(ord("A") + len(headers) - 1)
-            range_name = f"A{idx}:{end_col_letter}{idx}"
-
-            self._update_sheet(settings.SHEET_RESIDENTS, range_name, [row])
-            return True
-
-        return False
+        return self._update_resident_cells(society_id, flat_no, str(resident_id), changes)
 
     def update_admin_image(
         self,
@@ -0,0 +1,318 @@
+"""
+In-process stand-in for the Google Sheets v4 API
+
+Implements the slice of the discovery client SheetsClient uses
+(spreadsheets().get / batchUpdate(deleteDimension) and
+values().get / batchGet / append / update / batchUpdate), backed by Python
+lists, with configurable latency and quota errors. Enabled with
+SHEETS_BACKEND=fake; also used by the benchmarks.
+
+All SheetsClient instances share one FakeSpreadsheet (like they share the real
+spreadsheet), so seed it through get_fake_spreadsheet() before the app starts.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from app.config import settings
+
+_A1_RE = re.compile(r"^([A-Z]*)(\d*)$")
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - ord("A") + 1)
+    return n - 1
+
+
+def _col_letters(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def _cell(value) -> str:
+    """What the API hands back for a RAW-written value"""
+    if value is None:
+        return ""
+    if value is True:
+        return "TRUE"
+    if value is False:
+        return "FALSE"
+    return str(value)
+
+
+def _http_error(status: int, reason: str, message: str) -> HttpError:
+    resp = httplib2.Response({"status": status})
+    resp.reason = reason
+    body = json.dumps({"error": {"code": status, "message": message, "status": reason}})
+    return HttpError(resp, body.encode("utf-8"))
+
+
+class FakeSpreadsheet:
+    """Tab data plus the latency / quota model applied to every API call"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        quota_per_minute: int = 0,
+    ):
+        self.tabs: Dict[str, List[List[str]]] = {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota_per_minute = quota_per_minute
+
+        # op -> number of executed calls (including rejected ones)
+        self.calls: Dict[str, int] = {}
+        self._recent: Deque[float] = deque()  # call times inside the quota window
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Seeding / inspection
+    # -----------------------------
+    def load(self, tabs: Dict[str, List[List]]) -> None:
+        """Replace the spreadsheet contents ({tab: rows incl. header})."""
+        with self._lock:
+            self.tabs = {name: [[_cell(v) for v in row] for row in rows] for name, rows in tabs.items()}
+
+    def load_json(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            self.load(json.load(f))
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self._recent.clear()
+
+    # -----------------------------
+    # Latency / quota model
+    # -----------------------------
+    def _admit(self, op: str) -> None:
+        """Sleep for the configured latency, then raise a quota error if one applies."""
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        now = time.monotonic()
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+            if self.quota_per_minute:
+                while self._recent and now - self._recent[0] >= 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.quota_per_minute:
+                    raise _http_error(
+                        429, "RESOURCE_EXHAUSTED",
+                        "Quota exceeded for quota metric 'Read requests' and limit 'per minute per user'",
+                    )
+                self._recent.append(now)
+
+        if self.error_rate and random.random() < self.error_rate:
+            raise _http_error(503, "UNAVAILABLE", "The service is currently unavailable.")
+
+    # -----------------------------
+    # Ranges
+    # -----------------------------
+    def _parse_range(self, range_str: str) -> Tuple[str, int, Optional[int], int, Optional[int]]:
+        """
+        'Tab', 'Tab!1:1', 'Tab!A:Z', 'Tab!A5:K5', 'Tab!D7' ->
+        (tab, first_row, last_row, first_col, last_col), 0-based, None = open-ended.
+        """
+        tab, _, a1 = range_str.partition("!")
+        tab = tab.strip("'")
+        if tab not in self.tabs:
+            raise _http_error(400, "INVALID_ARGUMENT", f"Unable to parse range: {range_str}")
+        if not a1:
+            return tab, 0, None, 0, None
+
+        start, _, end = a1.partition(":")
+        end = end or start
+        m1, m2 = _A1_RE.match(start), _A1_RE.match(end)
+        if not m1 or not m2:
+            raise _http_error(400, "INVALID_ARGUMENT", f"Unable to parse range: {range_str}")
+        c0, r0 = m1.groups()
+        c1, r1 = m2.groups()
+        return (
+            tab,
+            int(r0) - 1 if r0 else 0,
+            int(r1) - 1 if r1 else None,
+            _col_index(c0) if c0 else 0,
+            _col_index(c1) if c1 else None,
+        )
+
+    def read(self, range_str: str) -> List[List[str]]:
+        with self._lock:
+            tab, r0, r1, c0, c1 = self._parse_range(range_str)
+            rows = self.tabs[tab][r0:None if r1 is None else r1 + 1]
+            out = [list(row[c0:None if c1 is None else c1 + 1]) for row in rows]
+        # The API omits trailing empty cells and rows
+        for row in out:
+            while row and row[-1] == "":
+                row.pop()
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+    def write(self, range_str: str, values: List[List]) -> Dict:
+        with self._lock:
+            tab, r0, _, c0, _ = self._parse_range(range_str)
+            rows = self.tabs[tab]
+            for i, new_row in enumerate(values):
+                while len(rows) <= r0 + i:
+                    rows.append([])
+                row = rows[r0 + i]
+                while len(row) < c0 + len(new_row):
+                    row.append("")
+                for j, v in enumerate(new_row):
+                    row[c0 + j] = _cell(v)
+            width = max((len(r) for r in values), default=0)
+            return {
+                "updatedRange": f"{tab}!{_col_letters(c0)}{r0 + 1}:{_col_letters(c0 + max(width, 1) - 1)}{r0 + len(values)}",
+                "updatedRows": len(values),
+                "updatedCells": sum(len(r) for r in values),
+            }
+
+    def append(self, range_str: str, values: List[List]) -> Dict:
+        with self._lock:
+            tab = self._parse_range(range_str)[0]
+            rows = self.tabs[tab]
+            while rows and not any(rows[-1]):
+                rows.pop()
+            start = len(rows)
+            rows.extend([[_cell(v) for v in row] for row in values])
+            width = max((len(r) for r in values), default=1)
+            return {
+                "tableRange": f"{tab}!A1:{_col_letters(width - 1)}{start}",
+                "updates": {
+                    "updatedRange": f"{tab}!A{start + 1}:{_col_letters(width - 1)}{start + len(values)}",
+                    "updatedRows": len(values),
+                    "updatedCells": sum(len(r) for r in values),
+                },
+            }
+
+    def delete_rows(self, sheet_id: int, start: int, end: int) -> None:
+        with self._lock:
+            names = list(self.tabs)
+            if not 0 <= sheet_id < len(names):
+                raise _http_error(400, "INVALID_ARGUMENT", f"No grid with id: {sheet_id}")
+            del self.tabs[names[sheet_id]][start:end]
+
+    def metadata(self) -> Dict:
+        with self._lock:
+            return {
+                "properties": {"title": "GateFlow (fake)"},
+                "sheets": [
+                    {"properties": {"title": name, "sheetId": i}} for i, name in enumerate(self.tabs)
+                ],
+            }
+
+
+# -----------------------------
+# Discovery-client shaped wrappers
+# -----------------------------
+class _Request:
+    """Mimics googleapiclient's HttpRequest: nothing happens until execute()"""
+
+    def __init__(self, book: FakeSpreadsheet, op: str, fn):
+        self._book = book
+        self._op = op
+        self._fn = fn
+
+    def execute(self, num_retries: int = 0):
+        self._book._admit(self._op)
+        return self._fn()
+
+
+class _Values:
+    def __init__(self, book: FakeSpreadsheet):
+        self._book = book
+
+    def get(self, spreadsheetId: str, range: str, **kwargs) -> _Request:
+        return _Request(self._book, "values.get", lambda: {"range": range, "values": self._book.read(range)})
+
+    def batchGet(self, spreadsheetId: str, ranges: List[str], **kwargs) -> _Request:
+        return _Request(self._book, "values.batchGet", lambda: {
+            "valueRanges": [{"range": r, "values": self._book.read(r)} for r in ranges],
+        })
+
+    def append(self, spreadsheetId: str, range: str, body: Dict, **kwargs) -> _Request:
+        return _Request(self._book, "values.append", lambda: self._book.append(range, body.get("values", [])))
+
+    def update(self, spreadsheetId: str, range: str, body: Dict, **kwargs) -> _Request:
+        return _Request(self._book, "values.update", lambda: self._book.write(range, body.get("values", [])))
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict, **kwargs) -> _Request:
+        def _run():
+            responses = [self._book.write(d["range"], d.get("values", [])) for d in body.get("data", [])]
+            return {"totalUpdatedRows": sum(r["updatedRows"] for r in responses), "responses": responses}
+        return _Request(self._book, "values.batchUpdate", _run)
+
+
+class _Spreadsheets:
+    def __init__(self, book: FakeSpreadsheet):
+        self._book = book
+
+    def values(self) -> _Values:
+        return _Values(self._book)
+
+    def get(self, spreadsheetId: str, **kwargs) -> _Request:
+        return _Request(self._book, "get", self._book.metadata)
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict, **kwargs) -> _Request:
+        def _run():
+            replies = []
+            for req in body.get("requests", []):
+                rng = (req.get("deleteDimension") or {}).get("range")
+                if not rng or rng.get("dimension") != "ROWS":
+                    raise _http_error(400, "INVALID_ARGUMENT", "Only deleteDimension(ROWS) is supported")
+                # Requests apply in order, exactly like the API
+                self._book.delete_rows(rng["sheetId"], rng["startIndex"], rng["endIndex"])
+                replies.append({})
+            return {"replies": replies}
+        return _Request(self._book, "batchUpdate", _run)
+
+
+class FakeSheetsService:
+    """Drop-in for build("sheets", "v4", ...)"""
+
+    def __init__(self, book: FakeSpreadsheet):
+        self.book = book
+
+    def spreadsheets(self) -> _Spreadsheets:
+        return _Spreadsheets(self.book)
+
+
+# Singleton instance
+_fake_spreadsheet: Optional[FakeSpreadsheet] = None
+_fake_lock = threading.Lock()
+
+
+def get_fake_spreadsheet() -> FakeSpreadsheet:
+    """Get singleton FakeSpreadsheet, configured from settings on first use"""
+    global _fake_spreadsheet
+    with _fake_lock:
+        if _fake_spreadsheet is None:
+            book = FakeSpreadsheet(
+                latency_ms=settings.SHEETS_FAKE_LATENCY_MS,
+                jitter_ms=settings.SHEETS_FAKE_JITTER_MS,
+                error_rate=settings.SHEETS_FAKE_ERROR_RATE,
+                quota_per_minute=settings.SHEETS_FAKE_QUOTA_PER_MINUTE,
+            )
+            if settings.SHEETS_FAKE_SEED_PATH:
+                book.load_json(settings.SHEETS_FAKE_SEED_PATH)
+            _fake_spreadsheet = book
+        return _fake_spreadsheet
@@ -0,0 +1,288 @@
+"""
+Sheets API quota governor
+
+Sheets enforces per-minute read and write quotas. Instead of finding out via
+429s, every API call first takes a token from the matching bucket:
+
+- Token buckets (one for reads, one for writes) refill continuously at
+  SHEETS_*_QUOTA_PER_MINUTE / 60 per second, bursting up to a minute's worth.
+- Priorities: gate-critical work (visitor create, approvals, SOS) may use the
+  whole bucket; normal calls leave a reserve for it, and bulk work (admin
+  listings, background reconciles) leaves a larger one. Lower priorities also
+  give up sooner, with SheetsQuotaError (served as 503 + Retry-After).
+- 429 / 5xx responses are retried with full-jitter exponential backoff; a 429
+  also empties the bucket so every caller backs off together. Non-idempotent
+  writes (append, row deletes) are only retried on 429, which Google returns
+  before applying anything.
+
+The priority of the current call comes from a context variable: wrap code in
+sheets_priority(...) or use it as a method decorator.
+
+Quotas are per process: with N uvicorn workers, set each worker's share.
+"""
+
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from app.config import settings
+from app.observability.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRITICAL = "critical"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BULK = "bulk"
+
+# Fraction of the bucket a priority must leave untouched
+_RESERVE = {PRIORITY_CRITICAL: 0.0, PRIORITY_NORMAL: 0.1, PRIORITY_BULK: 0.3}
+# Fraction of SHEETS_QUOTA_MAX_WAIT_SEC a priority waits for a token before giving up
+_WAIT_SHARE = {PRIORITY_CRITICAL: 1.0, PRIORITY_NORMAL: 0.5, PRIORITY_BULK: 0.25}
+
+# Transient statuses worth retrying for idempotent calls
+_RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("sheets_priority", default=PRIORITY_NORMAL)
+
+
+class SheetsQuotaError(Exception):
+    """Sheets quota exhausted (locally or by Google) and waiting longer isn't worth it."""
+
+    def __init__(self, message: str, retry_after_sec: float):
+        super().__init__(message)
+        self.retry_after_sec = retry_after_sec
+
+
+@contextmanager
+def sheets_priority(level: str) -> Iterator[None]:
+    """Run Sheets calls in this block (or decorated function) at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class TokenBucket:
+    """Continuous-refill token bucket; per_minute <= 0 means unlimited"""
+
+    def __init__(self, name: str, per_minute: float):
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """Take one token if that leaves `reserve` behind; else seconds until it would."""
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = (reserve + 1.0) - self._tokens
+            if missing <= 0:
+                self._tokens -= 1.0
+                return 0.0
+            return missing / self.rate
+
+    def drain(self) -> None:
+        """Google said 429: assume the real quota is spent."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+
+    def headroom(self) -> float:
+        if self.unlimited:
+            return float("inf")
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class QuotaGovernor:
+    """Read/write token buckets plus the retry policy for one process"""
+
+    def __init__(
+        self,
+        read_per_minute: float,
+        write_per_minute: float,
+        max_wait_sec: float = 10.0,
+        max_retries: int = 4,
+        backoff_base_sec: float = 0.5,
+        backoff_max_sec: float = 8.0,
+    ):
+        self.buckets: Dict[str, TokenBucket] = {
+            "read": TokenBucket("read", read_per_minute),
+            "write": TokenBucket("write", write_per_minute),
+        }
+        self.max_wait_sec = max_wait_sec
+        self.max_retries = max_retries
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+
+        registry = get_metrics_registry()
+        self._wait_hist = registry.histogram(
+            "sheets_quota_wait_seconds", "Time spent waiting for a Sheets quota token", ("bucket", "priority"),
+        )
+        self._rejections = registry.counter(
+            "sheets_quota_rejections_total", "Sheets calls refused for lack of quota", ("bucket", "priority"),
+        )
+        self._retries = registry.counter(
+            "sheets_retries_total", "Sheets calls retried after a 429/5xx", ("bucket", "status"),
+        )
+        registry.gauge(
+            "sheets_quota_headroom_ratio",
+            "Fraction of each Sheets quota bucket currently available",
+            ("bucket",),
+            collect=self._headroom_ratios,
+        )
+        registry.gauge(
+            "sheets_quota_tokens",
+            "Sheets quota tokens currently available",
+            ("bucket",),
+            collect=self._headroom_tokens,
+        )
+
+    # -----------------------------
+    # Tokens
+    # -----------------------------
+    def acquire(self, bucket_name: str) -> None:
+        """Block until the current priority may spend a token, or raise SheetsQuotaError."""
+        bucket = self.buckets[bucket_name]
+        if bucket.unlimited:
+            return
+        level = current_priority()
+        reserve = bucket.capacity * _RESERVE.get(level, 0.0)
+        start = time.monotonic()
+        deadline = start + self.max_wait_sec * _WAIT_SHARE.get(level, 1.0)
+
+        while True:
+            wait = bucket.try_take(reserve)
+            now = time.monotonic()
+            if wait <= 0:
+                self._wait_hist.observe(now - start, bucket_name, level)
+                return
+            if now + wait > deadline:
+                self._rejections.inc(bucket_name, level)
+                logger.warning(
+                    f"SHEETS_QUOTA_REJECTED | bucket={bucket_name} priority={level} "
+                    f"retry_after_sec={wait:.1f} headroom={bucket.headroom():.1f}"
+                )
+                raise SheetsQuotaError(
+                    f"Sheets {bucket_name} quota exhausted, try again shortly", retry_after_sec=wait,
+                )
+            time.sleep(wait)
+
+    # -----------------------------
+    # Retries
+    # -----------------------------
+    def _backoff(self, attempt: int, error: HttpError) -> float:
+        delay = random.uniform(0, min(self.backoff_max_sec, self.backoff_base_sec * (2 ** attempt)))
+        try:
+            retry_after = float(error.resp.get("retry-after") or 0)
+        except (TypeError, ValueError, AttributeError):
+            retry_after = 0.0
+        return max(delay, retry_after)
+
+    def call(self, bucket_name: str, fn: Callable[[], Any], idempotent: bool = True) -> Any:
+        """Run fn() (one API request) under the bucket's quota and the retry policy."""
+        attempt = 0
+        while True:
+            self.acquire(bucket_name)
+            try:
+                return fn()
+            except HttpError as e:
+                status = getattr(e.resp, "status", None)
+                if status not in _RETRYABLE_STATUSES or (status != 429 and not idempotent):
+                    raise
+                if status == 429:
+                    self.buckets[bucket_name].drain()
+                if attempt >= self.max_retries:
+                    if status in (429, 503):
+                        raise SheetsQuotaError(
+                            f"Sheets API unavailable after {attempt + 1} attempts (HTTP {status})",
+                            retry_after_sec=self._backoff(attempt, e),
+                        ) from e
+                    raise
+
+                delay = self._backoff(attempt, e)
+                self._retries.inc(bucket_name, str(status))
+                logger.warning(
+                    f"SHEETS_RETRY | bucket={bucket_name} status={status} attempt={attempt + 1} "
+                    f"delay_sec={delay:.2f} priority={current_priority()}"
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def _headroom_tokens(self) -> Dict[Tuple[str, ...], float]:
+        return {(name,): b.headroom() for name, b in self.buckets.items() if not b.unlimited}
+
+    def _headroom_ratios(self) -> Dict[Tuple[str, ...], float]:
+        return {
+            (name,): b.headroom() / b.capacity for name, b in self.buckets.items() if not b.unlimited
+        }
+
+
+def retry_after_header(error: SheetsQuotaError) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(error.retry_after_sec)))}
+
+
+def find_quota_error(exc: Optional[BaseException]) -> Optional[SheetsQuotaError]:
+    """
+    The SheetsQuotaError behind an exception, if any. Services and routers
+    re-raise Sheets failures as generic errors inside `except` blocks, so the
+    original stays reachable through __cause__ / __context__.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, SheetsQuotaError):
+            return exc
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+# Singleton instance
+_quota_governor: Optional[QuotaGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_quota_governor() -> QuotaGovernor:
+    """Get singleton QuotaGovernor, configured from settings on first use"""
+    global _quota_governor
+    with _governor_lock:
+        if _quota_governor is None:
+            _quota_governor = QuotaGovernor(
+                read_per_minute=settings.SHEETS_READ_QUOTA_PER_MINUTE,
+                write_per_minute=settings.SHEETS_WRITE_QUOTA_PER_MINUTE,
+                max_wait_sec=settings.SHEETS_QUOTA_MAX_WAIT_SEC,
+                max_retries=settings.SHEETS_MAX_RETRIES,
+                backoff_base_sec=settings.SHEETS_BACKOFF_BASE_SEC,
+                backoff_max_sec=settings.SHEETS_BACKOFF_MAX_SEC,
+            )
+        return _quota_governor
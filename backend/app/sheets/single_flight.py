@@ -0,0 +1,111 @@
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key share one execution of the
+underlying call: the first caller (the leader) runs it, everyone who arrives
+while it is in flight waits for that result. Works from plain threads
+(do) and from coroutines (ado, which runs the leader's call on the loop's
+default executor so the event loop never blocks).
+
+Results handed to more than one caller are copied with the caller-supplied
+`copy` function, because the Sheets row parsers pad rows in place.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from app.observability.tracing import propagate
+
+
+class _Flight:
+    __slots__ = ("future", "waiters", "tags")
+
+    def __init__(self, tags: Iterable[str]):
+        self.future: Future = Future()
+        self.waiters = 0  # callers that joined after the leader
+        self.tags = frozenset(tags)
+
+
+class SingleFlight:
+    """key -> in-flight call; a key is free again as soon as its call finishes"""
+
+    def __init__(self, on_join: Optional[Callable[[Hashable], None]] = None):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        # Called with the key whenever a caller joins an existing flight (metrics)
+        self._on_join = on_join
+
+    def _join(self, key: Hashable, tags: Iterable[str]) -> Tuple[_Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                joined = True
+            else:
+                flight = self._flights[key] = _Flight(tags)
+                joined = False
+        if joined and self._on_join:
+            self._on_join(key)
+        return flight, not joined
+
+    def _run(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> None:
+        try:
+            result, error = fn(), None
+        except BaseException as e:
+            result, error = None, e
+        # Close the flight before publishing, so the waiter count is final
+        # by the time anyone reads the result
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(result)
+
+    @staticmethod
+    def _hand_out(flight: _Flight, leader: bool, copy: Optional[Callable[[Any], Any]]) -> Any:
+        result = flight.future.result()
+        if copy is None or (leader and not flight.waiters):
+            return result
+        return copy(result)
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        copy: Optional[Callable[[Any], Any]] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Run fn() once for all concurrent callers of `key` (blocking)."""
+        flight, leader = self._join(key, tags)
+        if leader:
+            self._run(key, flight, fn)
+        return self._hand_out(flight, leader, copy)
+
+    async def ado(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        copy: Optional[Callable[[Any], Any]] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Async variant of do(); shares flights with thread callers."""
+        flight, leader = self._join(key, tags)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, propagate(self._run), key, flight, fn)
+        await asyncio.wrap_future(flight.future)
+        return self._hand_out(flight, leader, copy)
+
+    def forget(self, tag: str) -> None:
+        """
+        Detach in-flight calls tagged `tag` (e.g. reads of a sheet that was
+        just written): their current waiters still get the result, but new
+        callers start a fresh call instead of receiving pre-write data.
+        """
+        with self._lock:
+            for key in [k for k, f in self._flights.items() if tag in f.tags]:
+                del self._flights[key]
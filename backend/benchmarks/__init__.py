@@ -0,0 +1 @@
+"""Load tests and microbenchmarks (run against the in-process fake Sheets backend)"""
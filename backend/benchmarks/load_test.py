@@ -0,0 +1,270 @@
+"""
+Load test: drive the FastAPI app in-process against the fake Sheets backend
+
+    cd backend
+    python -m benchmarks.load_test --duration 30 --concurrency 16 --latency-ms 80
+    python -m benchmarks.load_test --mix create=3,approve=2,today=4,dashboard=1 --json results.json
+    python -m benchmarks.load_test --quota-per-minute 600 --read-budget 500 --write-budget 100
+    python -m benchmarks.load_test --storage sqlite
+
+Requests go through httpx's ASGI transport, so the middleware stack, routing
+and validation are all exercised, and only Sheets is simulated (with the
+configured latency / quota errors). FCM and WhatsApp stay unconfigured and are
+skipped the way they are in a fresh deployment.
+
+Reports per endpoint: count, errors, p50/p90/p99/max latency and throughput,
+plus Sheets API calls per request.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import settings  # noqa: E402
+
+from benchmarks.synthetic import flat_no, generate_tabs, society_id  # noqa: E402
+
+DEFAULT_MIX = "create=3,approve=2,today=4,dashboard=1"
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(q * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_mix(raw: str) -> Dict[str, float]:
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("create", "approve", "today", "dashboard"):
+            raise SystemExit(f"Unknown operation in --mix: {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadTest:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.mix = parse_mix(args.mix)
+        # endpoint -> latencies (seconds) / error count
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        # Visitors created during the run, waiting for approval
+        self.pending: List[str] = []
+
+    # -----------------------------
+    # Operations
+    # -----------------------------
+    def _pick_guard(self):
+        s = self.rng.randrange(self.args.societies)
+        g = self.rng.randrange(self.args.guards)
+        return s, f"G{s:03d}_{g}"
+
+    async def op_create(self):
+        s, guard_id = self._pick_guard()
+        resp = await self.client.post("/api/visitors", json={
+            "flat_no": flat_no(self.rng.randrange(self.args.flats)),
+            "visitor_type": self.rng.choice(("Guest", "Delivery", "Cab")),
+            "visitor_phone": f"9{self.rng.randrange(10 ** 8, 10 ** 9)}",
+            "guard_id": guard_id,
+        })
+        if resp.status_code == 201:
+            self.pending.append(resp.json()["visitor_id"])
+        return "POST /api/visitors", resp
+
+    async def op_approve(self):
+        if not self.pending:
+            return await self.op_create()
+        visitor_id = self.pending.pop(self.rng.randrange(len(self.pending)))
+        resp = await self.client.post(f"/api/visitors/{visitor_id}/status", json={
+            "status": self.rng.choice(("APPROVED", "APPROVED", "REJECTED")),
+            "approved_by": "resident",
+        })
+        return "POST /api/visitors/{id}/status", resp
+
+    async def op_today(self):
+        _, guard_id = self._pick_guard()
+        resp = await self.client.get(f"/api/visitors/today/{guard_id}")
+        return "GET /api/visitors/today/{guard_id}", resp
+
+    async def op_dashboard(self):
+        resp = await self.client.get(
+            "/api/admins/stats", params={"society_id": society_id(self.rng.randrange(self.args.societies))}
+        )
+        return "GET /api/admins/stats", resp
+
+    # -----------------------------
+    # Driver
+    # -----------------------------
+    async def _worker(self, deadline: float, budget: List[int]):
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        while time.perf_counter() < deadline:
+            if budget[0] <= 0:
+                return
+            budget[0] -= 1
+            op = getattr(self, f"op_{self.rng.choices(names, weights)[0]}")
+            start = time.perf_counter()
+            try:
+                endpoint, resp = await op()
+                failed = resp.status_code >= 400
+            except Exception:
+                endpoint, failed = op.__name__, True
+            self.latencies.setdefault(endpoint, []).append(time.perf_counter() - start)
+            if failed:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    async def run(self) -> float:
+        deadline = time.perf_counter() + self.args.duration
+        budget = [self.args.requests or float("inf")]
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker(deadline, budget) for _ in range(self.args.concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, wall_sec: float, sheets_calls: Dict[str, int]) -> Dict:
+        endpoints = {}
+        total = 0
+        for endpoint, values in sorted(self.latencies.items()):
+            values.sort()
+            total += len(values)
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p90_ms": round(percentile(values, 0.90) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+                "throughput_rps": round(len(values) / wall_sec, 1),
+            }
+        return {
+            "config": {k: v for k, v in vars(self.args).items() if k != "json"},
+            "wall_sec": round(wall_sec, 2),
+            "total_requests": total,
+            "throughput_rps": round(total / wall_sec, 1) if wall_sec else 0.0,
+            "sheets_calls": sheets_calls,
+            "sheets_calls_per_request": round(sum(sheets_calls.values()) / total, 2) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def print_report(result: Dict) -> None:
+    header = f"{'endpoint':40} {'count':>7} {'err':>5} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>7}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, r in result["endpoints"].items():
+        print(
+            f"{endpoint:40} {r['count']:>7} {r['errors']:>5} {r['p50_ms']:>8} {r['p90_ms']:>8} "
+            f"{r['p99_ms']:>8} {r['max_ms']:>8} {r['throughput_rps']:>7}"
+        )
+    print("-" * len(header))
+    print(
+        f"total {result['total_requests']} requests in {result['wall_sec']}s "
+        f"({result['throughput_rps']} req/s), sheets calls/request={result['sheets_calls_per_request']} "
+        f"{result['sheets_calls']}"
+    )
+
+
+async def _main(args) -> Dict:
+    import httpx
+
+    # Configure the fake backend before anything builds a SheetsClient
+    settings.SHEETS_BACKEND = "fake"
+    settings.SHEETS_FAKE_LATENCY_MS = args.latency_ms
+    settings.SHEETS_FAKE_JITTER_MS = args.jitter_ms
+    settings.SHEETS_FAKE_ERROR_RATE = args.error_rate
+    settings.SHEETS_FAKE_QUOTA_PER_MINUTE = args.quota_per_minute
+    # Client-side quota governor (0 = off, so only the simulated server limits)
+    settings.SHEETS_READ_QUOTA_PER_MINUTE = args.read_budget
+    settings.SHEETS_WRITE_QUOTA_PER_MINUTE = args.write_budget
+
+    from app.sheets.fake_backend import get_fake_spreadsheet
+
+    tabs = generate_tabs(
+        societies=args.societies,
+        flats_per_society=args.flats,
+        guards_per_society=args.guards,
+        visitors=args.visitors,
+        seed=args.seed,
+    )
+    book = get_fake_spreadsheet()
+    book.load(tabs)
+
+    if args.storage == "sqlite":
+        # Same synthetic data, served from an in-memory SQLite store instead
+        from app.repositories.sqlite import SqliteRepositories
+        from app.repositories.storage import set_repositories
+
+        settings.STORAGE_BACKEND = "sqlite"
+        repositories = SqliteRepositories(":memory:")
+        repositories.import_tabs(tabs)
+        set_repositories(repositories)
+
+    from app.main import app
+
+    # app.main configures INFO logging; per-request log lines would dominate the profile
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    # Unhandled app errors become 500s (as under uvicorn) instead of raising here
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        test = LoadTest(client, args)
+        if args.warmup:
+            # Prime caches so the measured window reflects steady state
+            warm = LoadTest(client, args)
+            for name in ("today", "dashboard", "create"):
+                await getattr(warm, f"op_{name}")()
+            test.pending.extend(warm.pending)
+        book.reset_calls()
+        wall = await test.run()
+
+    return test.report(wall, dict(book.calls))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="GateFlow in-process load test (fake Sheets backend)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="stop after N requests (0 = duration only)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="simulated Sheets latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Sheets calls failing with 503")
+    parser.add_argument("--quota-per-minute", type=int, default=0, help="Sheets calls/minute before 429s")
+    parser.add_argument("--read-budget", type=int, default=0, help="governor read tokens/minute (0 = off)")
+    parser.add_argument("--write-budget", type=int, default=0, help="governor write tokens/minute (0 = off)")
+    parser.add_argument("--societies", type=int, default=5)
+    parser.add_argument("--flats", type=int, default=200, help="flats per society")
+    parser.add_argument("--guards", type=int, default=4, help="guards per society")
+    parser.add_argument("--visitors", type=int, default=10_000, help="pre-existing visitor rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--storage", choices=("sheets", "sqlite"), default="sheets",
+                        help="storage backend serving the synthetic data")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(_main(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Microbenchmarks for the Sheets row decoding / filtering hot paths
+
+    cd backend
+    python -m benchmarks.microbench                       # 1k / 10k / 100k rows
+    python -m benchmarks.microbench --sizes 1000,10000 --label v1.4.0
+    python -m benchmarks.microbench --compare benchmarks/results/v1.3.0.json
+
+Each case runs on synthetic tabs (benchmarks/synthetic.py) with no network:
+rows are handed to the parsers directly, and create_notice runs against the
+fake Sheets backend with zero latency. Results go to benchmarks/results/<label>.json
+so releases can be diffed; --compare prints the change against an earlier file
+and exits non-zero when a case regresses by more than --threshold percent.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import settings  # noqa: E402
+
+from benchmarks.synthetic import NOTICES_HEADERS, flat_no, generate_tabs, society_id  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_SIZES = "1000,10000,100000"
+NOTICE_CREATE_OPS = 1000
+
+# Header spellings seen in hand-made Notices sheets; the Title Case one takes
+# the slow fallback branches of create_notice's header matching
+NOTICE_HEADER_LAYOUTS = {
+    "snake_case": NOTICES_HEADERS,
+    "title_case": [h.replace("_", " ").title() for h in NOTICES_HEADERS],
+}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def time_case(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and median wall time (ms) over `repeat` runs, after one warm-up run."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"best_ms": round(min(timings), 3), "median_ms": round(statistics.median(timings), 3)}
+
+
+# -----------------------------
+# Cases
+# -----------------------------
+def build_cases(size: int, client, visitor_service) -> Dict[str, Callable[[], object]]:
+    """case name -> zero-arg callable processing `size` rows"""
+    tabs = generate_tabs(
+        societies=5,
+        flats_per_society=200,
+        guards_per_society=max(1, size // 5),
+        visitors=size,
+        seed=size,
+    )
+    visitor_rows = tabs["Visitors"]
+    guard_rows = tabs["Guards"]
+    sid = society_id(0)
+    target_flat = flat_no(7)
+
+    # Same dicts get_visitors returns, converted once up front
+    visitor_dicts = client.get_visitors(rows=visitor_rows)
+
+    return {
+        "get_visitors.society": lambda: client.get_visitors(society_id=sid, rows=visitor_rows),
+        "get_visitors.flat_no": lambda: client.get_visitors(society_id=sid, flat_no=target_flat, rows=visitor_rows),
+        "get_guards.headers": lambda: client.get_guards(society_id=sid, rows=guard_rows),
+        "dict_to_visitor_response": lambda: [visitor_service._dict_to_visitor_response(v) for v in visitor_dicts],
+    }
+
+
+def run_notice_cases(book, notice_service, repeat: int, cases_filter: Optional[str]) -> List[Dict]:
+    results = []
+    for layout, headers in NOTICE_HEADER_LAYOUTS.items():
+        name = f"create_notice.{layout}"
+        if cases_filter and cases_filter not in name:
+            continue
+
+        def _create_many():
+            book.load({settings.SHEET_NOTICES: [headers]})
+            for i in range(NOTICE_CREATE_OPS):
+                notice_service.create_notice(
+                    society_id=society_id(i % 5),
+                    admin_id="ADM000",
+                    admin_name="Admin 0",
+                    title=f"Notice {i}",
+                    content="Water supply will be interrupted between 10am and 2pm.",
+                    notice_type="GENERAL",
+                    priority="NORMAL",
+                )
+
+        timing = time_case(_create_many, repeat)
+        results.append({
+            "case": name,
+            "rows": NOTICE_CREATE_OPS,
+            **timing,
+            "per_row_us": round(timing["best_ms"] * 1000 / NOTICE_CREATE_OPS, 3),
+        })
+    return results
+
+
+def run(sizes: List[int], repeat: int, cases_filter: Optional[str]) -> List[Dict]:
+    # Zero-latency fake backend: no credentials, no network
+    settings.SHEETS_BACKEND = "fake"
+    settings.SHEETS_FAKE_LATENCY_MS = 0.0
+    settings.SHEETS_FAKE_JITTER_MS = 0.0
+    settings.SHEETS_FAKE_ERROR_RATE = 0.0
+    settings.SHEETS_FAKE_QUOTA_PER_MINUTE = 0
+    settings.SHEETS_READ_QUOTA_PER_MINUTE = 0
+    settings.SHEETS_WRITE_QUOTA_PER_MINUTE = 0
+
+    from app.sheets.client import get_sheets_client
+    from app.sheets.fake_backend import get_fake_spreadsheet
+    from app.services.notice_service import get_notice_service
+    from app.services.visitor_service import get_visitor_service
+
+    book = get_fake_spreadsheet()
+    book.load({settings.SHEET_NOTICES: [NOTICES_HEADERS]})
+    client = get_sheets_client()
+    visitor_service = get_visitor_service()
+
+    results: List[Dict] = []
+    for size in sizes:
+        for name, fn in build_cases(size, client, visitor_service).items():
+            if cases_filter and cases_filter not in name:
+                continue
+            # Fewer repeats on the big tabs keep a full run to about a minute
+            timing = time_case(fn, repeat if size <= 10_000 else max(1, repeat // 2))
+            results.append({
+                "case": name,
+                "rows": size,
+                **timing,
+                "per_row_us": round(timing["best_ms"] * 1000 / size, 3),
+            })
+            print(f"{name:32} rows={size:>7}  best={timing['best_ms']:>10.3f} ms  median={timing['median_ms']:>10.3f} ms")
+
+    for r in run_notice_cases(book, get_notice_service(), repeat, cases_filter):
+        results.append(r)
+        print(f"{r['case']:32} ops={r['rows']:>8}  best={r['best_ms']:>10.3f} ms  median={r['median_ms']:>10.3f} ms")
+
+    return results
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> bool:
+    """Print per-case change vs a previous results file; True if nothing regressed past threshold."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["case"], r["rows"]): r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\nvs {baseline_path} (best time; + is slower)")
+    for r in results:
+        before = baseline.get((r["case"], r["rows"]))
+        if not before or not before["best_ms"]:
+            continue
+        change = (r["best_ms"] - before["best_ms"]) / before["best_ms"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{r['case']:32} rows={r['rows']:>7}  {before['best_ms']:>10.3f} -> {r['best_ms']:>10.3f} ms  {change:+6.1f}%{flag}")
+    return ok
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Sheets row decoding / filtering microbenchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated row counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--case", help="only run cases whose name contains this")
+    parser.add_argument("--label", help="results file name (default: current git revision)")
+    parser.add_argument("--out-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    # Parsers log per-row warnings for malformed data; keep timings about parsing
+    logging.disable(logging.WARNING)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    revision = _git_revision()
+    results = run(sizes, args.repeat, args.case)
+
+    label = args.label or revision
+    os.makedirs(args.out_dir, exist_ok=True)
+    out_path = os.path.join(args.out_dir, f"{label}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "label": label,
+                "git_revision": revision,
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nresults written to {out_path}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Synthetic spreadsheet contents for benchmarks
+
+Tabs use the same headers as the production sheets (docs/GOOGLE_SHEETS_SETUP.md
+plus the columns the services add), with deterministic ids so runs can be
+compared: societies soc_000.., flats F<soc>_<n>, guards G<soc>_<n>,
+flat numbers like "A-101".
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+FLATS_HEADERS = ["flat_id", "society_id", "flat_no", "resident_name", "resident_phone", "resident_alt_phone", "role", "active"]
+GUARDS_HEADERS = ["guard_id", "society_id", "guard_name", "pin", "active"]
+VISITORS_HEADERS = [
+    "visitor_id", "society_id", "flat_id", "flat_no", "visitor_type", "visitor_phone", "status",
+    "created_at", "approved_at", "approved_by", "guard_id", "photo_path", "note",
+]
+RESIDENTS_HEADERS = ["resident_id", "society_id", "flat_no", "resident_name", "resident_phone", "resident_pin", "fcm_token", "active"]
+ADMINS_HEADERS = ["admin_id", "society_id", "admin_name", "phone", "pin", "role", "active"]
+COMPLAINTS_HEADERS = [
+    "complaint_id", "society_id", "flat_no", "resident_id", "resident_name", "title", "description",
+    "category", "status", "created_at", "resolved_at", "resolved_by", "admin_response",
+]
+NOTICES_HEADERS = [
+    "notice_id", "society_id", "admin_id", "admin_name", "title", "content", "notice_type",
+    "priority", "is_active", "status", "pinned", "created_at", "expiry_date",
+]
+
+VISITOR_TYPES = ("Guest", "Delivery", "Cab")
+VISITOR_STATUSES = ("PENDING", "APPROVED", "REJECTED", "LEAVE_AT_GATE")
+
+
+def society_id(i: int) -> str:
+    return f"soc_{i:03d}"
+
+
+def flat_no(n: int) -> str:
+    """A-101, A-102 ... 10 flats per floor, 10 floors per block"""
+    block = chr(ord("A") + (n // 100) % 26)
+    return f"{block}-{(n % 100) // 10 + 1}{n % 10 + 1:02d}"
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _phone(rng: random.Random) -> str:
+    return f"9{rng.randrange(10 ** 8, 10 ** 9)}"
+
+
+def generate_tabs(
+    societies: int = 5,
+    flats_per_society: int = 200,
+    guards_per_society: int = 4,
+    visitors: int = 10_000,
+    days: int = 7,
+    seed: int = 42,
+    now: Optional[datetime] = None,
+) -> Dict[str, List[List[str]]]:
+    """
+    {tab: rows incl. header}. Visitors are spread over the last `days` days,
+    oldest first (append order), with a mix of statuses and messy flat_no
+    spellings ("a101", "A 101") like hand-entered rows.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+
+    tabs: Dict[str, List[List[str]]] = {
+        "Flats": [FLATS_HEADERS],
+        "Guards": [GUARDS_HEADERS],
+        "Visitors": [VISITORS_HEADERS],
+        "Residents": [RESIDENTS_HEADERS],
+        "Admins": [ADMINS_HEADERS],
+        "Complaints": [COMPLAINTS_HEADERS],
+        "Notices": [NOTICES_HEADERS],
+    }
+
+    for s in range(societies):
+        sid = society_id(s)
+        tabs["Admins"].append([f"ADM{s:03d}", sid, f"Admin {s}", _phone(rng), "1234", "ADMIN", "TRUE"])
+        for g in range(guards_per_society):
+            tabs["Guards"].append([f"G{s:03d}_{g}", sid, f"Guard {g}", f"{1000 + g}", "TRUE"])
+        for n in range(flats_per_society):
+            phone = _phone(rng)
+            tabs["Flats"].append([f"F{s:03d}_{n}", sid, flat_no(n), f"Resident {n}", phone, "", "OWNER", "TRUE"])
+            tabs["Residents"].append([f"R{s:03d}_{n}", sid, flat_no(n), f"Resident {n}", phone, "1234", "", "TRUE"])
+
+    span_sec = days * 86400
+    for i in range(visitors):
+        s = rng.randrange(societies)
+        n = rng.randrange(flats_per_society)
+        fno = flat_no(n)
+        spelling = rng.random()
+        if spelling < 0.1:
+            fno = fno.replace("-", "").lower()
+        elif spelling < 0.2:
+            fno = fno.replace("-", " ")
+        created = now - timedelta(seconds=span_sec * (1 - i / max(visitors, 1)))
+        status = rng.choice(VISITOR_STATUSES)
+        approved_at = _iso(created + timedelta(minutes=2)) if status != "PENDING" else ""
+        tabs["Visitors"].append([
+            f"V{i:07d}", society_id(s), f"F{s:03d}_{n}", fno, rng.choice(VISITOR_TYPES), _phone(rng), status,
+            _iso(created), approved_at, "resident" if approved_at else "",
+            f"G{s:03d}_{rng.randrange(guards_per_society)}", "", "",
+        ])
+
+    return tabs
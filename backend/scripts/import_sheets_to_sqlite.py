@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Copy every Google Sheets tab into the SQLite store used by STORAGE_BACKEND=sqlite.
+
+Existing SQLite rows of each imported tab are replaced; deleted (tombstoned)
+notices are skipped. Stop writes (or the API) while importing, then switch
+STORAGE_BACKEND to sqlite.
+
+Usage (from backend/):
+    python scripts/import_sheets_to_sqlite.py [SQLITE_PATH]
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.repositories.sqlite import SqliteRepositories
+from app.sheets.client import get_sheets_client
+from app.sheets.quota import PRIORITY_BULK, sheets_priority
+
+
+TABS = [
+    settings.SHEET_FLATS,
+    settings.SHEET_GUARDS,
+    settings.SHEET_VISITORS,
+    settings.SHEET_RESIDENTS,
+    settings.SHEET_ADMINS,
+    settings.SHEET_COMPLAINTS,
+    settings.SHEET_NOTICES,
+]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) >= 2 else settings.SQLITE_PATH
+
+    print(f"📊 Reading {len(TABS)} tabs from spreadsheet {settings.SHEETS_SPREADSHEET_ID}...")
+    with sheets_priority(PRIORITY_BULK):
+        tabs = get_sheets_client()._batch_get_sheet_values(TABS)
+
+    repos = SqliteRepositories(path)
+    try:
+        counts = repos.import_tabs(tabs)
+    finally:
+        repos.close()
+
+    for tab in TABS:
+        print(f"   {tab}: {counts.get(tab, 0)} rows")
+    print(f"✅ Imported into {path}")
+
+
+if __name__ == "__main__":
+    main()